@@ -46,6 +46,7 @@ from nucypher.crypto.powers import (
     SigningPower,
     DecryptingPower,
     NoSigningPower,
+    PowerUpError,
     CryptoPowerUp,
     DelegatingPower
 )
@@ -53,6 +54,7 @@ from nucypher.crypto.signing import signature_splitter, StrangerStamp, Signature
 from nucypher.network.middleware import RestMiddleware
 from nucypher.network.nicknames import nickname_from_seed
 from nucypher.network.nodes import Learner
+from nucypher.utilities.caching import LRUCache
 
 
 class Character(Learner):
@@ -284,6 +286,14 @@ class Character(Learner):
 
         return cls(is_me=False, federated_only=federated_only, crypto_power=crypto_power, *args, **kwargs)
 
+    @classmethod
+    def stranger(cls, verifying_key: Union[UmbralPublicKey, bytes]) -> 'Stranger':
+        """
+        The Character of this class behind a verifying key, as far as checking their signatures goes.
+        Unlike from_public_keys, this is cheap, and the same key gets back the same (remembered) Stranger.
+        """
+        return Stranger.from_verifying_key(verifying_key, character_class=cls)
+
     def store_metadata(self, filepath: str) -> str:
         """
         Save this node to the disk.
@@ -429,3 +439,52 @@ class Character(Learner):
                     "You can't use a plain Character in federated mode - you need to implement ether_address.")
 
         self._checksum_address = public_address
+
+
+class Stranger:
+    """
+    What we know of a Character whose signatures we only need to check: their verifying key.
+
+    For Ursula, most Alices and Bobs are exactly this - no CryptoPower, no FleetStateTracker, no learning -
+    so rather than a whole Character for each request, she keeps a bounded set of recent Strangers by key.
+    """
+
+    _REMEMBERED = 4096
+
+    SuspiciousActivity = Character.SuspiciousActivity
+    InvalidSignature = Character.InvalidSignature
+
+    _remembered = LRUCache(max_size=_REMEMBERED)
+
+    def __init__(self, verifying_key: UmbralPublicKey, character_class=Character) -> None:
+        self.stamp = StrangerStamp(verifying_key)
+        self.character_class = character_class
+
+    @classmethod
+    def from_verifying_key(cls, verifying_key: Union[UmbralPublicKey, bytes], character_class=Character) -> 'Stranger':
+        key_bytes = bytes(verifying_key)
+        stranger = cls._remembered.get((character_class, key_bytes))
+        if stranger is None:
+            if not isinstance(verifying_key, UmbralPublicKey):
+                verifying_key = UmbralPublicKey.from_bytes(key_bytes)
+            stranger = cls(verifying_key, character_class=character_class)
+            cls._remembered.put((character_class, key_bytes), stranger)
+        return stranger
+
+    def public_keys(self, power_up_class: ClassVar):
+        if power_up_class is not SigningPower:
+            raise PowerUpError(f"A Stranger has only a verifying key, not {power_up_class.__name__}.")
+        return self.stamp.as_umbral_pubkey()
+
+    def __eq__(self, other) -> bool:
+        try:
+            other_stamp = other.stamp
+        except (AttributeError, NoSigningPower):
+            return False
+        return bytes(self.stamp) == bytes(other_stamp)
+
+    def __hash__(self):
+        return int.from_bytes(bytes(self.stamp), byteorder="big")
+
+    def __repr__(self):
+        return "({})⇀Stranger↽ ({})".format(self.character_class.__name__, self.stamp.fingerprint().decode()[:10])
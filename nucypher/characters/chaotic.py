@@ -55,18 +55,21 @@ class Moe(Character):
     LEARNING_TIMEOUT = 10
     _ROUNDS_WITHOUT_NODES_AFTER_WHICH_TO_SLOW_DOWN = 25
 
-    def remember_node(self, *args, **kwargs):
-        new_node_or_none = super().remember_node(*args, **kwargs)
+    def _commit_to_memory(self, *args, **kwargs):
+        new_node_or_none = super()._commit_to_memory(*args, **kwargs)
         if new_node_or_none:
             hey_joe.send(
                 {new_node_or_none.checksum_public_address: Moe.MonitoringTracker.abridged_node_details(new_node_or_none)},
                 "nodes")
         return new_node_or_none
 
-    def learn_from_teacher_node(self, *args, **kwargs):
-        teacher = self.current_teacher_node(cycle=False)
-        new_nodes = super().learn_from_teacher_node(*args, **kwargs)
-        hey_joe.send({teacher.checksum_public_address: Moe.MonitoringTracker.abridged_node_details(teacher)}, "nodes")
+    def _apply_lesson(self, lesson):
+        new_nodes = super()._apply_lesson(lesson)
+        if isinstance(lesson, self.lesson_template):
+            for answer in lesson.answers:
+                teacher = answer.teacher
+                hey_joe.send({teacher.checksum_public_address: Moe.MonitoringTracker.abridged_node_details(teacher)},
+                             "nodes")
         new_teacher = self.current_teacher_node(cycle=False)
         hey_joe.send({"current_teacher": new_teacher.checksum_public_address}, "teachers")
         return new_nodes
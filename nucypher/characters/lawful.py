@@ -14,32 +14,38 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
+import datetime
+import itertools
 import json
+import math
 import random
 from base64 import b64encode
-from collections import OrderedDict
+from collections import OrderedDict, deque
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, as_completed, wait
 from functools import partial
 from json.decoder import JSONDecodeError
+from requests.exceptions import ChunkedEncodingError
+from threading import Event, Lock
 from typing import Dict
 from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Set
 from typing import Tuple
 
 import maya
-import requests
 import time
 from bytestring_splitter import BytestringKwargifier, BytestringSplittingError
 from bytestring_splitter import BytestringSplitter, VariableLengthBytestring
 from constant_sorrow import constants, constant_or_bytes
-from constant_sorrow.constants import INCLUDED_IN_BYTESTRING, PUBLIC_ONLY
+from constant_sorrow.constants import INCLUDED_IN_BYTESTRING, PUBLIC_ONLY, NO_WORK_ORDER_LEDGER, NO_REENCRYPTION_ENGINE
 from cryptography.hazmat.backends import default_backend
 from cryptography.hazmat.primitives.asymmetric.ec import EllipticCurve
 from cryptography.hazmat.primitives.serialization import Encoding
 from cryptography.x509 import load_pem_x509_certificate, Certificate, NameOID
 from eth_utils import to_checksum_address
 from flask import request, Response
-from twisted.internet import threads
+from twisted.internet import reactor, threads
 from twisted.logger import Logger
 from umbral.keys import UmbralPublicKey
 from umbral.pre import UmbralCorrectnessError
@@ -59,13 +65,17 @@ from nucypher.crypto.constants import PUBLIC_KEY_LENGTH, PUBLIC_ADDRESS_LENGTH
 from nucypher.crypto.kits import UmbralMessageKit
 from nucypher.crypto.powers import SigningPower, DecryptingPower, DelegatingPower, BlockchainPower, PowerUpError
 from nucypher.crypto.signing import InvalidSignature
+from nucypher.keystore.db.models import Workorder
 from nucypher.keystore.keypairs import HostingKeypair
+from nucypher.keystore.ledger import WorkOrderLedger
 from nucypher.network.exceptions import NodeSeemsToBeDown
 from nucypher.network.middleware import RestMiddleware, UnexpectedResponse, NotFound
 from nucypher.network.nicknames import nickname_from_seed
 from nucypher.network.nodes import Teacher
 from nucypher.network.protocols import InterfaceInfo, parse_node_uri
+from nucypher.network.reencryption import make_reencryption_engine
 from nucypher.network.server import ProxyRESTServer, TLSHostingPower, make_rest_app
+from nucypher.utilities.caching import LRUCache
 from nucypher.blockchain.eth.decorators import validate_checksum_address
 
 
@@ -239,10 +249,12 @@ class Alice(Character, PolicyAuthor):
                 new_ursulas = random.sample(list(self.known_nodes), number_of_ursulas_needed)
                 handpicked_ursulas.update(new_ursulas)
 
+        # In federated mode, KFrags go out along with the Arrangements, in a single round trip to each Ursula.
         policy.make_arrangements(network_middleware=self.network_middleware,
                                  value=value,
                                  expiration=expiration,
-                                 handpicked_ursulas=handpicked_ursulas)
+                                 handpicked_ursulas=handpicked_ursulas,
+                                 propose_and_enact=self.federated_only)
 
         # REST call happens here, as does population of TreasureMap.
         policy.enact(network_middleware=self.network_middleware)
@@ -353,6 +365,11 @@ class Bob(Character):
 
     _default_crypto_powerups = [SigningPower, DecryptingPower]
 
+    _TREASURE_MAP_FIRST_WAVE = 3  # Nodes asked at once for a TreasureMap; the wave doubles each time it comes up empty.
+    _RETRIEVAL_OVERPROVISIONING = 1.5  # Work orders in flight during retrieval, as a multiple of m.
+    _LATENCY_SMOOTHING = 0.3
+    _RETRIEVAL_WINDOW = 8  # Message kits per retrieve_many call in retrieve_stream.
+
     class IncorrectCFragReceived(Exception):
         """
         Raised when Bob detects an incorrect CFrag returned by some Ursula
@@ -360,14 +377,22 @@ class Bob(Character):
         def __init__(self, evidence):
             self.evidence = evidence
 
-    def __init__(self, controller=True, *args, **kwargs) -> None:
+    def __init__(self,
+                 controller=True,
+                 *args,
+                 work_order_history: 'WorkOrderHistory' = None,
+                 **kwargs) -> None:
         Character.__init__(self, *args, **kwargs)
 
         if controller:
             self.controller = self._controller_class(bob=self)
 
         from nucypher.policy.models import WorkOrderHistory  # Need a bigger strategy to avoid circulars.
-        self._saved_work_orders = WorkOrderHistory()
+        self._saved_work_orders = work_order_history or WorkOrderHistory()
+        self.reencryption_latencies = dict()  # Ursula's address -> moving average of seconds to her first cfrag for us
+        self._retrieval_lock = Lock()  # Guards the two above, and saved Tasks' cfrags, against cfrag collection threads.
+
+        self.policy_expirations = dict()  # map ID -> when its policy expires, as told along with its TreasureMap
 
         self.log = Logger(self.__class__.__name__)
         self.log.info(self.banner)
@@ -457,7 +482,7 @@ class Bob(Character):
         treasure_map = self.get_treasure_map_from_known_ursulas(self.network_middleware,
                                                                 map_id)
 
-        alice = Alice.from_public_keys({SigningPower: alice_verifying_key})
+        alice = Alice.stranger(alice_verifying_key)
         compass = self.make_compass_for_alice(alice)
         try:
             treasure_map.orient(compass)
@@ -481,30 +506,56 @@ class Bob(Character):
 
     def get_treasure_map_from_known_ursulas(self, network_middleware, map_id):
         """
-        Iterate through the nodes we know, asking for the TreasureMap.
-        Return the first one who has it.
+        Ask the nodes we know for the TreasureMap, a wave at a time - starting with those Alice will have
+        given it to (see TreasureMap.custodians_among).  Return the first valid one to come back;
+        the rest of its wave is cancelled.  Each time a wave comes back empty-handed, the next is twice as wide.
         """
         from nucypher.policy.models import TreasureMap
-        for node in self.known_nodes.shuffled():
-            try:
-                response = network_middleware.get_treasure_map_from_node(node=node, map_id=map_id)
-            except NodeSeemsToBeDown:
-                continue
-
-            if response.status_code == 200 and response.content:
-                try:
-                    treasure_map = TreasureMap.from_bytes(response.content)
-                except InvalidSignature:
-                    # TODO: What if a node gives a bunk TreasureMap?
-                    raise
-                break
-            else:
-                continue  # TODO: Actually, handle error case here.
-        else:
-            # TODO: Work out what to do in this scenario - if Bob can't get the TreasureMap, he needs to rest on the learning mutex or something.
-            raise TreasureMap.NowhereToBeFound
-
-        return treasure_map
+        custodians = TreasureMap.custodians_among(self.known_nodes, map_id)
+        custodian_addresses = {custodian.checksum_public_address for custodian in custodians}
+        others = [node for node in self.known_nodes.shuffled() if node.checksum_public_address not in custodian_addresses]
+        nodes_to_ask = iter(itertools.chain(custodians, others))
+
+        wave_size = self._TREASURE_MAP_FIRST_WAVE
+        executor = ThreadPoolExecutor(thread_name_prefix="treasure-map-lookup")
+        lookups = dict()
+        try:
+            while True:
+                wave = list(itertools.islice(nodes_to_ask, wave_size))
+                if not wave:
+                    # TODO: Work out what to do in this scenario - if Bob can't get the TreasureMap, he needs to rest on the learning mutex or something.
+                    raise TreasureMap.NowhereToBeFound
+
+                lookups = {executor.submit(network_middleware.get_treasure_map_from_node, node=node, map_id=map_id): node
+                           for node in wave}
+                for lookup in as_completed(lookups):
+                    try:
+                        response = lookup.result()
+                    except NodeSeemsToBeDown:
+                        continue
+
+                    if not (response.status_code == 200 and response.content):
+                        continue  # TODO: Actually, handle error case here.
+
+                    try:
+                        treasure_map = TreasureMap.from_bytes(response.content)
+                    except InvalidSignature:
+                        # TODO: What if a node gives a bunk TreasureMap?
+                        self.log.warn("{} gave us an invalid TreasureMap {}".format(lookups[lookup], map_id))
+                        continue
+
+                    if treasure_map.public_id() == map_id:
+                        expiration = response.headers.get('X-Policy-Expiration')
+                        if expiration:
+                            self.policy_expirations[map_id] = maya.parse(expiration)
+                        return treasure_map
+
+                wave_size *= 2
+        finally:
+            # Don't wait on the stragglers; whatever they answer is of no use to us now.
+            for lookup in lookups:
+                lookup.cancel()
+            executor.shutdown(wait=False)
 
     def generate_work_orders(self, map_id, *capsules, num_ursulas=None):
         from nucypher.policy.models import WorkOrder  # Prevent circular import
@@ -522,20 +573,24 @@ class Bob(Character):
                 "Bob doesn't have a TreasureMap to match any of these capsules: {}".format(
                     capsules))
 
+        ursulas_by_capsule = [(capsule, self._saved_work_orders.by_capsule(capsule)) for capsule in capsules]
+
         for node_id, arrangement_id in treasure_map_to_use:
             ursula = self.known_nodes[node_id]
 
+            # An Ursula who has already given us a cfrag for a capsule isn't asked for another.
             capsules_to_include = []
-            for capsule in capsules:
-                if not capsule in self._saved_work_orders[node_id]:
-                    capsules_to_include.append(capsule)
+            with self._retrieval_lock:
+                for capsule, ursulas_with_work_orders in ursulas_by_capsule:
+                    saved_work_order = ursulas_with_work_orders.get(node_id)
+                    if saved_work_order is None or self._saved_task(saved_work_order, capsule).cfrag is None:
+                        capsules_to_include.append(capsule)
 
             if capsules_to_include:
                 work_order = WorkOrder.construct_by_bob(
                     arrangement_id, capsules_to_include, ursula, self)
                 generated_work_orders[node_id] = work_order
-                # TODO: Fix this. It's always taking the last capsule
-                self._saved_work_orders[node_id][capsule] = work_order
+                self._saved_work_orders.save(work_order)
 
             if num_ursulas == len(generated_work_orders):
                 break
@@ -543,11 +598,12 @@ class Bob(Character):
         return generated_work_orders
 
     def get_reencrypted_cfrags(self, work_order):
-        cfrags = self.network_middleware.reencrypt(work_order)
-        for task in work_order.tasks:
-            # TODO: Maybe just update the work order here instead of setting it anew.
-            work_orders_by_ursula = self._saved_work_orders[work_order.ursula.checksum_public_address]
-            work_orders_by_ursula[task.capsule] = work_order
+        attempt = work_order.copy()
+        cfrags = self.network_middleware.reencrypt(attempt)
+        # TODO: Maybe just update the work order here instead of setting it anew.
+        with self._retrieval_lock:
+            work_order.take_results(attempt)
+            self._saved_work_orders.save(work_order)
         return cfrags
 
     def join_policy(self, label, alice_pubkey_sig, node_list=None, block=False):
@@ -556,47 +612,235 @@ class Bob(Character):
         treasure_map = self.get_treasure_map(alice_pubkey_sig, label)
         self.follow_treasure_map(treasure_map=treasure_map, block=block)
 
-    def retrieve(self, message_kit, data_source, alice_verifying_key, label):
-
-        capsule = message_kit.capsule  # TODO: generalize for WorkOrders with more than one capsule
-        capsule.set_correctness_keys(
-            delegating=data_source.policy_pubkey,
-            receiving=self.public_keys(DecryptingPower),
-            verifying=alice_verifying_key)
+    def retrieve(self, message_kit, data_source, alice_verifying_key, label, overprovisioning: float = None):
+        return self.retrieve_many(message_kits=[message_kit],
+                                  data_source=data_source,
+                                  alice_verifying_key=alice_verifying_key,
+                                  label=label,
+                                  overprovisioning=overprovisioning)
+
+    def retrieve_many(self,
+                      message_kits: List[UmbralMessageKit],
+                      data_source,
+                      alice_verifying_key,
+                      label,
+                      overprovisioning: float = None) -> List[bytes]:
+        """
+        Retrieves a batch of message kits from the same policy: each Ursula gets a single WorkOrder
+        carrying every capsule, so it's one round trip per Ursula no matter how many kits there are.
+        Returns the cleartexts in the order of the message kits.
+        """
+        capsules = [message_kit.capsule for message_kit in message_kits]
+        for capsule in capsules:
+            capsule.set_correctness_keys(
+                delegating=data_source.policy_pubkey,
+                receiving=self.public_keys(DecryptingPower),
+                verifying=alice_verifying_key)
 
         hrac, map_id = self.construct_hrac_and_map_id(alice_verifying_key, label)
         _unknown_ursulas, _known_ursulas, m = self.follow_treasure_map(map_id=map_id, block=True)
 
         # TODO: Consider blocking until map is done being followed.
 
-        work_orders = self.generate_work_orders(map_id, capsule)
+        # Cfrags we already have from earlier WorkOrders are good until the policy expires.
+        self._forget_expired_policy(map_id)
+        capsules = [capsule for capsule in capsules if not self._attach_saved_cfrags(map_id, capsule, m)]
 
-        cleartexts = []
-        work_orders = work_orders.values()
-        for work_order in work_orders:
-            try:
-                cfrags = self.get_reencrypted_cfrags(work_order)
-            except requests.exceptions.ConnectTimeout:
+        if capsules:
+            work_orders = self.generate_work_orders(map_id, *capsules)
+            self._attach_first_m_cfrags(capsules, list(work_orders.values()), m, overprovisioning)
+
+        cleartexts = [self.verify_from(data_source, message_kit, decrypt=True) for message_kit in message_kits]
+        return cleartexts
+
+    def retrieve_stream(self,
+                        message_kits: Iterable[UmbralMessageKit],
+                        data_source,
+                        alice_verifying_key,
+                        label,
+                        window: int = None) -> Iterator[bytes]:
+        """
+        Retrieves a stream of message kits from the same policy, yielding cleartexts in order.
+
+        Kits are retrieved a window at a time, with one retrieve_many call (so one WorkOrder per Ursula)
+        per window.  The next window is read from `message_kits` and retrieved while the consumer
+        takes the cleartexts of this one, so a slow consumer holds the stream back.
+        """
+        window = window or self._RETRIEVAL_WINDOW
+        message_kits = iter(message_kits)
+        executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrieval-stream")
+
+        def retrieve_next_window():
+            batch = list(itertools.islice(message_kits, window))
+            if not batch:
+                return None
+            return executor.submit(self.retrieve_many,
+                                   message_kits=batch,
+                                   data_source=data_source,
+                                   alice_verifying_key=alice_verifying_key,
+                                   label=label)
+
+        retrieval = None
+        try:
+            retrieval = retrieve_next_window()
+            while retrieval:
+                cleartexts = retrieval.result()
+                retrieval = retrieve_next_window()
+                yield from cleartexts
+        finally:
+            # The consumer may walk away mid-stream; don't make it wait on what it'll never read.
+            if retrieval:
+                retrieval.cancel()
+            executor.shutdown(wait=False)
+
+    def _attach_saved_cfrags(self, map_id, capsule, m) -> bool:
+        """
+        Attaches the cfrags Ursulas on this TreasureMap have already given us for this capsule, as kept
+        in our WorkOrderHistory; returns whether that makes m.
+        """
+        saved_work_orders = self._saved_work_orders.by_capsule(capsule)
+        attached = set(bytes(cfrag) for cfrag in capsule._attached_cfrags)
+        for node_id, arrangement_id in self.treasure_maps[map_id]:
+            if len(capsule._attached_cfrags) >= m:
+                break
+            work_order = saved_work_orders.get(node_id)
+            if work_order is None or work_order.arrangement_id != arrangement_id:
                 continue
+            with self._retrieval_lock:
+                task = self._saved_task(work_order, capsule)
+                if task.cfrag is None or bytes(task.cfrag) in attached:
+                    continue
+                try:
+                    capsule.attach_cfrag(task.cfrag)
+                except UmbralCorrectnessError:
+                    task.attach_work_result(None, None)  # Not one we can use; this Ursula will be asked again.
+        return len(capsule._attached_cfrags) >= m
 
-            cfrag = cfrags[0]  # TODO: generalize for WorkOrders with more than one capsule
-            try:
-                message_kit.capsule.attach_cfrag(cfrag)
-                if len(message_kit.capsule._attached_cfrags) >= m:
-                    break
-            except UmbralCorrectnessError:
-                evidence = self.collect_evidence(capsule=capsule,
-                                                 cfrag=cfrag,
-                                                 ursula=work_order.ursula)
-
-                # TODO: Here's the evidence of Ursula misbehavior. Now what? #500
-                raise self.IncorrectCFragReceived(evidence)
-        else:
-            raise Ursula.NotEnoughUrsulas("Unable to snag m cfrags.")
+    @staticmethod
+    def _saved_task(work_order, capsule):
+        for task in work_order.tasks:
+            if task.capsule == capsule:
+                return task
 
-        delivered_cleartext = self.verify_from(data_source, message_kit, decrypt=True)
-        cleartexts.append(delivered_cleartext)
-        return cleartexts
+    def _forget_expired_policy(self, map_id) -> int:
+        """
+        Once a policy has expired, drops the WorkOrders - and with them the cfrags - we made under it.
+        Returns how many were dropped.
+        """
+        expiration = self.policy_expirations.get(map_id)
+        if expiration is None or expiration > maya.now():
+            return 0
+        del self.policy_expirations[map_id]
+        arrangement_ids = [arrangement_id for _node_id, arrangement_id in self.treasure_maps[map_id]]
+        return self._saved_work_orders.forget_arrangements(arrangement_ids)
+
+    def _attach_first_m_cfrags(self, capsules, work_orders, m, overprovisioning: float = None) -> None:
+        """
+        Sends work orders out side by side - m times overprovisioning of them at a time, quickest Ursulas first -
+        and attaches each cfrag to its capsule as soon as it has streamed in and been checked, so that every
+        capsule's m may be made up from several Ursulas' responses before any of them is over.  An Ursula who
+        is down, answers strangely, cuts her response off or gives us a bad cfrag is a miss (though what she sent
+        before that is kept), and makes room for the next work order.  Once every capsule has m, the stragglers
+        are cancelled; whatever they bring back after that is dropped, and never reaches our WorkOrderHistory.
+        """
+        overprovisioning = overprovisioning or self._RETRIEVAL_OVERPROVISIONING
+        in_flight_limit = max(m, math.ceil(m * overprovisioning))
+
+        # Ursulas we haven't timed yet go first; that's the only way to learn how quick they are.
+        with self._retrieval_lock:
+            latencies = dict(self.reencryption_latencies)
+        pending = sorted(work_orders, key=lambda w: latencies.get(w.ursula.checksum_public_address, 0))
+        pending.reverse()  # We'll pop from the right.
+
+        collected = Event()
+        enough = Future()  # Done once every capsule has m, whichever responses they came in on.
+
+        def reencrypt(work_order):
+            # Ursula's results go into a copy; only while we're still collecting do they reach the saved WorkOrder.
+            attempt = work_order.copy()
+            started = time.perf_counter()
+            timed = False
+
+            def attach(task):
+                nonlocal timed
+                with self._retrieval_lock:
+                    if collected.is_set():
+                        return
+                    try:
+                        task.capsule.attach_cfrag(task.cfrag)
+                    except UmbralCorrectnessError:
+                        evidence = self.collect_evidence(capsule=task.capsule,
+                                                         cfrag=task.cfrag,
+                                                         ursula=work_order.ursula)
+
+                        # TODO: Here's the evidence of Ursula misbehavior. Now what? #500
+                        self.log.warn("{} gave us an incorrect cfrag: {}".format(work_order.ursula, evidence))
+                        raise
+
+                    if not timed:
+                        self._note_reencryption_latency(work_order.ursula, time.perf_counter() - started)
+                        timed = True
+                    self._saved_task(work_order, task.capsule).attach_work_result(task.cfrag,
+                                                                                  task.reencryption_signature)
+                    self._saved_work_orders.save(work_order)
+
+                    if not enough.done() and all(len(capsule._attached_cfrags) >= m for capsule in capsules):
+                        enough.set_result(True)
+
+            cfrags = self.network_middleware.reencrypt(attempt, on_cfrag=attach)
+            with self._retrieval_lock:
+                if not collected.is_set():
+                    work_order.completed = attempt.completed
+            return cfrags
+
+        executor = ThreadPoolExecutor(max_workers=max(1, min(in_flight_limit, len(pending))),
+                                      thread_name_prefix="cfrag-collection")
+        in_flight = dict()
+        try:
+            while True:
+                while pending and len(in_flight) < in_flight_limit:
+                    work_order = pending.pop()
+                    in_flight[executor.submit(reencrypt, work_order)] = work_order
+
+                if not in_flight:
+                    raise Ursula.NotEnoughUrsulas("Unable to snag m cfrags.")
+
+                done, _still_in_flight = wait([enough, *in_flight], return_when=FIRST_COMPLETED)
+                if enough.done():
+                    return
+
+                for reencryption in done:
+                    work_order = in_flight.pop(reencryption)
+                    try:
+                        reencryption.result()
+                    except NotFound:
+                        # She no longer holds a KFrag for it - the policy's been revoked - so nor are
+                        # the cfrags she gave us for it any good anymore.
+                        self.log.info("{} no longer serves arrangement {}".format(work_order.ursula,
+                                                                                 work_order.arrangement_id.hex()))
+                        self._saved_work_orders.forget_arrangements([work_order.arrangement_id])
+                    except (NodeSeemsToBeDown, UnexpectedResponse, InvalidSignature, ValueError,
+                            BytestringSplittingError, ChunkedEncodingError) as e:
+                        # Down, refusing, or with a response that's cut off or doesn't add up.
+                        self.log.info("No cfrags from {}: {}".format(work_order.ursula, e))
+                    except UmbralCorrectnessError:
+                        pass  # Already reported, as the bad cfrag came in.
+        finally:
+            with self._retrieval_lock:
+                collected.set()
+            for reencryption in in_flight:
+                reencryption.cancel()
+            executor.shutdown(wait=False)
+
+    def _note_reencryption_latency(self, ursula, seconds: float) -> None:
+        """
+        Call with the retrieval lock held.
+        """
+        address = ursula.checksum_public_address
+        previous = self.reencryption_latencies.get(address, seconds)
+        smoothing = self._LATENCY_SMOOTHING
+        self.reencryption_latencies[address] = (1 - smoothing) * previous + smoothing * seconds
+        self.log.debug("{} had a first cfrag for us in {:.3f}s".format(ursula, seconds))
 
     def collect_evidence(self, capsule, cfrag, ursula):
         from nucypher.policy.models import IndisputableEvidence
@@ -663,6 +907,21 @@ class Ursula(Teacher, Character, Miner):
     class NotFound(Exception):
         pass
 
+    # Decoded KFrags of the hottest arrangements, kept in front of the datastore
+    _KFRAG_CACHE_SIZE = 1000
+
+    # Results of recent re-encryptions, for Bobs retrying the same WorkOrder
+    _REENCRYPTION_CACHE_SIZE = 10000
+
+    # WorkOrders are written to the datastore in batches, and kept for a while after
+    _WORK_ORDER_BATCH_SIZE = 100
+    _WORK_ORDER_FLUSH_INTERVAL = 5  # seconds
+    _WORK_ORDER_RETENTION = datetime.timedelta(days=30)
+    _RECENT_WORK_ORDERS = 100  # ...but only the latest are kept whole, in memory
+
+    # TreasureMaps held for others, decoded in memory in front of the datastore
+    _TREASURE_MAP_CACHE_SIZE = 1000
+
     # TODO: 289
     def __init__(self,
 
@@ -673,6 +932,7 @@ class Ursula(Teacher, Character, Miner):
                  certificate: Certificate = None,
                  certificate_filepath: str = None,
                  db_filepath: str = None,
+                 reencryption_workers: int = None,
                  is_me: bool = True,
                  interface_signature=None,
                  timestamp=None,
@@ -696,7 +956,10 @@ class Ursula(Teacher, Character, Miner):
         #
         # Character
         #
-        self._work_orders = list()
+        self.work_order_ledger = NO_WORK_ORDER_LEDGER
+        self._work_orders = deque(maxlen=self._RECENT_WORK_ORDERS)
+        self.reencryption_engine = NO_REENCRYPTION_ENGINE
+        self._work_order_ledger_trigger = None
         Character.__init__(self,
                            is_me=is_me,
                            checksum_public_address=checksum_public_address,
@@ -712,7 +975,6 @@ class Ursula(Teacher, Character, Miner):
         # Self-Ursula
         #
         if is_me is True:  # TODO: 340
-            self._stored_treasure_maps = dict()
 
             #
             # Staking Ursula
@@ -737,24 +999,33 @@ class Ursula(Teacher, Character, Miner):
             #
             if is_me:
                 self.suspicious_activities_witnessed = {'vladimirs': [], 'bad_treasure_maps': []}
+                self.kfrag_cache = LRUCache(max_size=self._KFRAG_CACHE_SIZE)
+                self.reencryption_cache = LRUCache(max_size=self._REENCRYPTION_CACHE_SIZE)
+                self.reencryption_engine = make_reencryption_engine(stamp=self.stamp,
+                                                                    workers=reencryption_workers,
+                                                                    results_cache=self.reencryption_cache)
 
                 #
                 # REST Server (Ephemeral Self-Ursula)
                 #
-                rest_app, datastore = make_rest_app(
+                rest_app, datastore, self.treasure_maps = make_rest_app(
                     db_filepath=db_filepath,
                     network_middleware=self.network_middleware,
                     federated_only=self.federated_only,  # TODO: 466
-                    treasure_map_tracker=self.treasure_maps,
                     node_tracker=self.known_nodes,
                     node_bytes_caster=self.__bytes__,
                     node_nickname=self.nickname,
-                    work_order_tracker=self._work_orders,
+                    work_order_recorder=self._record_work_order,
+                    kfrag_cache=self.kfrag_cache,
+                    reencryption_cache=self.reencryption_cache,
+                    reencryption_engine=self.reencryption_engine,
+                    verification_queue=self.verification_queue,
                     node_recorder=self.remember_node,
                     stamp=self.stamp,
                     verifier=self.verify_from,
                     suspicious_activity_tracker=self.suspicious_activities_witnessed,
                     serving_domains=domains,
+                    treasure_map_cache_size=self._TREASURE_MAP_CACHE_SIZE,
                 )
 
                 #
@@ -763,6 +1034,14 @@ class Ursula(Teacher, Character, Miner):
                 tls_hosting_keypair = HostingKeypair(curve=tls_curve, host=rest_host,
                                                      checksum_public_address=self.checksum_public_address)
                 tls_hosting_power = TLSHostingPower(keypair=tls_hosting_keypair, host=rest_host)
+                self.work_order_ledger = WorkOrderLedger(datastore=datastore,
+                                                         batch_size=self._WORK_ORDER_BATCH_SIZE,
+                                                         flush_interval=self._WORK_ORDER_FLUSH_INTERVAL,
+                                                         retention=self._WORK_ORDER_RETENTION)
+                self.work_order_ledger.start()
+                # Whatever is still buffered goes to the datastore before the reactor goes down.
+                self._work_order_ledger_trigger = reactor.addSystemEventTrigger('before', 'shutdown',
+                                                                                self._stop_work_order_ledger)
                 self.rest_server = ProxyRESTServer(rest_host=rest_host, rest_port=rest_port,
                                                    rest_app=rest_app, datastore=datastore,
                                                    hosting_power=tls_hosting_power)
@@ -835,6 +1114,21 @@ class Ursula(Teacher, Character, Miner):
         deployer = self._crypto_power.power_ups(TLSHostingPower).get_deployer(rest_app=self.rest_app, port=port)
         return deployer
 
+    def shutdown(self) -> None:
+        """
+        Tears down what this Ursula keeps running outside the reactor's own threads.
+        The reactor does this for her when it shuts down; this is for an Ursula torn down before then.
+        """
+        if self.reencryption_engine is not NO_REENCRYPTION_ENGINE:
+            self.reencryption_engine.shutdown()
+        if self._work_order_ledger_trigger is not None:
+            reactor.removeSystemEventTrigger(self._work_order_ledger_trigger)
+            self._stop_work_order_ledger()
+
+    def _stop_work_order_ledger(self) -> None:
+        self._work_order_ledger_trigger = None
+        self.work_order_ledger.stop()
+
     def rest_server_certificate(self):
         return self._crypto_power.power_ups(TLSHostingPower).keypair.certificate
 
@@ -1126,19 +1420,39 @@ class Ursula(Teacher, Character, Miner):
     # Utilities
     #
 
-    def work_orders(self, bob=None):
+    def _record_work_order(self, work_order) -> None:
+        self._work_orders.append(work_order)
+        if self.work_order_ledger is not NO_WORK_ORDER_LEDGER:
+            self.work_order_ledger.record(work_order)
+
+    def work_orders(self, bob=None) -> List['WorkOrder']:
         """
-        TODO: This is better written as a model method for Ursula's datastore.
+        The WorkOrders Ursula has served most recently - the last _RECENT_WORK_ORDERS of them - optionally only Bob's.
+        For everything she has served, see work_order_records.
         """
         if not bob:
-            return self._work_orders
+            return list(self._work_orders)
         else:
             work_orders_from_bob = []
-            for work_order in self._work_orders:
+            for work_order in list(self._work_orders):
                 if work_order.bob == bob:
                     work_orders_from_bob.append(work_order)
             return work_orders_from_bob
 
+    def work_order_records(self,
+                           bob=None,
+                           arrangement_id: bytes = None,
+                           limit: int = None,
+                           offset: int = 0
+                           ) -> List[Workorder]:
+        """
+        The Workorder rows of Ursula's ledger, oldest first.  These are datastore records of Bob's key,
+        his receipt signature and the arrangement, not WorkOrders - the capsules aren't kept.
+        """
+        if self.work_order_ledger is NO_WORK_ORDER_LEDGER:
+            return []  # Only an Ursula serving WorkOrders herself keeps a ledger of them.
+        return self.work_order_ledger.work_orders(bob=bob, arrangement_id=arrangement_id, limit=limit, offset=offset)
+
 
 class Enrico(Character):
     """A Character that represents a Data Source that encrypts data for some policy's public key"""
@@ -19,7 +19,7 @@ from decimal import Decimal
 
 import click
 import maya
-from constant_sorrow.constants import NO_KNOWN_NODES
+from constant_sorrow.constants import NO_KNOWN_NODES, NO_WORK_ORDER_LEDGER
 
 from nucypher.blockchain.eth.utils import datetime_at_period
 from nucypher.characters.banners import NUCYPHER_BANNER
@@ -103,6 +103,12 @@ def paint_node_status(ursula, start_time):
     # Build FleetState status line
     fleet_state = build_fleet_state_status(ursula=ursula)
 
+    # Only an Ursula serving WorkOrders herself keeps a ledger of them
+    if ursula.work_order_ledger is NO_WORK_ORDER_LEDGER:
+        work_orders = len(ursula.work_orders())
+    else:
+        work_orders = len(ursula.work_order_ledger)
+
     stats = ['⇀URSULA {}↽'.format(ursula.nickname_icon),
              '{}'.format(ursula),
              'Uptime .............. {}'.format(maya.now() - start_time),
@@ -114,7 +120,7 @@ def paint_node_status(ursula, start_time):
              'Rest Interface ...... {}'.format(ursula.rest_url()),
              'Node Storage Type ... {}'.format(ursula.node_storage._name.capitalize()),
              'Known Nodes ......... {}'.format(len(ursula.known_nodes)),
-             'Work Orders ......... {}'.format(len(ursula._work_orders)),
+             'Work Orders ......... {}'.format(work_orders),
              teacher]
 
     if not ursula.federated_only and ursula.stakes:
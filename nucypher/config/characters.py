@@ -40,8 +40,10 @@ class UrsulaConfiguration(NodeConfiguration):
     def __init__(self,
                  dev_mode: bool = False,
                  db_filepath: str = None,
+                 reencryption_workers: int = None,
                  *args, **kwargs) -> None:
         self.db_filepath = db_filepath or UNINITIALIZED_CONFIGURATION
+        self.reencryption_workers = reencryption_workers
         super().__init__(dev_mode=dev_mode, *args, **kwargs)
 
     def generate_runtime_filepaths(self, config_root: str) -> dict:
@@ -56,6 +58,7 @@ class UrsulaConfiguration(NodeConfiguration):
          rest_host=self.rest_host,
          rest_port=self.rest_port,
          db_filepath=self.db_filepath,
+         reencryption_workers=self.reencryption_workers,
         )
         return {**super().static_payload, **payload}
 
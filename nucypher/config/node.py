@@ -241,7 +241,7 @@ class NodeConfiguration(ABC):
         self.__fleet_state = FleetStateTracker()
         known_nodes = known_nodes or set()
         if known_nodes:
-            self.known_nodes._nodes.update({node.checksum_public_address: node for node in known_nodes})
+            self.known_nodes.update({node.checksum_public_address: node for node in known_nodes})
             self.known_nodes.record_fleet_state()  # TODO: Does this call need to be here?
 
         #
@@ -324,7 +324,7 @@ class NodeConfiguration(ABC):
     def read_known_nodes(self):
         known_nodes = self.node_storage.all(federated_only=self.federated_only)
         known_nodes = {node.checksum_public_address: node for node in known_nodes}
-        self.known_nodes._nodes.update(known_nodes)
+        self.known_nodes.update(known_nodes)
         self.known_nodes.record_fleet_state()
         return self.known_nodes
 
@@ -478,7 +478,7 @@ class NodeConfiguration(ABC):
         if self.reload_metadata:
             known_nodes = self.node_storage.all(federated_only=self.federated_only)
             known_nodes = {node.checksum_public_address: node for node in known_nodes}
-            self.known_nodes._nodes.update(known_nodes)
+            self.known_nodes.update(known_nodes)
         self.known_nodes.record_fleet_state()
 
         payload = dict(network_middleware=self.network_middleware or self.__DEFAULT_NETWORK_MIDDLEWARE_CLASS(),
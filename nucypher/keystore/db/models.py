@@ -82,10 +82,10 @@ class Workorder(Base):
     __tablename__ = 'workorders'
 
     id = Column(Integer, primary_key=True)
-    bob_pubkey_sig_id = Column(Integer, ForeignKey('keys.id'))
+    bob_pubkey_sig_id = Column(Integer, ForeignKey('keys.id'), index=True)
     bob_signature = Column(LargeBinary, unique=True)
-    arrangement_id = Column(LargeBinary, unique=False)
-    created_at = Column(DateTime, default=datetime.utcnow)
+    arrangement_id = Column(LargeBinary, unique=False, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow, index=True)
 
     def __init__(self, bob_pubkey_sig_id, bob_signature, arrangement_id) -> None:
         self.bob_pubkey_sig_id = bob_pubkey_sig_id
@@ -94,3 +94,20 @@ class Workorder(Base):
 
     def __repr__(self):
         return f'{self.__class__.__name__}(id={self.id})'
+
+
+class TreasureMap(Base):
+    __tablename__ = 'treasuremaps'
+
+    id = Column(LargeBinary, unique=True, primary_key=True)
+    treasure_map = Column(LargeBinary)
+    expiration = Column(DateTime, nullable=True, index=True)
+    created_at = Column(DateTime, default=datetime.utcnow)
+
+    def __init__(self, id, treasure_map, expiration=None) -> None:
+        self.id = id
+        self.treasure_map = treasure_map
+        self.expiration = expiration
+
+    def __repr__(self):
+        return f'{self.__class__.__name__}(id={self.id})'
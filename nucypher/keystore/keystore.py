@@ -14,15 +14,17 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
+from datetime import datetime
+from typing import Iterable, Tuple, Union
+
 from bytestring_splitter import BytestringSplitter
 from sqlalchemy.orm import sessionmaker
-from typing import Union
 from umbral.kfrags import KFrag
 from umbral.keys import UmbralPublicKey
 
 from nucypher.crypto.signing import Signature
 from nucypher.crypto.utils import fingerprint_from_key
-from nucypher.keystore.db.models import Key, PolicyArrangement, Workorder
+from nucypher.keystore.db.models import Key, PolicyArrangement, TreasureMap, Workorder
 from . import keypairs
 
 
@@ -160,31 +162,93 @@ class KeyStore(object):
         policy_arrangement.kfrag = bytes(kfrag)
         session.commit()
 
+    def _signing_key_row(self, pubkey_sig, session) -> Key:
+        """
+        The Key row for this signing key, added to the session if it's not stored yet.
+        """
+        key_instance = session.query(Key).filter_by(key_data=bytes(pubkey_sig)).first()
+        if not key_instance:
+            key_instance = Key.from_umbral_key(pubkey_sig, is_signing=True)
+            session.add(key_instance)
+            session.flush()
+        return key_instance
+
     def add_workorder(self, bob_pubkey_sig, bob_signature, arrangement_id, session=None) -> Workorder:
         """
         Adds a Workorder to the keystore.
         """
         session = session or self._session_on_init_thread
-        bob_pubkey_sig = self.add_key(bob_pubkey_sig)
-        new_workorder = Workorder(bob_pubkey_sig.id, bob_signature, arrangement_id)
+        bob_key_instance = self._signing_key_row(bob_pubkey_sig, session=session)
+        new_workorder = Workorder(bob_key_instance.id, bob_signature, arrangement_id)
 
         session.add(new_workorder)
         session.commit()
 
         return new_workorder
 
-    def get_workorders(self, arrangement_id: bytes, session=None) -> Workorder:
+    def add_workorders(self, workorders: Iterable[Tuple], session=None) -> int:
         """
-        Returns a list of Workorders by HRAC.
+        Adds a batch of (bob_pubkey_sig, bob_signature, arrangement_id) Workorders to the keystore
+        in one transaction, skipping any whose signature is already stored.  Returns how many were added.
         """
         session = session or self._session_on_init_thread
 
-        workorders = session.query(Workorder).filter_by(arrangement_id=arrangement_id)
+        new_workorders = dict()
+        for bob_pubkey_sig, bob_signature, arrangement_id in workorders:
+            new_workorders.setdefault(bytes(bob_signature), (bob_pubkey_sig, arrangement_id))
+        if not new_workorders:
+            return 0
+
+        stored = session.query(Workorder.bob_signature).filter(Workorder.bob_signature.in_(list(new_workorders)))
+        for (bob_signature,) in stored:
+            del new_workorders[bytes(bob_signature)]
+
+        key_rows = dict()
+        for bob_signature, (bob_pubkey_sig, arrangement_id) in new_workorders.items():
+            key_data = bytes(bob_pubkey_sig)
+            if key_data not in key_rows:
+                key_rows[key_data] = self._signing_key_row(bob_pubkey_sig, session=session)
+            session.add(Workorder(key_rows[key_data].id, bob_signature, arrangement_id))
 
-        if not workorders:
-            raise NotFound("No Workorders with {} HRAC found.".format(arrangement_id))
+        session.commit()
+        return len(new_workorders)
+
+    def get_workorders(self,
+                       arrangement_id: bytes = None,
+                       bob_pubkey_sig=None,
+                       limit: int = None,
+                       offset: int = 0,
+                       session=None):
+        """
+        Returns a query of Workorders, oldest first - by HRAC, by Bob, or both - a page at a time if a limit is given.
+        """
+        session = session or self._session_on_init_thread
+
+        workorders = session.query(Workorder)
+        if arrangement_id is not None:
+            workorders = workorders.filter_by(arrangement_id=arrangement_id)
+        if bob_pubkey_sig is not None:
+            workorders = workorders.join(Key, Workorder.bob_pubkey_sig_id == Key.id)
+            workorders = workorders.filter(Key.key_data == bytes(bob_pubkey_sig))
+
+        workorders = workorders.order_by(Workorder.id)
+        if offset:
+            workorders = workorders.offset(offset)
+        if limit is not None:
+            workorders = workorders.limit(limit)
         return workorders
 
+    def del_workorders_before(self, cutoff: datetime, session=None) -> int:
+        """
+        Deletes the Workorders received before cutoff.  Returns how many were deleted.
+        """
+        session = session or self._session_on_init_thread
+
+        deleted = session.query(Workorder).filter(Workorder.created_at < cutoff).delete()
+        session.commit()
+
+        return deleted
+
     def del_workorders(self, arrangement_id: bytes, session=None):
         """
         Deletes a Workorder from the Keystore.
@@ -196,3 +260,52 @@ class KeyStore(object):
         session.commit()
 
         return deleted
+
+    def add_treasure_map(self, treasure_map_id: bytes, treasure_map: bytes, expiration=None, session=None) -> TreasureMap:
+        """
+        Stores a TreasureMap, replacing any held under the same ID.
+        """
+        session = session or self._session_on_init_thread
+
+        new_treasure_map = session.merge(TreasureMap(treasure_map_id, bytes(treasure_map), expiration))
+        session.commit()
+
+        return new_treasure_map
+
+    def get_treasure_map(self, treasure_map_id: bytes, session=None) -> TreasureMap:
+        """
+        Returns the stored TreasureMap by its ID.
+        """
+        session = session or self._session_on_init_thread
+
+        treasure_map = session.query(TreasureMap).filter_by(id=treasure_map_id).first()
+
+        if not treasure_map:
+            raise NotFound("No TreasureMap {} found.".format(treasure_map_id))
+        return treasure_map
+
+    def del_treasure_map(self, treasure_map_id: bytes, session=None) -> int:
+        """
+        Deletes a TreasureMap from the Keystore.
+        """
+        session = session or self._session_on_init_thread
+
+        deleted = session.query(TreasureMap).filter_by(id=treasure_map_id).delete()
+        session.commit()
+
+        return deleted
+
+    def del_treasure_maps_expired_by(self, cutoff: datetime, session=None) -> int:
+        """
+        Deletes the TreasureMaps whose policies expired before cutoff.  Returns how many were deleted.
+        """
+        session = session or self._session_on_init_thread
+
+        deleted = session.query(TreasureMap).filter(TreasureMap.expiration < cutoff).delete()
+        session.commit()
+
+        return deleted
+
+    def count_treasure_maps(self, session=None) -> int:
+        session = session or self._session_on_init_thread
+        return session.query(TreasureMap).count()
@@ -0,0 +1,152 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import datetime
+from concurrent.futures import Future, ThreadPoolExecutor
+from threading import Lock
+from typing import List, Optional
+
+from twisted.internet import task, threads
+from twisted.logger import Logger
+
+from nucypher.keystore.db.models import Workorder
+from nucypher.keystore.keystore import KeyStore
+from nucypher.keystore.threading import ThreadedSession
+
+
+class WorkOrderLedger:
+    """
+    Ursula's record of the WorkOrders she has carried out, kept in her datastore rather than in memory.
+
+    Recording is write-behind: WorkOrders wait in a small buffer and go to the datastore a batch at a
+    time - on a thread of the ledger's own when the buffer is full, every flush_interval seconds once
+    started, and before any query, so that queries always see everything recorded so far.  A batch that
+    fails to go in is kept for the next flush.  Rows older than retention are pruned on the timed flushes.  Only what identifies a WorkOrder (Bob's key, his receipt signature and the
+    arrangement) is kept; the capsules are not.
+    """
+
+    log = Logger("work-order-ledger")
+
+    def __init__(self,
+                 datastore: KeyStore,
+                 batch_size: int = 100,
+                 flush_interval: float = 5,
+                 retention: datetime.timedelta = None
+                 ) -> None:
+        self.datastore = datastore
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.retention = retention
+
+        self._pending = list()
+        self._pending_lock = Lock()
+        self._flush_lock = Lock()
+        self._flush_task = task.LoopingCall(lambda: threads.deferToThread(self._flush_and_prune))
+        self._flush_deferred = None
+        self._flush_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="work-order-ledger")
+        self._stopped = False
+
+    def record(self, work_order: 'WorkOrder') -> Optional[Future]:
+        """
+        Buffers a WorkOrder.  If that fills the buffer, the flush is set off behind the caller's back,
+        and its Future returned.
+        """
+        workorder = (work_order.bob.stamp.as_umbral_pubkey(),
+                     bytes(work_order.receipt_signature),
+                     work_order.arrangement_id)
+        with self._pending_lock:
+            self._pending.append(workorder)
+            full = len(self._pending) >= self.batch_size
+        if full:
+            if self._stopped:
+                self.flush()
+                return None
+            return self._flush_executor.submit(self.flush)
+
+    def flush(self) -> int:
+        """
+        Writes the buffered WorkOrders to the datastore; returns how many were new to it.
+        """
+        with self._flush_lock:
+            with self._pending_lock:
+                batch, self._pending = self._pending, list()
+            if not batch:
+                return 0
+            try:
+                with ThreadedSession(self.datastore.engine) as session:
+                    return self.datastore.add_workorders(batch, session=session)
+            except Exception:
+                with self._pending_lock:
+                    self._pending[:0] = batch  # Try these again with the next flush.
+                raise
+
+    def prune(self) -> int:
+        if self.retention is None:
+            return 0
+        cutoff = datetime.datetime.utcnow() - self.retention
+        with ThreadedSession(self.datastore.engine) as session:
+            pruned = self.datastore.del_workorders_before(cutoff, session=session)
+        if pruned:
+            self.log.info(f"Pruned {pruned} WorkOrders received before {cutoff}.")
+        return pruned
+
+    def _flush_and_prune(self) -> None:
+        # A failure here would stop the timed flushes for good; log it, and leave it to the next one.
+        try:
+            self.flush()
+            self.prune()
+        except Exception as e:
+            self.log.warn(f"Timed flush of the WorkOrder ledger failed: {e}")
+
+    def _flushing_stopped(self, failure) -> None:
+        self.log.failure("Timed flushes of the WorkOrder ledger stopped", failure=failure)
+
+    def start(self) -> None:
+        if not self._flush_task.running:
+            self._flush_deferred = self._flush_task.start(interval=self.flush_interval, now=False)
+            self._flush_deferred.addErrback(self._flushing_stopped)
+
+    def stop(self) -> None:
+        """
+        Flushes one last time and lets the flush thread go; anything recorded after this is flushed inline.
+        """
+        if self._flush_task.running:
+            self._flush_task.stop()
+        self._stopped = True
+        self.flush()
+        self._flush_executor.shutdown(wait=True)
+
+    def work_orders(self, bob=None, arrangement_id: bytes = None, limit: int = None, offset: int = 0) -> List[Workorder]:
+        """
+        The recorded Workorders, oldest first, optionally only Bob's and/or only for one arrangement,
+        a page of limit at a time.
+        """
+        self.flush()
+        bob_pubkey_sig = bob.stamp.as_umbral_pubkey() if bob else None
+        with ThreadedSession(self.datastore.engine) as session:
+            return self.datastore.get_workorders(arrangement_id=arrangement_id,
+                                                 bob_pubkey_sig=bob_pubkey_sig,
+                                                 limit=limit,
+                                                 offset=offset,
+                                                 session=session).all()
+
+    def __len__(self) -> int:
+        # Counted without flushing, so this is cheap enough to ask from the reactor; a retried
+        # WorkOrder still in the buffer may be counted twice.
+        with self._pending_lock:
+            pending = len(self._pending)
+        with ThreadedSession(self.datastore.engine) as session:
+            return self.datastore.get_workorders(session=session).count() + pending
@@ -14,18 +14,50 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
+from threading import Lock, RLock
+from weakref import WeakKeyDictionary
+
 from sqlalchemy.orm import sessionmaker, scoped_session
+from sqlalchemy.pool import StaticPool
 
 
 class ThreadedSession:
+    """
+    A session of its own for the calling thread.
+
+    An in-memory database lives on a single connection (a StaticPool) which every thread shares,
+    so sessions on one are taken one at a time; otherwise they'd interleave on that connection
+    and tangle each other's transactions.
+    """
+
+    _shared_connection_locks = WeakKeyDictionary()
+    _locks_lock = Lock()
 
     def __init__(self, sqlalchemy_engine) -> None:
         self.engine = sqlalchemy_engine
+        self._lock = self._shared_connection_lock(sqlalchemy_engine)
+
+    @classmethod
+    def _shared_connection_lock(cls, engine):
+        if not isinstance(engine.pool, StaticPool):
+            return None
+        with cls._locks_lock:
+            try:
+                return cls._shared_connection_locks[engine]
+            except KeyError:
+                lock = cls._shared_connection_locks[engine] = RLock()  # A session may be opened within another.
+                return lock
 
     def __enter__(self):
+        if self._lock:
+            self._lock.acquire()
         session_factory = sessionmaker(bind=self.engine)
         self.session = scoped_session(session_factory)
         return self.session
 
     def __exit__(self, exc_type, exc_val, exc_tb):
-        self.session.remove()
\ No newline at end of file
+        try:
+            self.session.remove()
+        finally:
+            if self._lock:
+                self._lock.release()
@@ -0,0 +1,153 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+import datetime
+import time
+from typing import Optional, Tuple
+
+import maya
+
+from nucypher.keystore.keystore import KeyStore, NotFound
+from nucypher.keystore.threading import ThreadedSession
+from nucypher.utilities.caching import LRUCache
+
+
+class TreasureMapStore:
+    """
+    The TreasureMaps Ursula holds for others, kept in her datastore with the most recently used
+    ones in memory, decoded.  Behaves enough like a dict - keyed as before, by the keccak digest
+    of the map's public ID - to stand in for one.
+
+    A map given with an expiration (that of its policy) is forgotten once that's passed: lazily
+    as it's looked up, and in sweeps of the datastore at most every prune_interval seconds.
+    """
+
+    _NOTHING = object()
+
+    def __init__(self, datastore: KeyStore, cache_size: int = 1000, prune_interval: float = 60) -> None:
+        self.datastore = datastore
+        self.cache = LRUCache(max_size=cache_size)  # key -> (TreasureMap, expiration or None)
+        self.prune_interval = prune_interval
+        self._last_pruned = time.monotonic()
+
+    def store(self, key: bytes, treasure_map: 'TreasureMap', expiration: maya.MayaDT = None) -> bool:
+        """
+        Holds on to a TreasureMap; returns False if we already had it (though a later expiration is still noted).
+        """
+        self._prune_if_due()
+
+        held_map, held_expiration = self._lookup(key)
+        if held_map is not None and bytes(held_map) == bytes(treasure_map):
+            if expiration and held_expiration and expiration > held_expiration:
+                self._write(key, treasure_map, expiration)
+            return False
+
+        self._write(key, treasure_map, expiration)
+        return True
+
+    def _write(self, key: bytes, treasure_map: 'TreasureMap', expiration: maya.MayaDT = None) -> None:
+        expiration_as_datetime = expiration.datetime(naive=True) if expiration else None
+        with ThreadedSession(self.datastore.engine) as session:
+            self.datastore.add_treasure_map(key, bytes(treasure_map), expiration_as_datetime, session=session)
+        self.cache.put(key, (treasure_map, expiration))
+
+    def _lookup(self, key: bytes):
+        """
+        The (TreasureMap, expiration) held under this key, from memory or the datastore; (None, None) if
+        there's none, or only an expired one.
+        """
+        cached = self.cache.get(key)
+        if cached is None:
+            from nucypher.policy.models import TreasureMap  # Avoid circular import
+
+            try:
+                with ThreadedSession(self.datastore.engine) as session:
+                    row = self.datastore.get_treasure_map(key, session=session)
+                    treasure_map_bytes, expiration = row.treasure_map, row.expiration
+            except NotFound:
+                return None, None
+            expiration = maya.MayaDT.from_datetime(expiration) if expiration else None
+            cached = TreasureMap.from_bytes(treasure_map_bytes, verify=False), expiration
+            self.cache.put(key, cached)
+
+        treasure_map, expiration = cached
+        if expiration and expiration < maya.now():
+            self.pop(key)
+            return None, None
+        return treasure_map, expiration
+
+    def _prune_if_due(self) -> None:
+        if time.monotonic() - self._last_pruned >= self.prune_interval:
+            self.prune()
+
+    def prune(self) -> int:
+        """
+        Forgets every TreasureMap whose policy has expired; returns how many there were.
+        """
+        self._last_pruned = time.monotonic()
+        now = maya.now()
+        self.cache.invalidate_where(lambda _key, held: bool(held[1]) and held[1] < now)
+        with ThreadedSession(self.datastore.engine) as session:
+            return self.datastore.del_treasure_maps_expired_by(datetime.datetime.utcnow(), session=session)
+
+    def get_with_expiration(self, key: bytes) -> Tuple[Optional['TreasureMap'], Optional[maya.MayaDT]]:
+        """
+        The TreasureMap held under this key and the expiration of its policy, if we were given one;
+        (None, None) if there's no such map.
+        """
+        return self._lookup(key)
+
+    def get(self, key: bytes, default=None):
+        treasure_map, _expiration = self._lookup(key)
+        return default if treasure_map is None else treasure_map
+
+    def pop(self, key: bytes, default=_NOTHING):
+        treasure_map, _expiration = self.cache.pop(key, (None, None))
+        with ThreadedSession(self.datastore.engine) as session:
+            if treasure_map is None:
+                try:
+                    row = self.datastore.get_treasure_map(key, session=session)
+                except NotFound:
+                    row = None
+                if row is not None:
+                    from nucypher.policy.models import TreasureMap  # Avoid circular import
+                    treasure_map = TreasureMap.from_bytes(row.treasure_map, verify=False)
+            self.datastore.del_treasure_map(key, session=session)
+
+        if treasure_map is None:
+            if default is self._NOTHING:
+                raise KeyError(key)
+            return default
+        return treasure_map
+
+    def __getitem__(self, key: bytes) -> 'TreasureMap':
+        treasure_map = self.get(key)
+        if treasure_map is None:
+            raise KeyError(key)
+        return treasure_map
+
+    def __setitem__(self, key: bytes, treasure_map: 'TreasureMap') -> None:
+        self.store(key, treasure_map)
+
+    def __contains__(self, key: bytes) -> bool:
+        return self.get(key) is not None
+
+    def __len__(self) -> int:
+        with ThreadedSession(self.datastore.engine) as session:
+            return self.datastore.count_treasure_maps(session=session)
+
+    def stats(self) -> dict:
+        return self.cache.stats()
@@ -14,4 +14,5 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
-LEARNING_LOOP_VERSION = 1
+# 2: New fleet state checksums and signed node payloads; teachers may answer with a FLEET_STATE_DELTA.
+LEARNING_LOOP_VERSION = 2
@@ -0,0 +1,115 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from typing import Iterator, Optional
+
+from nucypher.crypto.api import keccak_digest
+
+
+class _Branch:
+    __slots__ = ("key", "priority", "leaf", "left", "right", "digest")
+
+    def __init__(self, key: str, leaf: bytes) -> None:
+        self.key = key
+        self.priority = keccak_digest(key.encode())
+        self.leaf = leaf
+        self.left = None
+        self.right = None
+        self.digest = None
+
+
+class FleetDigest:
+    """
+    A Merkle tree over (checksum address, node digest) pairs, kept in address order.
+
+    The tree is a treap whose priorities are derived from the addresses themselves, so its shape -
+    and therefore its root - depends only on the set of pairs and not on the order in which they
+    were learned.  Any two nodes who know the same fleet agree on its digest, and adding or updating
+    a single node only rehashes the branches on its path to the root.
+    """
+
+    EMPTY = bytes(32)
+
+    def __init__(self) -> None:
+        self._root = None  # type: Optional[_Branch]
+        self._size = 0
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __bool__(self) -> bool:
+        return self._root is not None
+
+    @property
+    def root(self) -> bytes:
+        return self._root.digest if self._root else self.EMPTY
+
+    def keys(self) -> Iterator[str]:
+        """
+        Every address in the tree, in order, without sorting anything.
+        """
+        stack, branch = list(), self._root
+        while stack or branch:
+            while branch:
+                stack.append(branch)
+                branch = branch.left
+            branch = stack.pop()
+            yield branch.key
+            branch = branch.right
+
+    def put(self, key: str, leaf: bytes) -> None:
+        self._root = self._put(self._root, key, leaf)
+
+    def _rehash(self, branch: _Branch) -> _Branch:
+        left = branch.left.digest if branch.left else self.EMPTY
+        right = branch.right.digest if branch.right else self.EMPTY
+        branch.digest = keccak_digest(left, branch.leaf, right)
+        return branch
+
+    def _put(self, branch: Optional[_Branch], key: str, leaf: bytes) -> _Branch:
+        if branch is None:
+            self._size += 1
+            return self._rehash(_Branch(key, leaf))
+
+        if key == branch.key:
+            if branch.leaf == leaf:
+                return branch  # Nothing changed; nor does anything above us.
+            branch.leaf = leaf
+
+        elif key < branch.key:
+            branch.left = self._put(branch.left, key, leaf)
+            if branch.left.priority > branch.priority:
+                return self._rotate_right(branch)
+
+        else:
+            branch.right = self._put(branch.right, key, leaf)
+            if branch.right.priority > branch.priority:
+                return self._rotate_left(branch)
+
+        return self._rehash(branch)
+
+    def _rotate_right(self, branch: _Branch) -> _Branch:
+        pivot = branch.left
+        branch.left = pivot.right
+        pivot.right = self._rehash(branch)
+        return self._rehash(pivot)
+
+    def _rotate_left(self, branch: _Branch) -> _Branch:
+        pivot = branch.right
+        branch.right = pivot.left
+        pivot.left = self._rehash(branch)
+        return self._rehash(pivot)
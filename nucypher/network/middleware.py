@@ -16,6 +16,9 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 import socket
 import ssl
+from collections import OrderedDict
+from threading import Lock
+from typing import Callable
 
 import requests
 import time
@@ -26,7 +29,9 @@ from umbral.cfrags import CapsuleFrag
 from umbral.signing import Signature
 from constant_sorrow.constants import CERTIFICATE_NOT_SAVED
 
-from bytestring_splitter import BytestringSplitter, VariableLengthBytestring
+from bytestring_splitter import BytestringSplitter, BytestringSplittingError, VariableLengthBytestring, \
+    VARIABLE_HEADER_LENGTH
+from requests.adapters import HTTPAdapter
 
 
 class UnexpectedResponse(Exception):
@@ -37,9 +42,133 @@ class NotFound(UnexpectedResponse):
     pass
 
 
+class PinnedSSLContext(ssl.SSLContext):
+    """
+    An SSLContext which trusts only the certificates it is explicitly given,
+    even when urllib3 asks it to load the system's default certificates.
+    """
+
+    def load_default_certs(self, purpose=ssl.Purpose.SERVER_AUTH):
+        pass
+
+
+class PinnedCertificateAdapter(HTTPAdapter):
+    """
+    Connects to a single node, trusting only its pinned certificate.
+
+    The SSLContext is built once, when the adapter is, rather than the
+    certificate file being re-read for every new connection.
+    """
+
+    def __init__(self, certificate_filepath: str, *args, **kwargs) -> None:
+        self.certificate_filepath = certificate_filepath
+        self.ssl_context = PinnedSSLContext(ssl.PROTOCOL_TLS_CLIENT)
+        self.ssl_context.load_verify_locations(cafile=certificate_filepath)
+        super().__init__(*args, **kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs['ssl_context'] = self.ssl_context
+        return super().init_poolmanager(*args, **kwargs)
+
+    def cert_verify(self, conn, url, verify, cert):
+        # Verification is the business of our own SSLContext; don't let the pool point it at a CA bundle.
+        conn.cert_reqs = 'CERT_REQUIRED'
+        conn.ca_certs = None
+        conn.ca_cert_dir = None
+
+
+class NodeConnectionPool:
+    """
+    Keep-alive sessions to the nodes we talk to, one per node - by checksum address, or by host and port
+    where that's all we know of it - each pinned to the certificate it was made with.
+
+    Sessions left idle for `idle_timeout` seconds are closed, as are the least recently used ones
+    whenever keeping them all would mean holding more than `max_sockets` sockets open.
+    """
+
+    def __init__(self, max_sockets: int, sockets_per_node: int, idle_timeout: float) -> None:
+        if max_sockets < sockets_per_node:
+            raise ValueError("A NodeConnectionPool needs room for at least one node's sockets.")
+        self.max_sockets = max_sockets
+        self.sockets_per_node = sockets_per_node
+        self.idle_timeout = idle_timeout
+        self._sessions = OrderedDict()  # node key -> (certificate filepath, session, last used)
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+    def __contains__(self, node_key: str) -> bool:
+        return node_key in self._sessions
+
+    def session(self, node_key: str, certificate_filepath: str) -> requests.Session:
+        now = time.monotonic()
+        with self._lock:
+            self._evict_idle(now)
+            try:
+                pinned_filepath, session, _last_used = self._sessions.pop(node_key)
+            except KeyError:
+                session = None
+            else:
+                if pinned_filepath != certificate_filepath:
+                    # The node has a new certificate; connections made under the old one won't do.
+                    session.close()
+                    session = None
+
+            if session is None:
+                session = self._new_session(certificate_filepath)
+
+            self._sessions[node_key] = (certificate_filepath, session, now)
+            while len(self._sessions) * self.sockets_per_node > self.max_sockets:
+                _address, (_filepath, lru_session, _last_used) = self._sessions.popitem(last=False)
+                lru_session.close()
+            return session
+
+    def _new_session(self, certificate_filepath: str) -> requests.Session:
+        adapter = PinnedCertificateAdapter(certificate_filepath,
+                                           pool_connections=1,
+                                           pool_maxsize=self.sockets_per_node)
+        session = requests.Session()
+        session.mount("https://", adapter)
+        return session
+
+    def _evict_idle(self, now: float) -> None:
+        while self._sessions:
+            node_key, (_filepath, session, last_used) = next(iter(self._sessions.items()))
+            if now - last_used < self.idle_timeout:
+                break
+            del self._sessions[node_key]
+            session.close()
+
+    def forget(self, node_key: str) -> None:
+        with self._lock:
+            try:
+                _filepath, session, _last_used = self._sessions.pop(node_key)
+            except KeyError:
+                return
+        session.close()
+
+    def close(self) -> None:
+        with self._lock:
+            sessions, self._sessions = self._sessions, OrderedDict()
+        for _filepath, session, _last_used in sessions.values():
+            session.close()
+
+
 class NucypherMiddlewareClient:
     library = requests
     timeout = 1.2
+    max_open_sockets = 256
+    sockets_per_node = 2
+    idle_connection_timeout = 60
+
+    def __init__(self, pool_connections: bool = True) -> None:
+        if pool_connections:
+            self.connections = NodeConnectionPool(max_sockets=self.max_open_sockets,
+                                                  sockets_per_node=self.sockets_per_node,
+                                                  idle_timeout=self.idle_connection_timeout)
+        else:
+            self.connections = None
 
     @staticmethod
     def response_cleaner(response):
@@ -59,6 +188,18 @@ class NucypherMiddlewareClient:
 
         return host, certificate_filepath, self.library
 
+    def connection_for(self, node, host, certificate_filepath, http_client):
+        """
+        The node's pooled, certificate-pinned session, if we can keep one for it; otherwise http_client as is.
+        A node we only know by host and port (as when verifying it) is pooled under those.
+        """
+        if self.connections is None:
+            return http_client
+        if not certificate_filepath or certificate_filepath is CERTIFICATE_NOT_SAVED:
+            return http_client
+        node_key = node.checksum_public_address if node else host
+        return self.connections.session(node_key, certificate_filepath)
+
     def invoke_method(self, method, url, *args, **kwargs):
         self.clean_params(kwargs)
         if not kwargs.get("timeout"):
@@ -95,6 +236,7 @@ class NucypherMiddlewareClient:
             else:
                 certificate_filepath = node_certificate_filepath
 
+            http_client = self.connection_for(node, host, certificate_filepath, http_client)
             method = getattr(http_client, method_name)
 
             url = f"https://{host}/{path}"
@@ -152,6 +294,16 @@ class RestMiddleware:
                                     )
         return response
 
+    def enact_arrangement(self, arrangement, payload):
+        """
+        Proposes the arrangement to its Ursula and hands her its kfrag (the encrypted payload) in a single request.
+        """
+        response = self.client.post(node=arrangement.ursula,
+                                    path="enact_arrangement",
+                                    data=bytes(VariableLengthBytestring(bytes(arrangement))) + payload,
+                                    timeout=2)
+        return response
+
     def enact_policy(self, ursula, kfrag_id, payload):
         response = self.client.post(node=ursula,
                                     path=f'kFrag/{kfrag_id.hex()}',
@@ -159,13 +311,42 @@ class RestMiddleware:
                                     timeout=2)
         return True, ursula.stamp.as_umbral_pubkey()
 
-    def reencrypt(self, work_order):
+    def reencrypt(self, work_order, on_cfrag: Callable = None):
         ursula_rest_response = self.send_work_order_payload_to_ursula(work_order)
-        splitter = BytestringSplitter((CapsuleFrag, VariableLengthBytestring), Signature)
-        cfrags_and_signatures = splitter.repeat(ursula_rest_response.content)
-        cfrags = work_order.complete(cfrags_and_signatures)
+        cfrags_and_signatures = self.split_cfrags_and_signatures(ursula_rest_response)
+        cfrags = work_order.complete(cfrags_and_signatures, on_cfrag=on_cfrag)
         return cfrags
 
+    @staticmethod
+    def split_cfrags_and_signatures(ursula_rest_response):
+        """
+        Yields each (cfrag, signature) from Ursula's streamed response as soon as all of its bytes are in.
+        """
+        splitter = BytestringSplitter((CapsuleFrag, VariableLengthBytestring), Signature)
+        signature_length = Signature.expected_bytes_length()
+
+        buffer, offset = bytearray(), 0
+        try:
+            for chunk in ursula_rest_response.iter_content(chunk_size=None):
+                buffer += chunk
+                while len(buffer) - offset >= VARIABLE_HEADER_LENGTH:
+                    cfrag_length = int.from_bytes(buffer[offset:offset + VARIABLE_HEADER_LENGTH], "big")
+                    end_of_record = offset + VARIABLE_HEADER_LENGTH + cfrag_length + signature_length
+                    if len(buffer) < end_of_record:
+                        break  # Not all here yet.
+                    cfrag, signature = splitter(bytes(buffer[offset:end_of_record]))
+                    offset = end_of_record
+                    yield cfrag, signature
+
+                # Let go of the records already split off; what's left is less than one record.
+                del buffer[:offset]
+                offset = 0
+        finally:
+            ursula_rest_response.close()
+
+        if buffer:
+            raise BytestringSplittingError(f"Ursula's response ended partway through a cfrag ({len(buffer)} bytes over).")
+
     def revoke_arrangement(self, ursula, revocation):
         # TODO: Implement revocation confirmations
         response = self.client.delete(
@@ -184,10 +365,12 @@ class RestMiddleware:
                                    timeout=2)
         return response
 
-    def put_treasure_map_on_node(self, node, map_id, map_payload):
+    def put_treasure_map_on_node(self, node, map_id, map_payload, expiration=None):
+        params = {'expiration': expiration.iso8601()} if expiration else None
         response = self.client.post(node=node,
                                     path=f"treasure_map/{map_id}",
                                     data=map_payload,
+                                    params=params,
                                     timeout=2)
         return response
 
@@ -197,7 +380,7 @@ class RestMiddleware:
         return self.client.post(
             node=work_order.ursula,
             path=f"kFrag/{id_as_hex}/reencrypt",
-            data=payload, timeout=2)
+            data=payload, timeout=2, stream=True)
 
     def node_information(self, host, port, certificate_filepath=None):
         response = self.client.get(host=host, port=port,
@@ -210,17 +393,20 @@ class RestMiddleware:
                            node,
                            announce_nodes=None,
                            nodes_i_need=None,
-                           fleet_checksum=None):
+                           fleet_checksum=None,
+                           since_fleet_checksum=None):
         if nodes_i_need:
             # TODO: This needs to actually do something.
             # Include node_ids in the request; if the teacher node doesn't know about the
             # nodes matching these ids, then it will ask other nodes.
             pass
 
+        params = {}
         if fleet_checksum:
-            params = {'fleet': fleet_checksum}
-        else:
-            params = {}
+            params['fleet'] = fleet_checksum
+        if since_fleet_checksum:
+            # The teacher's fleet state we last learned everything from; it may answer with only what changed.
+            params['since'] = since_fleet_checksum
 
         if announce_nodes:
             payload = bytes().join(bytes(VariableLengthBytestring(n)) for n in announce_nodes)
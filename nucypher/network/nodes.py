@@ -16,41 +16,50 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import binascii
+import itertools
 import random
 from collections import defaultdict, OrderedDict
 from collections import deque
 from collections import namedtuple
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from contextlib import suppress
+from functools import partial
+from threading import RLock
 
 from twisted.python.threadpool import ThreadPool
-from typing import Set, Tuple
+from typing import Callable, Set, Tuple
 
 import maya
 import requests
 import time
 from cryptography.x509 import Certificate
 from eth_keys.datatypes import Signature as EthSignature
+from eth_utils import to_canonical_address
 from requests.exceptions import SSLError
 from twisted.internet import reactor, defer
 from twisted.internet import task
-from twisted.internet.threads import deferToThread
+from twisted.internet.threads import deferToThread, deferToThreadPool
 from twisted.logger import Logger
 
 from bytestring_splitter import BytestringSplitter
 from bytestring_splitter import VariableLengthBytestring, BytestringSplittingError
 from constant_sorrow import constant_or_bytes
-from constant_sorrow.constants import NO_KNOWN_NODES, NOT_SIGNED, NEVER_SEEN, NO_STORAGE_AVAILIBLE, FLEET_STATES_MATCH
+from constant_sorrow.constants import NO_KNOWN_NODES, NOT_SIGNED, NEVER_SEEN, NO_STORAGE_AVAILIBLE, FLEET_STATES_MATCH, \
+    FLEET_STATE_DELTA
 from nucypher.config.constants import SeednodeMetadata, GLOBAL_DOMAIN
 from nucypher.config.storages import ForgetfulNodeStorage
 from nucypher.crypto.api import keccak_digest
+from nucypher.crypto.constants import PUBLIC_ADDRESS_LENGTH
 from nucypher.crypto.powers import BlockchainPower, SigningPower, DecryptingPower, NoSigningPower
 from nucypher.crypto.signing import signature_splitter
 from nucypher.network import LEARNING_LOOP_VERSION
 from nucypher.network.exceptions import NodeSeemsToBeDown
+from nucypher.network.fleet_digest import FleetDigest
 from nucypher.network.middleware import RestMiddleware
 from nucypher.network.nicknames import nickname_from_seed
 from nucypher.network.protocols import SuspiciousActivity
 from nucypher.network.server import TLSHostingPower
+from nucypher.network.verification import NodeVerificationQueue
 
 
 def icon_from_checksum(checksum,
@@ -86,17 +95,31 @@ class FleetStateTracker:
     _tracking = False
     most_recent_node_change = NO_KNOWN_NODES
     snapshot_splitter = BytestringSplitter(32, 4)
+    delta_splitter = BytestringSplitter(32, (int, 4, {"byteorder": "big"}))
     log = Logger("Learning")
     state_template = namedtuple("FleetState", ("nickname", "metadata", "icon", "nodes", "updated"))
+    state_record_template = namedtuple("FleetStateRecord",
+                                       ("checksum", "nickname", "metadata", "icon", "updated", "diff"))
+    _MAX_RETAINED_STATES = 100
 
-    def __init__(self):
+    def __init__(self, max_retained_states: int = None):
         self.additional_nodes_to_track = []
         self.updated = maya.now()
         self._nodes = OrderedDict()
+        self._digest = FleetDigest()
+
+        # Each retained state is kept as its metadata and a diff (address -> node added or updated)
+        # against its predecessor; _base_nodes is the fleet as it was just before the oldest of them.
+        self.max_retained_states = max_retained_states or self._MAX_RETAINED_STATES
         self.states = OrderedDict()
+        self._base_nodes = dict()
+        self._unrecorded_changes = dict()
+
+        self._signed_payloads = dict()
+        self._signed_payloads_lock = RLock()
 
     def __setitem__(self, key, value):
-        self._nodes[key] = value
+        self._remember(key, value)
 
         if self._tracking:
             self.log.info("Updating fleet state after saving node {}".format(value))
@@ -107,6 +130,20 @@ class FleetStateTracker:
     def __getitem__(self, item):
         return self._nodes[item]
 
+    def _remember(self, checksum_address, node):
+        self._nodes[checksum_address] = node
+        self._digest.put(checksum_address, keccak_digest(bytes(node)))
+        self._unrecorded_changes[checksum_address] = node
+
+    def update(self, nodes: dict):
+        """
+        Remembers many nodes, keyed by checksum address, while recording at most one new fleet state.
+        """
+        for checksum_address, node in nodes.items():
+            self._remember(checksum_address, node)
+        if self._tracking:
+            self.record_fleet_state()
+
     def __bool__(self):
         return bool(self._nodes)
 
@@ -161,30 +198,160 @@ class FleetStateTracker:
         fleet_state_updated_bytes = self.updated.epoch.to_bytes(4, byteorder="big")
         return fleet_state_checksum_bytes + fleet_state_updated_bytes
 
+    def _signed(self, kind, build_payload: Callable, stamp) -> bytes:
+        """
+        Signs (and remembers) a payload describing the current fleet state;
+        it is built at most once until record_fleet_state produces a new state.
+        Payloads carrying the teacher's own bytes have a digest of them in their kind,
+        so that a teacher whose own metadata changes doesn't keep serving the old.
+        """
+        with self._signed_payloads_lock:
+            try:
+                return self._signed_payloads[kind]
+            except KeyError:
+                payload = build_payload()
+                signed_payload = bytes(stamp(payload)) + payload
+                self._signed_payloads[kind] = signed_payload
+                return signed_payload
+
+    def signed_payload(self, stamp, this_node_bytes: Callable) -> bytes:
+        """
+        The signed snapshot and serialized nodes served by a teacher at /node_metadata.
+        """
+        own_bytes = this_node_bytes()
+
+        def build_payload():
+            payload = self.snapshot()
+            payload += bytes().join(bytes(VariableLengthBytestring(n)) for n in self)
+            payload += bytes(VariableLengthBytestring(own_bytes))
+            return payload
+        return self._signed(kind=("nodes", keccak_digest(own_bytes)), build_payload=build_payload, stamp=stamp)
+
+    def signed_states_match(self, stamp) -> bytes:
+        """
+        The signed reply to a learner who already knows the current fleet state.
+        """
+        def build_payload():
+            return self.snapshot() + bytes(FLEET_STATES_MATCH)
+        return self._signed(kind="states_match", build_payload=build_payload, stamp=stamp)
+
+    def base_state_for_delta(self, since: str) -> str:
+        """
+        The fleet state a learner asked to be sent a delta since, if we still remember it (and it isn't
+        the current one); otherwise None, and the learner needs the full snapshot.
+        """
+        if since and since != self.checksum and since in self.states:
+            return since
+        return None
+
+    def signed_delta(self, since: str, stamp, this_node_bytes: Callable) -> bytes:
+        """
+        The signed difference between the fleet state with checksum `since` and the current one:
+        the nodes which were added or updated.  (Nodes are never forgotten, so none are ever removed.)
+
+        The teacher's own bytes always ride along, as they do in the full payload.
+        """
+        own_bytes = this_node_bytes()
+
+        def build_payload():
+            changes = self.changes_since(since)
+            changed_nodes = [changes[address] for address in sorted(changes)]
+
+            payload = self.snapshot() + bytes(FLEET_STATE_DELTA)
+            payload += binascii.unhexlify(since) + len(self._digest).to_bytes(4, byteorder="big")
+            payload += bytes().join(bytes(VariableLengthBytestring(n)) for n in changed_nodes)
+            payload += bytes(VariableLengthBytestring(own_bytes))
+            return payload
+        return self._signed(kind=("delta", since, keccak_digest(own_bytes)), build_payload=build_payload, stamp=stamp)
+
+    @classmethod
+    def split_delta(cls, delta_payload: bytes) -> Tuple[str, int, bytes]:
+        """
+        Splits what follows FLEET_STATE_DELTA into the checksum of the base state, the number of nodes
+        in the teacher's current state, and the payload of changed nodes.
+        """
+        since_bytes, number_of_nodes, node_payload = cls.delta_splitter(delta_payload, return_remainder=True)
+        return since_bytes.hex(), number_of_nodes, node_payload
+
     def record_fleet_state(self, additional_nodes_to_track=None):
         if additional_nodes_to_track:
             self.additional_nodes_to_track.extend(additional_nodes_to_track)
+
+        # Nodes we track but don't keep (like ourselves) may have changed since last time.
+        for node in self.additional_nodes_to_track:
+            root_before = self._digest.root
+            self._digest.put(node.checksum_public_address, keccak_digest(bytes(node)))
+            if self._digest.root != root_before:
+                self._unrecorded_changes[node.checksum_public_address] = node
+
         if not self._nodes:
             # No news here.
             return
-        sorted_nodes = self.sorted()
 
-        sorted_nodes_joined = b"".join(bytes(n) for n in sorted_nodes)
-        checksum = keccak_digest(sorted_nodes_joined).hex()
+        checksum = self._digest.root.hex()
         if checksum not in self.states:
-            self.checksum = keccak_digest(b"".join(bytes(n) for n in self.sorted())).hex()
+            self.checksum = checksum
             self.updated = maya.now()
-            # For now we store the sorted node list.  Someday we probably spin this out into
-            # its own class, FleetState, and use it as the basis for partial updates.
-            new_state = self.state_template(nickname=self.nickname,
-                                            metadata=self.nickname_metadata,
-                                            nodes=sorted_nodes,
-                                            icon=self.icon,
-                                            updated=self.updated,
-                                            )
+            new_state = self.state_record_template(checksum=checksum,
+                                                   nickname=self.nickname,
+                                                   metadata=self.nickname_metadata,
+                                                   icon=self.icon,
+                                                   updated=self.updated,
+                                                   diff=self._unrecorded_changes,
+                                                   )
+            self._unrecorded_changes = dict()
             self.states[checksum] = new_state
+
+            while len(self.states) > self.max_retained_states:
+                _oldest_checksum, oldest_state = self.states.popitem(last=False)
+                self._apply_diff(self._base_nodes, oldest_state.diff)
+
+            with self._signed_payloads_lock:
+                self._signed_payloads.clear()
             return checksum, new_state
 
+    @staticmethod
+    def _apply_diff(nodes: dict, diff: dict) -> None:
+        nodes.update(diff)
+
+    def materialize_state(self, checksum: str) -> 'FleetStateTracker.state_template':
+        """
+        Rebuilds a retained fleet state, including its sorted nodes, from the oldest one we remember forward.
+        Raises KeyError if the state is not (or no longer) retained.
+        """
+        if checksum not in self.states:
+            raise KeyError(checksum)
+        nodes = dict(self._base_nodes)
+        for recorded_checksum, state in self.states.items():
+            self._apply_diff(nodes, state.diff)
+            if recorded_checksum == checksum:
+                sorted_nodes = [nodes[address] for address in sorted(nodes)]
+                return self.state_template(nickname=state.nickname,
+                                           metadata=state.metadata,
+                                           icon=state.icon,
+                                           nodes=sorted_nodes,
+                                           updated=state.updated)
+
+    def changes_since(self, checksum: str) -> dict:
+        """
+        Every node added or updated in the retained states which followed this one.
+        """
+        if checksum not in self.states:
+            raise KeyError(checksum)
+        changes = dict()
+        later_states = itertools.dropwhile(lambda item: item[0] != checksum, self.states.items())
+        next(later_states)
+        for _checksum, state in later_states:
+            changes.update(state.diff)
+        return changes
+
+    def previous_states(self, number: int = None) -> list:
+        """
+        The metadata of the retained fleet states, most recent first.
+        """
+        states = list(reversed(self.states.values()))
+        return states[:number] if number else states
+
     def start_tracking_state(self, additional_nodes_to_track=None):
         if additional_nodes_to_track is None:
             additional_nodes_to_track = list()
@@ -193,18 +360,34 @@ class FleetStateTracker:
         self.update_fleet_state()
 
     def sorted(self):
-        nodes_to_consider = list(self._nodes.values()) + self.additional_nodes_to_track
-        return sorted(nodes_to_consider, key=lambda n: n.checksum_public_address)
+        # The digest already keeps every address we track in order.
+        nodes = dict(self._nodes)
+        for node in self.additional_nodes_to_track:
+            nodes.setdefault(node.checksum_public_address, node)
+        return [nodes[address] for address in self._digest.keys()]
 
     def shuffled(self):
         nodes_we_know_about = list(self._nodes.values())
         random.shuffle(nodes_we_know_about)
         return nodes_we_know_about
 
+    def nearest(self, key: bytes, quantity: int = None) -> list:
+        """
+        The nodes we know, nearest first to (the digest of) key, by XOR distance to their canonical addresses.
+        Anyone who knows the same nodes will find the same ones nearest to the same key.
+        """
+        target = int.from_bytes(keccak_digest(key)[:PUBLIC_ADDRESS_LENGTH], "big")
+
+        def distance(node):
+            return target ^ int.from_bytes(to_canonical_address(node.checksum_public_address), "big")
+
+        nodes_by_distance = sorted(self._nodes.values(), key=distance)
+        return nodes_by_distance if quantity is None else nodes_by_distance[:quantity]
+
     def abridged_states_dict(self):
         abridged_states = {}
-        for k, v in self.states.items():
-            abridged_states[k] = self.abridged_state_details(v)
+        for state in reversed(self.previous_states()):
+            abridged_states[state.checksum] = self.abridged_state_details(state)
 
         return abridged_states
 
@@ -253,6 +436,12 @@ class Learner:
     _LONG_LEARNING_DELAY = 90
     LEARNING_TIMEOUT = 10
     _ROUNDS_WITHOUT_NODES_AFTER_WHICH_TO_SLOW_DOWN = 10
+    _LEARNING_THREADS = 1  # Rounds don't overlap; this only keeps teachers' latency off the reactor.
+    _TEACHERS_PER_ROUND = 3
+    _RESPONSIVENESS_SMOOTHING = 0.3
+    _MINIMUM_TEACHER_WEIGHT = 0.05
+    _VERIFICATION_WORKERS = 16
+    _VERIFICATIONS_PER_HOST = 4
 
     # For Keeps
     __DEFAULT_NODE_STORAGE = ForgetfulNodeStorage
@@ -262,6 +451,11 @@ class Learner:
     node_splitter = BytestringSplitter(VariableLengthBytestring)
     version_splitter = BytestringSplitter((int, 2, {"byteorder": "big"}))
     tracker_class = FleetStateTracker
+    answer_template = namedtuple("Answer", ("teacher", "seconds", "checksum", "updated",
+                                            "number_of_teachers_nodes", "nodes_taught"))
+    lesson_template = namedtuple("Lesson", ("answers", "nodes_to_remember", "unsettled_addresses"))
+    knowledge_template = namedtuple("Knowledge", ("fleet_checksum", "timestamps", "fleet_states_learned_from_teachers",
+                                                  "nodes_i_need"))
 
     invalid_metadata_message = "{} has invalid metadata.  Maybe its stake is over?  Or maybe it is transitioning to a new interface.  Ignoring."
     unknown_version_message = "{} purported to be of version {}, but we're only version {}.  Is there a new version of NuCypher?"
@@ -307,6 +501,10 @@ class Learner:
         self._abort_on_learning_error = abort_on_learning_error
         self._learning_listeners = defaultdict(list)
         self._node_ids_to_learn_about_immediately = set()
+        self._fleet_states_learned_from_teachers = dict()  # teacher address -> checksum of its fully-applied state
+        self._teacher_responsiveness = dict()  # teacher address -> moving average of 1 / (1 + seconds to answer)
+        self.verification_queue = NodeVerificationQueue(workers=self._VERIFICATION_WORKERS,
+                                                        per_host=self._VERIFICATIONS_PER_HOST)
 
         self.__known_nodes = self.tracker_class()
 
@@ -335,6 +533,9 @@ class Learner:
         self.teacher_nodes = deque()
         self._current_teacher_node = None  # type: Teacher
         self._learning_task = task.LoopingCall(self.keep_learning_about_nodes)
+        self._lesson_in_progress = None  # The Deferred of the background learning round underway, if any.
+        self._learning_thread_pool = ThreadPool(minthreads=1, maxthreads=self._LEARNING_THREADS, name="learning")
+        self._learning_thread_pool_trigger = None
         self._learning_round = 0  # type: int
         self._rounds_without_new_nodes = 0  # type: int
         self._seed_nodes = seed_nodes or []
@@ -392,15 +593,27 @@ class Learner:
             self.remember_node(node)
 
     def remember_node(self, node, force_verification_check=False, record_fleet_state=True):
+        if not self._prepare_to_remember(node, force_verification_check=force_verification_check):
+            return False
+        return self._commit_to_memory(node, record_fleet_state=record_fleet_state)
 
+    def _prepare_to_remember(self, node, force_verification_check=False, known_timestamps: dict = None) -> bool:
+        """
+        The blocking part of remembering a node: storing its certificate and verifying it.
+        Returns whether the node is (still) worth committing to memory.  Away from the reactor,
+        pass known_timestamps - a snapshot of when the nodes we know were last updated - to check against.
+        """
         if node == self:  # No need to remember self.
             return False
 
         # First, determine if this is an outdated representation of an already known node.
         with suppress(KeyError):
-            already_known_node = self.known_nodes[node.checksum_public_address]
-            if not node.timestamp > already_known_node.timestamp:
-                self.log.debug("Skipping already known node {}".format(already_known_node))
+            if known_timestamps is None:
+                known_timestamp = self.known_nodes[node.checksum_public_address].timestamp
+            else:
+                known_timestamp = known_timestamps[node.checksum_public_address]
+            if not node.timestamp > known_timestamp:
+                self.log.debug("Skipping already known node {}".format(node.checksum_public_address))
                 # This node is already known.  We can safely return.
                 return False
 
@@ -431,6 +644,15 @@ class Learner:
             self.log.info("No Response while trying to verify node {}|{}".format(node.rest_interface, node))
             return False  # TODO: Bucket this node as "ghost" or something: somebody else knows about it, but we can't get to it.
 
+        return True
+
+    def _commit_to_memory(self, node, record_fleet_state=True):
+        # Another round may have taught us a newer version of this node in the meantime.
+        with suppress(KeyError):
+            already_known_node = self.known_nodes[node.checksum_public_address]
+            if not node.timestamp > already_known_node.timestamp:
+                return False
+
         listeners = self._learning_listeners.pop(node.checksum_public_address, tuple())
         address = node.checksum_public_address
 
@@ -463,6 +685,7 @@ class Learner:
                 self.load_seednodes()
 
             self.learn_from_teacher_node()
+            self._start_learning_thread_pool()
             self.learning_deferred = self._learning_task.start(interval=self._SHORT_LEARNING_DELAY)
             self.learning_deferred.addErrback(self.handle_learning_errors)
             return self.learning_deferred
@@ -475,6 +698,7 @@ class Learner:
                 seeder_deferred.addErrback(self.handle_learning_errors)
                 learning_deferreds.append(seeder_deferred)
 
+            self._start_learning_thread_pool()
             learner_deferred = self._learning_task.start(interval=self._SHORT_LEARNING_DELAY, now=now)
             learner_deferred.addErrback(self.handle_learning_errors)
             learning_deferreds.append(learner_deferred)
@@ -482,11 +706,34 @@ class Learner:
             self.learning_deferred = defer.DeferredList(learning_deferreds)
             return self.learning_deferred
 
+    def _start_learning_thread_pool(self):
+        if self._learning_thread_pool.started:
+            return
+        if self._learning_thread_pool.joined:
+            # Stopped along with an earlier learning loop; a ThreadPool can't be started again.
+            self._learning_thread_pool = ThreadPool(minthreads=1, maxthreads=self._LEARNING_THREADS, name="learning")
+        self._learning_thread_pool.start()
+        if self._learning_thread_pool_trigger is None:
+            self._learning_thread_pool_trigger = reactor.addSystemEventTrigger('during', 'shutdown',
+                                                                               self._stop_learning_thread_pool_with_reactor)
+
+    def _stop_learning_thread_pool(self):
+        if self._learning_thread_pool_trigger is not None:
+            reactor.removeSystemEventTrigger(self._learning_thread_pool_trigger)
+            self._learning_thread_pool_trigger = None
+        if self._learning_thread_pool.started:
+            self._learning_thread_pool.stop()
+
+    def _stop_learning_thread_pool_with_reactor(self):
+        self._learning_thread_pool_trigger = None  # Already firing; nothing to remove.
+        self._stop_learning_thread_pool()
+
     def stop_learning_loop(self, reason=None):
         """
         Only for tests at this point.  Maybe some day for graceful shutdowns.
         """
         self._learning_task.stop()
+        self._stop_learning_thread_pool()
 
     def handle_learning_errors(self, *args, **kwargs):
         failure = args[0]
@@ -510,12 +757,36 @@ class Learner:
         self.log.critical("{} crashed with {}".format(self.checksum_public_address, failure))
 
     def select_teacher_nodes(self):
-        nodes_we_know_about = self.known_nodes.shuffled()
+        nodes_we_know_about = list(self.known_nodes)
 
         if not nodes_we_know_about:
             raise self.NotEnoughTeachers("Need some nodes to start learning from.")
 
-        self.teacher_nodes.extend(nodes_we_know_about)
+        # A weighted shuffle: teachers who have answered quickly tend to come up (from the right) sooner.
+        # Those we haven't asked yet get the benefit of the doubt.
+        def draw(node):
+            weight = max(self._teacher_responsiveness.get(node.checksum_public_address, 1.0),
+                         self._MINIMUM_TEACHER_WEIGHT)
+            return random.random() ** (1 / weight)
+
+        self.teacher_nodes.extend(sorted(nodes_we_know_about, key=draw))
+
+    def _select_teachers(self, number_of_teachers: int) -> list:
+        teachers = list()
+        for _ in range(number_of_teachers):
+            teacher = self.current_teacher_node()
+            if teacher in teachers:
+                break  # We've come around to the start; there aren't that many teachers to be had.
+            teachers.append(teacher)
+            self.cycle_teacher_node()
+        return teachers
+
+    def _note_responsiveness(self, answer) -> None:
+        address = answer.teacher.checksum_public_address
+        sample = 0.0 if answer.nodes_taught is None else 1 / (1 + answer.seconds)
+        previous = self._teacher_responsiveness.get(address, sample)
+        smoothing = self._RESPONSIVENESS_SMOOTHING
+        self._teacher_responsiveness[address] = (1 - smoothing) * previous + smoothing * sample
 
     def cycle_teacher_node(self):
         # To ensure that all the best teachers are available, first let's make sure
@@ -546,6 +817,10 @@ class Learner:
 
     def learn_about_nodes_now(self, force=False):
         if self._learning_task.running:
+            if self._lesson_in_progress is not None:
+                # The round underway will be done soon enough; another alongside it would only race it.
+                self.log.debug("A learning round is already underway; not starting another.")
+                return
             self._learning_task.reset()
             self._learning_task()
         elif not force:
@@ -553,6 +828,7 @@ class Learner:
                 "Learning loop isn't started; can't learn about nodes now.  You can override this with force=True.")
         elif force:
             self.log.info("Learning loop wasn't started; forcing start now.")
+            self._start_learning_thread_pool()
             self._learning_task.start(self._SHORT_LEARNING_DELAY, now=True)
 
     def keep_learning_about_nodes(self):
@@ -560,7 +836,27 @@ class Learner:
         Continually learn about new nodes.
         """
         # TODO: Allow the user to set eagerness?
-        self.learn_from_teacher_node(eager=False)
+        # Teachers are chosen here, on the reactor.  They're asked (and their nodes verified) on the
+        # learning thread pool, and the lesson is only applied back here, on the reactor.
+        teachers = self._start_learning_round(number_of_teachers=self._TEACHERS_PER_ROUND)
+        if not teachers:
+            return
+
+        # What the lesson needs of what we know is taken here, so the learning threads never read it.
+        lesson = deferToThreadPool(reactor,
+                                   self._learning_thread_pool,
+                                   self._receive_lesson,
+                                   teachers=teachers,
+                                   knowledge=self._what_we_know(),
+                                   eager=False)
+        lesson.addCallback(self._apply_lesson)
+        self._lesson_in_progress = lesson
+        lesson.addBoth(self._finish_lesson)
+        return lesson
+
+    def _finish_lesson(self, result):
+        self._lesson_in_progress = None
+        return result
 
     def learn_about_specific_nodes(self, addresses: Set):
         self._node_ids_to_learn_about_immediately.update(addresses)  # hmmmm
@@ -684,17 +980,142 @@ class Learner:
     def write_node_metadata(self, node, serializer=bytes) -> str:
         return self.node_storage.store_node_metadata(node=node)
 
-    def learn_from_teacher_node(self, eager=True):
+    def learn_from_teacher_node(self, eager=True, number_of_teachers=1):
         """
         Sends a request to node_url to find out about known nodes.
         """
+        teachers = self._start_learning_round(number_of_teachers=number_of_teachers)
+        if not teachers:
+            return
+        lesson = self._receive_lesson(teachers=teachers, eager=eager)
+        return self._apply_lesson(lesson)
+
+    def _start_learning_round(self, number_of_teachers=1) -> list:
+        """
+        Counts off a new learning round and picks its teachers; an empty list if there are none to be had.
+        """
         self._learning_round += 1
 
         try:
-            current_teacher = self.current_teacher_node()
+            return self._select_teachers(number_of_teachers)
         except self.NotEnoughTeachers as e:
             self.log.warn("Can't learn right now: {}".format(e.args[0]))
-            return
+            return []
+
+    def _what_we_know(self) -> 'Learner.knowledge_template':
+        """
+        A snapshot of what a learning round needs to know of the nodes we know.
+        """
+        return self.knowledge_template(
+            fleet_checksum=self.known_nodes.checksum,
+            timestamps={node.checksum_public_address: node.timestamp for node in self.known_nodes},
+            fleet_states_learned_from_teachers=dict(self._fleet_states_learned_from_teachers),
+            nodes_i_need=frozenset(self._node_ids_to_learn_about_immediately))
+
+    def _receive_lesson(self, teachers: list, knowledge: 'Learner.knowledge_template' = None, eager=True):
+        """
+        Everything about a learning round which can block: asking the given teachers (concurrently, if more
+        than one) for nodes, then storing their certificates and verifying them.  Our teachers and the nodes
+        we know are left alone here - that is left to _apply_lesson - so that this can run away from the reactor,
+        working from the snapshot of what we know it's given.
+        """
+        knowledge = knowledge or self._what_we_know()
+        if len(teachers) == 1:
+            answers = [self._ask_teacher(teachers[0], knowledge)]
+        else:
+            with ThreadPoolExecutor(max_workers=len(teachers)) as executor:
+                answers = list(executor.map(partial(self._ask_teacher, knowledge=knowledge), teachers))
+
+        if all(answer.nodes_taught is NO_KNOWN_NODES for answer in answers):
+            return NO_KNOWN_NODES
+        nodes_by_teacher = [answer.nodes_taught for answer in answers if isinstance(answer.nodes_taught, list)]
+
+        # Where teachers disagree about a node, the newest version of it is the only one worth verifying.
+        nodes_taught = dict()
+        for node in itertools.chain.from_iterable(nodes_by_teacher):
+            address = node.checksum_public_address
+            if address not in nodes_taught or node.timestamp > nodes_taught[address].timestamp:
+                nodes_taught[address] = node
+
+        # Eagerly verifying a node is a round trip to it.  Those run side by side on the verification queue,
+        # and each node is readied to be remembered as soon as its own verification is in.
+        verifications = dict()
+        for node in nodes_taught.values():
+            if node == self:
+                continue  # No need to learn about ourselves.
+
+            if GLOBAL_DOMAIN not in self.learning_domains:
+                if not set(self.learning_domains).intersection(set(node.serving_domains)):
+                    continue  # This node is not serving any of our domains.
+
+            # First, determine if this is an outdated representation of an already known node.
+            with suppress(KeyError):
+                if not node.timestamp > knowledge.timestamps[node.checksum_public_address]:
+                    self.log.debug("Skipping already known node {}".format(node.checksum_public_address))
+                    # This node is already known.  We can safely continue to the next.
+                    continue
+
+            certificate_filepath = self.node_storage.store_node_certificate(certificate=node.certificate)
+
+            if eager:
+                verification = self.verification_queue.verify(node,
+                                                              network_middleware=self.network_middleware,
+                                                              accept_federated_only=self.federated_only,  # TODO: 466
+                                                              certificate_filepath=certificate_filepath)
+            else:
+                verification = Future()
+                try:
+                    node.validate_metadata(accept_federated_only=self.federated_only)  # TODO: 466
+                except Exception as e:
+                    verification.set_exception(e)
+                else:
+                    verification.set_result(node)
+            verifications[verification] = node
+
+        # A node we failed to verify must be offered to us again by every teacher who sent it.
+        unsettled_addresses = set()
+        nodes_to_remember = []
+        for verification in as_completed(verifications):
+            node = verifications[verification]
+            try:
+                # This may be another instance of the same node, verified on someone else's behalf.
+                node = verification.result()
+                self.log.debug("Verified node: {}".format(node.checksum_public_address))
+            except NodeSeemsToBeDown as e:
+                unsettled_addresses.add(node.checksum_public_address)
+                self.log.info(f"Can't connect to {node} to verify it right now.")
+            except node.InvalidNode:
+                unsettled_addresses.add(node.checksum_public_address)
+                # TODO: Account for possibility that stamp, rather than interface, was bad.
+                self.log.warn(node.invalid_metadata_message.format(node))
+            except node.SuspiciousActivity:
+                unsettled_addresses.add(node.checksum_public_address)
+                message = "Suspicious Activity: Discovered node with bad signature: {}.  " \
+                          "Propagated by one of: {}".format(node.checksum_public_address, teachers)
+                self.log.warn(message)
+            else:
+                if self._prepare_to_remember(node, known_timestamps=knowledge.timestamps):
+                    nodes_to_remember.append(node)
+                else:
+                    unsettled_addresses.add(node.checksum_public_address)
+
+        return self.lesson_template(answers=answers,
+                                    nodes_to_remember=nodes_to_remember,
+                                    unsettled_addresses=unsettled_addresses)
+
+    def _ask_teacher(self, current_teacher, knowledge: 'Learner.knowledge_template') -> 'Learner.answer_template':
+        """
+        Asks a single teacher for the nodes it knows (or what changed since we last learned from it).
+        """
+        started = time.perf_counter()
+
+        def answer(nodes_taught, checksum=None, updated=None, number_of_teachers_nodes=None):
+            return self.answer_template(teacher=current_teacher,
+                                        seconds=time.perf_counter() - started,
+                                        checksum=checksum,
+                                        updated=updated,
+                                        number_of_teachers_nodes=number_of_teachers_nodes,
+                                        nodes_taught=nodes_taught)
 
         if Teacher in self.__class__.__bases__:
             announce_nodes = [self]
@@ -702,39 +1123,40 @@ class Learner:
             announce_nodes = None
 
         unresponsive_nodes = set()
+        teacher_address = current_teacher.checksum_public_address
+        since_fleet_checksum = knowledge.fleet_states_learned_from_teachers.get(teacher_address)
         try:
             # TODO: Streamline path generation
             certificate_filepath = self.node_storage.generate_certificate_filepath(
                 checksum_address=current_teacher.checksum_public_address)
             response = self.network_middleware.get_nodes_via_rest(node=current_teacher,
-                                                                  nodes_i_need=self._node_ids_to_learn_about_immediately,
+                                                                  nodes_i_need=knowledge.nodes_i_need,
                                                                   announce_nodes=announce_nodes,
-                                                                  fleet_checksum=self.known_nodes.checksum)
+                                                                  fleet_checksum=knowledge.fleet_checksum,
+                                                                  since_fleet_checksum=since_fleet_checksum)
         except NodeSeemsToBeDown as e:
             unresponsive_nodes.add(current_teacher)
             self.log.info("Bad Response from teacher: {}:{}.".format(current_teacher, e))
-            return
-        finally:
-            self.cycle_teacher_node()
+            return answer(nodes_taught=None)
 
         #
         # Before we parse the response, let's handle some edge cases.
         if response.status_code == 204:
             # In this case, this node knows about no other nodes.  Hopefully we've taught it something.
             if response.content == b"":
-                return NO_KNOWN_NODES
+                return answer(nodes_taught=NO_KNOWN_NODES)
             # In the other case - where the status code is 204 but the repsonse isn't blank - we'll keep parsing.
             # It's possible that our fleet states match, and we'll check for that later.
 
         elif response.status_code != 200:
             self.log.info("Bad response from teacher {}: {} - {}".format(current_teacher, response, response.content))
-            return
+            return answer(nodes_taught=None)
 
         try:
             signature, node_payload = signature_splitter(response.content, return_remainder=True)
         except BytestringSplittingError as e:
             self.log.warn(e.args[0])
-            return
+            return answer(nodes_taught=None)
 
         try:
             self.verify_from(current_teacher, node_payload, signature=signature)
@@ -747,79 +1169,93 @@ class Learner:
         fleet_state_checksum_bytes, fleet_state_updated_bytes, node_payload = FleetStateTracker.snapshot_splitter(
             node_payload,
             return_remainder=True)
-        current_teacher.last_seen = maya.now()
         # TODO: This is weird - let's get a stranger FleetState going.
         checksum = fleet_state_checksum_bytes.hex()
+        updated = maya.MayaDT(int.from_bytes(fleet_state_updated_bytes, byteorder="big"))
 
         # TODO: This doesn't make sense - a decentralized node can still learn about a federated-only node.
         from nucypher.characters.lawful import Ursula
         if constant_or_bytes(node_payload) is FLEET_STATES_MATCH:
-            current_teacher.update_snapshot(checksum=checksum,
-                                            updated=maya.MayaDT(
-                                                int.from_bytes(fleet_state_updated_bytes, byteorder="big")),
-                                            number_of_known_nodes=len(self.known_nodes)
-                                            )
-            return FLEET_STATES_MATCH
-
-        node_list = Ursula.batch_from_bytes(node_payload, federated_only=self.federated_only)  # TODO: 466
-
-        current_teacher.update_snapshot(checksum=checksum,
-                                        updated=maya.MayaDT(
-                                            int.from_bytes(fleet_state_updated_bytes, byteorder="big")),
-                                        number_of_known_nodes=len(node_list)
-                                        )
+            return answer(nodes_taught=FLEET_STATES_MATCH, checksum=checksum, updated=updated)
+
+        delta_marker = bytes(FLEET_STATE_DELTA)
+        if node_payload.startswith(delta_marker):
+            # The teacher still remembered a fleet state we told it about, and only sent what changed since.
+            since, number_of_teachers_nodes, node_payload = FleetStateTracker.split_delta(
+                node_payload[len(delta_marker):])
+            node_list = Ursula.batch_from_bytes(node_payload, federated_only=self.federated_only)  # TODO: 466
+            self.log.debug("Teacher {} sent {} changed nodes since fleet state {}".format(current_teacher,
+                                                                                         len(node_list),
+                                                                                         since))
+        else:
+            node_list = Ursula.batch_from_bytes(node_payload, federated_only=self.federated_only)  # TODO: 466
+            number_of_teachers_nodes = len(node_list)
 
-        new_nodes = []
-        for node in node_list:
-            if GLOBAL_DOMAIN not in self.learning_domains:
-                if not set(self.learning_domains).intersection(set(node.serving_domains)):
-                    continue  # This node is not serving any of our domains.
+        return answer(nodes_taught=list(node_list),
+                      checksum=checksum,
+                      updated=updated,
+                      number_of_teachers_nodes=number_of_teachers_nodes)
 
-            # First, determine if this is an outdated representation of an already known node.
-            with suppress(KeyError):
-                already_known_node = self.known_nodes[node.checksum_public_address]
-                if not node.timestamp > already_known_node.timestamp:
-                    self.log.debug("Skipping already known node {}".format(already_known_node))
-                    # This node is already known.  We can safely continue to the next.
-                    continue
+    def _apply_lesson(self, lesson):
+        """
+        Commits what the teachers taught us to what we know.  When learning in the background,
+        this is called back on the reactor.
+        """
+        if not isinstance(lesson, self.lesson_template):
+            return lesson  # Either the teacher knew no one, or the round went nowhere.
+
+        for answer in lesson.answers:
+            self._note_responsiveness(answer)
+            teacher = answer.teacher
+            teacher_address = teacher.checksum_public_address
+
+            if answer.nodes_taught is FLEET_STATES_MATCH:
+                teacher.last_seen = maya.now()
+                teacher.update_snapshot(checksum=answer.checksum,
+                                        updated=answer.updated,
+                                        number_of_known_nodes=len(self.known_nodes))
+                self._fleet_states_learned_from_teachers[teacher_address] = answer.checksum
+                continue
+
+            if not isinstance(answer.nodes_taught, list):
+                continue  # This teacher had nothing for us this time.
+
+            teacher.last_seen = maya.now()
+            teacher.update_snapshot(checksum=answer.checksum,
+                                    updated=answer.updated,
+                                    number_of_known_nodes=answer.number_of_teachers_nodes)
+
+            # Only once every node the teacher sent is settled can the next round ask it for just a delta.
+            addresses_taught = {node.checksum_public_address for node in answer.nodes_taught}
+            if addresses_taught.isdisjoint(lesson.unsettled_addresses):
+                self._fleet_states_learned_from_teachers[teacher_address] = answer.checksum
+            else:
+                self._fleet_states_learned_from_teachers.pop(teacher_address, None)
 
-            certificate_filepath = self.node_storage.store_node_certificate(certificate=node.certificate)
+        if not any(isinstance(answer.nodes_taught, list) for answer in lesson.answers):
+            if any(answer.nodes_taught is FLEET_STATES_MATCH for answer in lesson.answers):
+                return FLEET_STATES_MATCH
+            return  # No teacher had anything for us this round.
 
-            try:
-                if eager:
-                    node.verify_node(self.network_middleware,
-                                     accept_federated_only=self.federated_only,  # TODO: 466
-                                     certificate_filepath=certificate_filepath)
-                    self.log.debug("Verified node: {}".format(node.checksum_public_address))
-
-                else:
-                    node.validate_metadata(accept_federated_only=self.federated_only)  # TODO: 466
-            # This block is a mess of eagerness.  This can all be done better lazily.
-            except NodeSeemsToBeDown as e:
-                self.log.info(f"Can't connect to {node} to verify it right now.")
-            except node.InvalidNode:
-                # TODO: Account for possibility that stamp, rather than interface, was bad.
-                self.log.warn(node.invalid_metadata_message.format(node))
-            except node.SuspiciousActivity:
-                message = "Suspicious Activity: Discovered node with bad signature: {}.  " \
-                          "Propagated by: {}".format(current_teacher.checksum_public_address, teacher_uri)
-                self.log.warn(message)
-            else:
-                new = self.remember_node(node, record_fleet_state=False)
-                if new:
-                    new_nodes.append(node)
+        new_nodes = []
+        for node in lesson.nodes_to_remember:
+            if self._commit_to_memory(node, record_fleet_state=False):
+                new_nodes.append(node)
 
         self._adjust_learning(new_nodes)
 
+        new_addresses = {node.checksum_public_address for node in new_nodes}
         learning_round_log_message = "Learning round {}.  Teacher: {} knew about {} nodes, {} were new."
-        self.log.info(learning_round_log_message.format(self._learning_round,
-                                                        current_teacher,
-                                                        len(node_list),
-                                                        len(new_nodes)), )
+        for answer in lesson.answers:
+            if isinstance(answer.nodes_taught, list):
+                # Teachers may have taught us some of the same new nodes; each is credited with those it sent.
+                new_from_this_teacher = {node.checksum_public_address for node in answer.nodes_taught} & new_addresses
+                self.log.info(learning_round_log_message.format(self._learning_round,
+                                                                answer.teacher,
+                                                                len(answer.nodes_taught),
+                                                                len(new_from_this_teacher)), )
         if new_nodes:
             self.known_nodes.record_fleet_state()
-            for node in new_nodes:
-                self.node_storage.store_node_certificate(certificate=node.certificate)
         return new_nodes
 
 
@@ -0,0 +1,180 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+from typing import Iterator, List, Tuple
+
+from twisted.internet import reactor
+from twisted.logger import Logger
+from umbral import pre
+from umbral.config import default_params
+from umbral.cfrags import CapsuleFrag
+from umbral.keys import UmbralPublicKey
+from umbral.kfrags import KFrag
+from umbral.pre import Capsule
+
+from nucypher.crypto.signing import SignatureStamp, Signature
+from nucypher.utilities.caching import LRUCache
+
+
+class ReencryptionEngine:
+    """
+    Produces Ursula's (cfrag, signature) results for the Tasks of a WorkOrder, in the order of those Tasks,
+    on the calling thread.  Results are yielded as each is ready, so they can go out to Bob as they're made.
+
+    With a results_cache, a Task seen before - same arrangement, capsule, Bob and Bob's signature, as when
+    Bob retries a WorkOrder that timed out - is answered with the result it got the first time.  Bob's
+    signature has to match, since Ursula's cfrag commits to it; a fresh WorkOrder for the same capsule misses.
+    """
+
+    log = Logger("reencryption")
+
+    def __init__(self, stamp: SignatureStamp, results_cache: LRUCache = None) -> None:
+        self.stamp = stamp
+        self.results_cache = results_cache
+
+    def reencrypt(self,
+                  kfrag: KFrag,
+                  alices_verifying_key: UmbralPublicKey,
+                  work_order: 'WorkOrder'
+                  ) -> Iterator[Tuple[CapsuleFrag, Signature]]:
+
+        if self.results_cache is None:
+            yield from self._reencrypt_tasks(kfrag, alices_verifying_key, work_order.tasks)
+            return
+
+        bob_verifying_key = bytes(work_order.bob.stamp)
+        keys = [(work_order.arrangement_id, bytes(task.capsule), bob_verifying_key, bytes(task.signature))
+                for task in work_order.tasks]
+        results = [self.results_cache.get(key) for key in keys]
+
+        uncached_tasks = [task for task, result in zip(work_order.tasks, results) if result is None]
+        fresh_results = self._reencrypt_tasks(kfrag, alices_verifying_key, uncached_tasks)
+        for key, result in zip(keys, results):
+            if result is None:
+                result = next(fresh_results)
+                self.results_cache.put(key, result)
+            yield result
+
+    def forget_arrangement(self, arrangement_id: bytes) -> int:
+        """
+        Drops the cached results for an arrangement - once it's revoked, say.  Returns how many were dropped.
+        """
+        if self.results_cache is None:
+            return 0
+        return self.results_cache.invalidate_where(lambda key, _result: key[0] == arrangement_id)
+
+    def _reencrypt_tasks(self,
+                         kfrag: KFrag,
+                         alices_verifying_key: UmbralPublicKey,
+                         tasks: List['WorkOrder.Task']
+                         ) -> Iterator[Tuple[CapsuleFrag, Signature]]:
+
+        for task in tasks:
+            # Ursula signs on top of Bob's signature of each task.
+            # Now both are committed to the same task.  See #259.
+            reencryption_metadata = bytes(self.stamp(bytes(task.signature)))
+
+            capsule = task.capsule
+            capsule.set_correctness_keys(verifying=alices_verifying_key)
+            cfrag = pre.reencrypt(kfrag, capsule, metadata=reencryption_metadata)
+            self.log.info(f"Re-encrypting for {capsule}, made {cfrag}.")
+
+            # Finally, Ursula commits to her result
+            reencryption_signature = self.stamp(bytes(cfrag))
+            yield cfrag, reencryption_signature
+
+    def shutdown(self) -> None:
+        pass
+
+
+def _reencrypt_in_worker(kfrag_bytes: bytes,
+                         alices_verifying_key_bytes: bytes,
+                         capsule_bytes: bytes,
+                         metadata: bytes) -> bytes:
+    """
+    Runs in a worker process; everything crosses the process boundary as bytes.
+    """
+    kfrag = KFrag.from_bytes(kfrag_bytes)
+    capsule = Capsule.from_bytes(capsule_bytes, params=default_params())
+    capsule.set_correctness_keys(verifying=UmbralPublicKey.from_bytes(alices_verifying_key_bytes))
+    cfrag = pre.reencrypt(kfrag, capsule, metadata=metadata)
+    return cfrag.to_bytes()
+
+
+class ReencryptionPool(ReencryptionEngine):
+    """
+    Spreads the elliptic-curve work of re-encryption across a pool of worker processes.
+
+    Ursula's signing key never leaves this process: the reencryption metadata is stamped
+    before a Task is dispatched and the resulting cfrag is stamped when it comes back.
+
+    The worker processes go down with the reactor, or sooner if the pool is shut down first.
+    """
+
+    def __init__(self, stamp: SignatureStamp, workers: int, results_cache: LRUCache = None) -> None:
+        super().__init__(stamp=stamp, results_cache=results_cache)
+        self.workers = workers
+        self._executor = ProcessPoolExecutor(max_workers=workers)
+        self._shutdown_trigger = reactor.addSystemEventTrigger('before', 'shutdown', self._shutdown_with_reactor)
+
+    def _reencrypt_tasks(self,
+                         kfrag: KFrag,
+                         alices_verifying_key: UmbralPublicKey,
+                         tasks: List['WorkOrder.Task']
+                         ) -> Iterator[Tuple[CapsuleFrag, Signature]]:
+
+        kfrag_bytes = bytes(kfrag)
+        alices_verifying_key_bytes = bytes(alices_verifying_key)
+
+        futures = list()
+        for task in tasks:
+            reencryption_metadata = bytes(self.stamp(bytes(task.signature)))
+            future = self._executor.submit(_reencrypt_in_worker,
+                                           kfrag_bytes,
+                                           alices_verifying_key_bytes,
+                                           bytes(task.capsule),
+                                           reencryption_metadata)
+            futures.append(future)
+
+        # Every Task is already underway; hand back each result, in order, as soon as it's in.
+        for task, future in zip(tasks, futures):
+            cfrag = CapsuleFrag.from_bytes(future.result())
+            self.log.info(f"Re-encrypting for {task.capsule}, made {cfrag}.")
+            reencryption_signature = self.stamp(bytes(cfrag))
+            yield cfrag, reencryption_signature
+
+    def shutdown(self) -> None:
+        if self._shutdown_trigger is not None:
+            reactor.removeSystemEventTrigger(self._shutdown_trigger)
+            self._shutdown_trigger = None
+        self._executor.shutdown(wait=True)
+
+    def _shutdown_with_reactor(self) -> None:
+        self._shutdown_trigger = None  # The reactor has already taken it off its list.
+        self.shutdown()
+
+
+def make_reencryption_engine(stamp: SignatureStamp,
+                             workers: int = None,
+                             results_cache: LRUCache = None) -> ReencryptionEngine:
+    """
+    Re-encryption stays on the request thread unless a number of worker processes is given.
+    """
+    if workers:
+        return ReencryptionPool(stamp=stamp, workers=workers, results_cache=results_cache)
+    return ReencryptionEngine(stamp=stamp, results_cache=results_cache)
@@ -16,33 +16,35 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 import binascii
+import itertools
 import json
 import os
+from concurrent.futures import as_completed
 from typing import Callable, Tuple
 
+import maya
 from flask import Flask, Response
 from flask import request
 from jinja2 import Template, TemplateError
 from twisted.logger import Logger
-from umbral import pre
 from umbral.keys import UmbralPublicKey
 from umbral.kfrags import KFrag
 
-from bytestring_splitter import VariableLengthBytestring
+from bytestring_splitter import BytestringSplitter, VariableLengthBytestring
 from constant_sorrow import constants
-from constant_sorrow.constants import FLEET_STATES_MATCH
 from constant_sorrow.constants import GLOBAL_DOMAIN, NO_KNOWN_NODES
 from hendrix.experience import crosstown_traffic
 from nucypher.config.constants import GLOBAL_DOMAIN
 from nucypher.config.storages import ForgetfulNodeStorage
 from nucypher.crypto.api import keccak_digest
 from nucypher.crypto.kits import UmbralMessageKit
-from nucypher.crypto.powers import SigningPower, KeyPairBasedPower, PowerUpError
+from nucypher.crypto.powers import KeyPairBasedPower, PowerUpError
 from nucypher.crypto.signing import InvalidSignature, SignatureStamp, Signature
 from nucypher.crypto.utils import canonical_address_from_umbral_key
 from nucypher.keystore.keypairs import HostingKeypair
 from nucypher.keystore.keystore import NotFound
 from nucypher.keystore.threading import ThreadedSession
+from nucypher.keystore.treasure_maps import TreasureMapStore
 from nucypher.network import LEARNING_LOOP_VERSION
 from nucypher.network.middleware import RestMiddleware
 from nucypher.network.protocols import InterfaceInfo, SuspiciousActivity
@@ -85,16 +87,20 @@ def make_rest_app(
         db_filepath: str,
         network_middleware: RestMiddleware,
         federated_only: bool,
-        treasure_map_tracker: dict,
         node_tracker: 'FleetStateTracker',
         node_bytes_caster: Callable,
-        work_order_tracker: list,
+        work_order_recorder: Callable,
+        kfrag_cache: 'LRUCache',
+        reencryption_cache: 'LRUCache',
+        reencryption_engine: 'ReencryptionEngine',
+        verification_queue: 'NodeVerificationQueue',
         node_nickname: str,
         node_recorder: Callable,
         stamp: SignatureStamp,
         verifier: Callable,
         suspicious_activity_tracker: dict,
         serving_domains,
+        treasure_map_cache_size: int = 1000,
         log=Logger("http-application-layer")
         ) -> Tuple:
 
@@ -103,25 +109,59 @@ def make_rest_app(
     from nucypher.keystore import keystore
     from nucypher.keystore.db import Base
     from sqlalchemy.engine import create_engine
+    from sqlalchemy.pool import StaticPool
 
     log.info("Starting datastore {}".format(db_filepath))
 
     # See: https://docs.sqlalchemy.org/en/rel_0_9/dialects/sqlite.html#connect-strings
-    if db_filepath:
-        db_uri = f'sqlite:///{db_filepath}'
+    if db_filepath and db_filepath != ':memory:':
+        engine = create_engine(f'sqlite:///{db_filepath}')
     else:
-        db_uri = 'sqlite://'  # TODO: Is this a sane default? See #667
-
-    engine = create_engine(db_uri)
+        # TODO: Is this a sane default? See #667
+        # An in-memory database lives and dies with its connection, so every thread
+        # handling a request (or enacting a policy) must share the one connection.
+        engine = create_engine('sqlite://',
+                               connect_args={'check_same_thread': False},
+                               poolclass=StaticPool)
 
     Base.metadata.create_all(engine)
     datastore = keystore.KeyStore(engine)
     db_engine = engine
+    treasure_maps = TreasureMapStore(datastore=datastore, cache_size=treasure_map_cache_size)
 
     from nucypher.characters.lawful import Alice, Ursula
     _alice_class = Alice
     _node_class = Ursula
 
+    def arrangement_key_material(id_as_hex: str) -> Tuple:
+        """
+        The decoded (KFrag, Alice's verifying key, Alice's address) for an arrangement,
+        served from kfrag_cache until the arrangement is revoked or expires.
+        """
+        cached = kfrag_cache.get(id_as_hex)
+        if cached is not None:
+            kfrag, alices_verifying_key, alices_address, expiration = cached
+            if expiration > maya.now():
+                return kfrag, alices_verifying_key, alices_address
+            kfrag_cache.pop(id_as_hex)
+
+        with ThreadedSession(db_engine) as session:
+            policy_arrangement = datastore.get_policy_arrangement(arrangement_id=id_as_hex.encode(),
+                                                                  session=session)
+        kfrag_bytes = policy_arrangement.kfrag  # Careful!  :-)
+        verifying_key_bytes = policy_arrangement.alice_pubkey_sig.key_data
+
+        # TODO: Push this to a lower level. Perhaps to Ursula character? #619
+        kfrag = KFrag.from_bytes(kfrag_bytes)
+        alices_verifying_key = UmbralPublicKey.from_bytes(verifying_key_bytes)
+        alices_address = canonical_address_from_umbral_key(alices_verifying_key)
+
+        expiration = maya.MayaDT.from_datetime(policy_arrangement.expiration)
+        if expiration > maya.now():
+            kfrag_cache.put(id_as_hex, (kfrag, alices_verifying_key, alices_address, expiration))
+
+        return kfrag, alices_verifying_key, alices_address
+
     rest_app = Flask("ursula-service")
 
     @rest_app.route("/public_information")
@@ -142,15 +182,13 @@ def make_rest_app(
         if node_tracker.checksum is NO_KNOWN_NODES:
             return Response(b"", headers=headers, status=204)
 
-        payload = node_tracker.snapshot()
-
-        ursulas_as_vbytes = (VariableLengthBytestring(n) for n in node_tracker)
-        ursulas_as_bytes = bytes().join(bytes(u) for u in ursulas_as_vbytes)
-        ursulas_as_bytes += VariableLengthBytestring(node_bytes_caster())
-
-        payload += ursulas_as_bytes
-        signature = stamp(payload)
-        return Response(bytes(signature) + payload, headers=headers)
+        # If the learner asks for what changed since a fleet state we still remember, that's all it gets.
+        since = node_tracker.base_state_for_delta(request.args.get('since'))
+        if since:
+            signed_payload = node_tracker.signed_delta(since=since, stamp=stamp, this_node_bytes=node_bytes_caster)
+        else:
+            signed_payload = node_tracker.signed_payload(stamp=stamp, this_node_bytes=node_bytes_caster)
+        return Response(signed_payload, headers=headers)
 
     @rest_app.route('/node_metadata', methods=["POST"])
     def node_metadata_exchange():
@@ -160,14 +198,13 @@ def make_rest_app(
         if learner_fleet_state == node_tracker.checksum:
             log.debug("Learner already knew fleet state {}; doing nothing.".format(learner_fleet_state))
             headers = {'Content-Type': 'application/octet-stream'}
-            payload = node_tracker.snapshot() + bytes(FLEET_STATES_MATCH)
-            signature = stamp(payload)
-            return Response(bytes(signature) + payload, headers=headers)
+            return Response(node_tracker.signed_states_match(stamp=stamp), headers=headers)
 
         nodes = _node_class.batch_from_bytes(request.data, federated_only=federated_only)  # TODO: 466
 
         # TODO: This logic is basically repeated in learn_from_teacher_node and remember_node.
         # Let's find a better way.  #555
+        announced_nodes = list()
         for node in nodes:
             if GLOBAL_DOMAIN not in serving_domains:
                 if not set(serving_domains).intersection(set(node.serving_domains)):
@@ -177,41 +214,56 @@ def make_rest_app(
                 if node.timestamp <= node_tracker[node.checksum_public_address].timestamp:
                     continue
 
+            announced_nodes.append(node)
+
+        if announced_nodes:
             @crosstown_traffic()
             def learn_about_announced_nodes():
-
+                # Verify the announced nodes side by side, recording each as soon as it checks out.
+                verifications = dict()
+                sentinel = None
                 try:
-                    certificate_filepath = forgetful_node_storage.store_node_certificate(
-                        certificate=node.certificate)
-
-                    node.verify_node(network_middleware,
-                                     accept_federated_only=federated_only,  # TODO: 466
-                                     certificate_filepath=certificate_filepath)
-
-                # Suspicion
-                except node.SuspiciousActivity:
-                    # TODO: Include data about caller?
-                    # TODO: Account for possibility that stamp, rather than interface, was bad.
-                    # TODO: Maybe also record the bytes representation separately to disk?
-                    message = f"Suspicious Activity: Discovered node with bad signature: {node}.  Announced via REST."
-                    log.warn(message)
-                    suspicious_activity_tracker['vladimirs'].append(node)
-
-                # Async Sentinel
-                except Exception as e:
-                    log.critical(str(e))
-                    raise
-
-                # Believable
-                else:
-                    log.info("Learned about previously unknown node: {}".format(node))
-                    node_recorder(node)
-                    # TODO: Record new fleet state
+                    for node in announced_nodes:
+                        certificate_filepath = forgetful_node_storage.store_node_certificate(
+                            certificate=node.certificate)
+                        verification = verification_queue.verify(node,
+                                                                 network_middleware=network_middleware,
+                                                                 accept_federated_only=federated_only,  # TODO: 466
+                                                                 certificate_filepath=certificate_filepath)
+                        verifications[verification] = node
+
+                    for verification in as_completed(verifications):
+                        node = verifications[verification]
+                        try:
+                            node = verification.result()
+
+                        # Suspicion
+                        except node.SuspiciousActivity:
+                            # TODO: Include data about caller?
+                            # TODO: Account for possibility that stamp, rather than interface, was bad.
+                            # TODO: Maybe also record the bytes representation separately to disk?
+                            message = f"Suspicious Activity: Discovered node with bad signature: {node}.  Announced via REST."
+                            log.warn(message)
+                            suspicious_activity_tracker['vladimirs'].append(node)
+
+                        # Async Sentinel - raised once the rest of the announced nodes are settled.
+                        except Exception as e:
+                            log.critical(str(e))
+                            sentinel = sentinel or e
+
+                        # Believable
+                        else:
+                            log.info("Learned about previously unknown node: {}".format(node))
+                            node_recorder(node)
+                            # TODO: Record new fleet state
 
                 # Cleanup
                 finally:
                     forgetful_node_storage.forget()
 
+                if sentinel:
+                    raise sentinel
+
         # TODO: What's the right status code here?  202?  Different if we already knew about the node?
         return all_known_nodes()
 
@@ -246,7 +298,7 @@ def make_rest_app(
         policy_message_kit = UmbralMessageKit.from_bytes(request.data)
 
         alices_verifying_key = policy_message_kit.sender_pubkey_sig
-        alice = _alice_class.from_public_keys({SigningPower: alices_verifying_key})
+        alice = _alice_class.stranger(alices_verifying_key)
 
         try:
             cleartext = verifier(alice, policy_message_kit, decrypt=True)
@@ -265,10 +317,52 @@ def make_rest_app(
                 id_as_hex,
                 kfrag,
                 session=session)
+        kfrag_cache.pop(id_as_hex)
 
         # TODO: Sign the arrangement here.  #495
         return ""  # TODO: Return A 200, with whatever policy metadata.
 
+    @rest_app.route('/enact_arrangement', methods=['POST'])
+    def enact_arrangement():
+        """
+        REST endpoint for considering an Arrangement and setting its kFrag in one go;
+        the body is the Arrangement (as VariableLengthBytestring) followed by the policy UmbralMessageKit.
+        """
+        from nucypher.policy.models import Arrangement
+        arrangement_bytes, policy_message_kit_bytes = BytestringSplitter(VariableLengthBytestring)(request.data,
+                                                                                                   return_remainder=True)
+        arrangement = Arrangement.from_bytes(arrangement_bytes)
+        policy_message_kit = UmbralMessageKit.from_bytes(policy_message_kit_bytes)
+
+        alices_verifying_key = policy_message_kit.sender_pubkey_sig
+        if bytes(alices_verifying_key) != bytes(arrangement.alice.stamp):
+            # Whoever sent this kFrag isn't the Alice who drew up the Arrangement.
+            return Response(status=400)
+
+        try:
+            cleartext = verifier(arrangement.alice, policy_message_kit, decrypt=True)
+        except InvalidSignature:
+            return Response(status=400)
+
+        kfrag = KFrag.from_bytes(cleartext)
+
+        if not kfrag.verify(signing_pubkey=alices_verifying_key):
+            log.info(f"Invalid KFrag for arrangement {arrangement.id.hex()}")
+            return Response(status=400)
+
+        id_as_hex = arrangement.id.hex()
+        with ThreadedSession(db_engine) as session:
+            datastore.add_policy_arrangement(arrangement.expiration.datetime(),
+                                             id=id_as_hex.encode(),
+                                             kfrag=bytes(kfrag),
+                                             alice_pubkey_sig=arrangement.alice.stamp,
+                                             session=session)
+        kfrag_cache.pop(id_as_hex)
+
+        headers = {'Content-Type': 'application/octet-stream'}
+        # TODO: Make this a legit response #234.
+        return Response(b"This will eventually be an actual acceptance of the arrangement.", headers=headers)
+
     @rest_app.route('/kFrag/<id_as_hex>', methods=["DELETE"])
     def revoke_arrangement(id_as_hex):
         """
@@ -293,6 +387,8 @@ def make_rest_app(
                 elif revocation.verify_signature(alice_pubkey):
                     datastore.del_policy_arrangement(
                         id_as_hex.encode(), session=session)
+                    kfrag_cache.pop(id_as_hex)
+                    reencryption_engine.forget_arrangement(revocation.arrangement_id)
         except (NotFound, InvalidSignature) as e:
             log.debug("Exception attempting to revoke: {}".format(e))
             return Response(response='KFrag not found or revocation signature is invalid.', status=404)
@@ -305,16 +401,11 @@ def make_rest_app(
         from nucypher.policy.models import WorkOrder  # Avoid circular import
         arrangement_id = binascii.unhexlify(id_as_hex)
 
-        with ThreadedSession(db_engine) as session:
-            policy_arrangement = datastore.get_policy_arrangement(arrangement_id=id_as_hex.encode(),
-                                                                  session=session)
-        kfrag_bytes = policy_arrangement.kfrag  # Careful!  :-)
-        verifying_key_bytes = policy_arrangement.alice_pubkey_sig.key_data
-
-        # TODO: Push this to a lower level. Perhaps to Ursula character? #619
-        kfrag = KFrag.from_bytes(kfrag_bytes)
-        alices_verifying_key = UmbralPublicKey.from_bytes(verifying_key_bytes)
-        alices_address = canonical_address_from_umbral_key(alices_verifying_key)
+        try:
+            kfrag, alices_verifying_key, alices_address = arrangement_key_material(id_as_hex)
+        except NotFound:
+            # Revoked, or never ours; either way Bob should stop counting on this arrangement.
+            return Response(response='No KFrag for arrangement {}.'.format(id_as_hex), status=404)
 
         work_order = WorkOrder.from_rest_payload(arrangement_id=arrangement_id,
                                                  rest_payload=request.data,
@@ -323,28 +414,28 @@ def make_rest_app(
 
         log.info(f"Work Order from {work_order.bob}, signed {work_order.receipt_signature}")
 
-        cfrag_byte_stream = b""
+        if not work_order.tasks:
+            return Response(response='WorkOrder has no capsules to re-encrypt.', status=400)
 
-        for task in work_order.tasks:
-            # Ursula signs on top of Bob's signature of each task.
-            # Now both are committed to the same task.  See #259.
-            reencryption_metadata = bytes(stamp(bytes(task.signature)))
+        cfrags_and_signatures = reencryption_engine.reencrypt(kfrag=kfrag,
+                                                              alices_verifying_key=alices_verifying_key,
+                                                              work_order=work_order)
 
-            capsule = task.capsule
-            capsule.set_correctness_keys(verifying=alices_verifying_key)
-            cfrag = pre.reencrypt(kfrag, capsule, metadata=reencryption_metadata)
-            log.info(f"Re-encrypting for {capsule}, made {cfrag}.")
+        # The first re-encryption happens before we answer, so that a WorkOrder we can't
+        # complete at all still gets an error status rather than a broken stream.
+        first_result = next(cfrags_and_signatures)
 
-            # Finally, Ursula commits to her result
-            reencryption_signature = stamp(bytes(cfrag))
-            cfrag_byte_stream += VariableLengthBytestring(cfrag) + reencryption_signature
+        # Recorded now that we've taken the WorkOrder on, whether or not Bob stays to read every cfrag.
+        work_order_recorder(work_order)
 
-        # TODO: Put this in Ursula's datastore
-        work_order_tracker.append(work_order)
+        def cfrag_byte_stream():
+            # Each cfrag goes out to Bob as soon as it's made, rather than once the whole WorkOrder is done.
+            for cfrag, reencryption_signature in itertools.chain((first_result,), cfrags_and_signatures):
+                yield VariableLengthBytestring(cfrag) + reencryption_signature
 
         headers = {'Content-Type': 'application/octet-stream'}
 
-        return Response(response=cfrag_byte_stream, headers=headers)
+        return Response(response=cfrag_byte_stream(), headers=headers)
 
     @rest_app.route('/treasure_map/<treasure_map_id>')
     def provide_treasure_map(treasure_map_id):
@@ -352,13 +443,15 @@ def make_rest_app(
 
         treasure_map_bytes = keccak_digest(binascii.unhexlify(treasure_map_id))
 
-        try:
-
-            treasure_map = treasure_map_tracker[treasure_map_bytes]
+        treasure_map, expiration = treasure_maps.get_with_expiration(treasure_map_bytes)
+        if treasure_map is not None:
+            if expiration:
+                # So that Bob knows how long what he retrieves under this policy stays good.
+                headers['X-Policy-Expiration'] = expiration.iso8601()
             response = Response(bytes(treasure_map), headers=headers)
             log.info("{} providing TreasureMap {}".format(node_nickname, treasure_map_id))
 
-        except KeyError:
+        else:
             log.info("{} doesn't have requested TreasureMap {}".format(stamp, treasure_map_id))
             response = Response("No Treasure Map with ID {}".format(treasure_map_id),
                                 status=404, headers=headers)
@@ -387,9 +480,14 @@ def make_rest_app(
             #                         constants.BYTESTRING_IS_TREASURE_MAP + bytes(treasure_map))
             # # # #
 
-            # TODO 341 - what if we already have this TreasureMap?
-            treasure_map_tracker[keccak_digest(binascii.unhexlify(treasure_map_id))] = treasure_map
-            return Response(bytes(treasure_map), status=202)
+            expiration = request.args.get('expiration')
+            expiration = maya.parse(expiration) if expiration else None
+
+            is_new = treasure_maps.store(keccak_digest(binascii.unhexlify(treasure_map_id)),
+                                         treasure_map,
+                                         expiration=expiration)
+            # 202 for a TreasureMap we've just taken on; 200 if we already had it.
+            return Response(bytes(treasure_map), status=202 if is_new else 200)
         else:
             # TODO: Make this a proper 500 or whatever.
             log.info("Bad TreasureMap ID; not storing {}".format(treasure_map_id))
@@ -403,19 +501,22 @@ def make_rest_app(
         headers = {"Content-Type": "text/html", "charset": "utf-8"}
         this_node = _node_class.from_bytes(node_bytes_caster(), federated_only=federated_only)
 
-        previous_states = list(reversed(node_tracker.states.values()))[:5]
+        previous_states = node_tracker.previous_states(5)
 
         try:
             content = status_template.render(this_node=this_node,
                                              known_nodes=node_tracker,
-                                             previous_states=previous_states)
+                                             previous_states=previous_states,
+                                             caches={'KFrags': kfrag_cache.stats(),
+                                                     'Re-encryptions': reencryption_cache.stats(),
+                                                     'TreasureMaps': treasure_maps.stats()})
         except Exception as e:
             log.debug("Template Rendering Exception: ".format(str(e)))
             raise TemplateError(str(e)) from e
 
         return Response(response=content, headers=headers)
 
-    return rest_app, datastore
+    return rest_app, datastore, treasure_maps
 
 
 class TLSHostingPower(KeyPairBasedPower):
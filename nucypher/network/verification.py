@@ -0,0 +1,127 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from collections import Counter, deque
+from concurrent.futures import Future, ThreadPoolExecutor
+from functools import partial
+from threading import Lock
+
+from twisted.logger import Logger
+
+
+class NodeVerificationQueue:
+    """
+    Verifies nodes (see Teacher.verify_node) on a bounded pool of worker threads.
+
+    No more than `per_host` verifications run against the same host at once, and a node
+    which is already being verified isn't verified again: whoever asks in the meantime
+    is handed the verification already under way.
+
+    Verifications over a host's limit wait in a queue of that host's, not on a worker, so a few
+    slow hosts can't tie up the whole pool.
+    """
+
+    log = Logger("node-verification")
+
+    def __init__(self, workers: int, per_host: int) -> None:
+        self.workers = workers
+        self.per_host = per_host
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="node-verification")
+        self._running_per_host = Counter()
+        self._waiting_per_host = dict()  # host -> deque of verifications yet to be started
+        self._in_flight = dict()
+        self._lock = Lock()
+
+    def __len__(self) -> int:
+        return len(self._in_flight)
+
+    def verify(self,
+               node,
+               network_middleware,
+               accept_federated_only: bool = False,
+               certificate_filepath: str = None
+               ) -> Future:
+        """
+        Returns a Future of the verified node; it raises whatever verify_node raised.
+
+        The node in the result may be another instance of the same node (same address, same timestamp)
+        whose verification was already under way.
+        """
+        key = (node.checksum_public_address, node.timestamp.epoch)
+        host = node.rest_information()[0].host
+        with self._lock:
+            try:
+                return self._in_flight[key]
+            except KeyError:
+                verification = Future()
+                self._in_flight[key] = verification
+
+            job = partial(self._verify, verification, node, network_middleware,
+                          accept_federated_only, certificate_filepath)
+            if self._running_per_host[host] < self.per_host:
+                self._running_per_host[host] += 1
+            else:
+                self._waiting_per_host.setdefault(host, deque()).append(job)
+                job = None
+
+        verification.add_done_callback(partial(self._done, key))
+        if job:
+            self._executor.submit(self._run, host, job)
+        return verification
+
+    def _run(self, host, job) -> None:
+        """
+        Runs a verification, then hands the host's next waiting one back to the pool - behind
+        whatever other hosts have queued up there in the meantime.
+        """
+        job()
+        with self._lock:
+            waiting = self._waiting_per_host.get(host)
+            if waiting:
+                job = waiting.popleft()
+                if not waiting:
+                    del self._waiting_per_host[host]
+            else:
+                job = None
+                self._running_per_host[host] -= 1
+                if not self._running_per_host[host]:
+                    del self._running_per_host[host]  # Nothing in flight; forget the host.
+        if job:
+            try:
+                self._executor.submit(self._run, host, job)
+            except RuntimeError:
+                self._run(host, job)  # The pool is shutting down; see this host's verifications through here.
+
+    @staticmethod
+    def _verify(verification: Future, node, network_middleware, accept_federated_only, certificate_filepath):
+        if not verification.set_running_or_notify_cancel():
+            return
+        try:
+            node.verify_node(network_middleware,
+                             accept_federated_only=accept_federated_only,
+                             certificate_filepath=certificate_filepath)
+        except BaseException as e:
+            verification.set_exception(e)
+        else:
+            verification.set_result(node)
+
+    def _done(self, key, _verification: Future) -> None:
+        with self._lock:
+            self._in_flight.pop(key, None)
+
+    def shutdown(self) -> None:
+        self._executor.shutdown(wait=True)
@@ -15,8 +15,12 @@ You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 import binascii
+import shelve
+import time
 from abc import abstractmethod
 from collections import OrderedDict
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, as_completed, wait
+from threading import RLock
 
 import maya
 import msgpack
@@ -26,7 +30,7 @@ from constant_sorrow.constants import UNKNOWN_KFRAG, NO_DECRYPTION_PERFORMED, NO
 from cryptography.hazmat.backends.openssl import backend
 from cryptography.hazmat.primitives import hashes
 from eth_utils import to_canonical_address, to_checksum_address
-from typing import Generator, List, Set, Optional
+from typing import Callable, Generator, List, Set, Optional
 
 from umbral.cfrags import CapsuleFrag
 from umbral.config import default_params
@@ -45,7 +49,7 @@ from nucypher.crypto.signing import Signature, InvalidSignature, signature_split
 from nucypher.crypto.splitters import key_splitter, capsule_splitter
 from nucypher.crypto.utils import canonical_address_from_umbral_key, recover_pubkey_from_signature, construct_policy_id
 from nucypher.network.exceptions import NodeSeemsToBeDown
-from nucypher.network.middleware import RestMiddleware, NotFound
+from nucypher.network.middleware import RestMiddleware, NotFound, UnexpectedResponse
 
 
 class Arrangement:
@@ -88,7 +92,7 @@ class Arrangement:
         # Still unclear how to arrive at the correct number of bytes to represent a deposit.  See #148.
         alice_pubkey_sig, arrangement_id, expiration_bytes = cls.splitter(arrangement_as_bytes)
         expiration = maya.parse(expiration_bytes.decode())
-        alice = Alice.from_public_keys({SigningPower: alice_pubkey_sig})
+        alice = Alice.stranger(alice_pubkey_sig)
         return cls(alice=alice, arrangement_id=arrangement_id, expiration=expiration)
 
     def encrypt_payload_for_ursula(self):
@@ -124,6 +128,9 @@ class Policy:
     and generates a TreasureMap for the Policy, recording which Ursulas got a KFrag.
     """
 
+    _ENACTMENT_CONCURRENCY = 16
+    _NEGOTIATION_CONCURRENCY = 16
+
     def __init__(self,
                  alice,
                  label,
@@ -183,7 +190,11 @@ class Policy:
         """
         return keccak_digest(bytes(self.alice.stamp) + bytes(self.bob.stamp) + self.label)
 
-    def publish_treasure_map(self, network_middleware: RestMiddleware) -> dict:
+    def publish_treasure_map(self, network_middleware: RestMiddleware, replication_factor: int = None) -> dict:
+        """
+        Gives the TreasureMap, all at once, to the replication_factor Ursulas (TreasureMap.REPLICATION_FACTOR by default)
+        nearest to its id, rather than to every node Alice knows.
+        """
         self.treasure_map.prepare_for_publication(self.bob.public_keys(DecryptingPower),
                                                   self.bob.public_keys(SigningPower),
                                                   self.alice.stamp,
@@ -193,25 +204,37 @@ class Policy:
             # TODO: Optionally block.
             raise RuntimeError("Alice hasn't learned of any nodes.  Thus, she can't push the TreasureMap.")
 
+        treasure_map_id = self.treasure_map.public_id()
+        treasure_map_bytes = bytes(self.treasure_map)
+        custodians = TreasureMap.custodians_among(self.alice.known_nodes, treasure_map_id, replication_factor)
+
+        # Custodians may forget the TreasureMap once the last of its Arrangements has expired.
+        expiration = max((arrangement.expiration for arrangement in self._enacted_arrangements.values()),
+                         default=None)
+
         responses = dict()
-        for node in self.alice.known_nodes:
-            # TODO: It's way overkill to push this to every node we know about.  Come up with a system.  342
-            try:
-                treasure_map_id = self.treasure_map.public_id()
-                response = network_middleware.put_treasure_map_on_node(node,
-                                                                       treasure_map_id,
-                                                                       bytes(self.treasure_map)
-                                                                       )  # TODO: Certificate filepath needs to be looked up and passed here
-            except NodeSeemsToBeDown:
-                # TODO: Introduce good failure mode here if too few nodes receive the map.
-                continue
-
-            if response.status_code == 202:
-                responses[node] = response
-                # TODO: Handle response wherein node already had a copy of this TreasureMap.  341
-            else:
-                # TODO: Do something useful here.
-                raise RuntimeError
+        with ThreadPoolExecutor(max_workers=len(custodians), thread_name_prefix="treasure-map-publication") as executor:
+            publications = {executor.submit(network_middleware.put_treasure_map_on_node,
+                                            node,
+                                            treasure_map_id,
+                                            treasure_map_bytes,
+                                            expiration
+                                            ): node  # TODO: Certificate filepath needs to be looked up and passed here
+                            for node in custodians}
+
+            for publication in as_completed(publications):
+                node = publications[publication]
+                try:
+                    response = publication.result()
+                except NodeSeemsToBeDown:
+                    # TODO: Introduce good failure mode here if too few nodes receive the map.
+                    continue
+
+                if response.status_code in (200, 202):  # 200: This node already had a copy of the TreasureMap.
+                    responses[node] = response
+                else:
+                    # TODO: Do something useful here.
+                    raise RuntimeError
 
         return responses
 
@@ -233,6 +256,8 @@ class Policy:
         #                                           "Call make_arrangements to make more.")
 
         for kfrag in self.kfrags:
+            if kfrag in self._enacted_arrangements:
+                continue  # This KFrag went out along with its Arrangement (see _propose_and_enact_arrangements).
             for arrangement in self._accepted_arrangements:
                 if not arrangement in self._enacted_arrangements.values():
                     arrangement.kfrag = kfrag
@@ -246,33 +271,56 @@ class Policy:
                 raise self.MoreKFragsThanArrangements("Not enough accepted arrangements to assign all KFrags.")
         return
 
-    def enact(self, network_middleware, publish=True) -> dict:
+    def enact(self, network_middleware, publish=True, concurrency: int = None) -> dict:
         """
         Assign kfrags to ursulas_on_network, and distribute them via REST,
         populating enacted_arrangements
+
+        Every payload is encrypted up front, then sent to as many as `concurrency`
+        Ursulas at once; each is added to the TreasureMap as soon as she answers.
         """
-        for arrangement in self.__assign_kfrags():
-            policy_message_kit = arrangement.encrypt_payload_for_ursula()
+        payloads = [(arrangement, arrangement.encrypt_payload_for_ursula().to_bytes())
+                    for arrangement in self.__assign_kfrags()]
+
+        workers = max(1, min(concurrency or self._ENACTMENT_CONCURRENCY, len(payloads)))
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix="policy-enactment") as executor:
+            enactments = {executor.submit(network_middleware.enact_policy,
+                                          arrangement.ursula,
+                                          arrangement.id,
+                                          payload): arrangement
+                          for arrangement, payload in payloads}
 
-            response = network_middleware.enact_policy(arrangement.ursula,
-                                                       arrangement.id,
-                                                       policy_message_kit.to_bytes())
+            for enactment in as_completed(enactments):
+                arrangement = enactments[enactment]
+                response = enactment.result()
 
-            if not response:
-                pass  # TODO: Parse response for confirmation.
+                if not response:
+                    pass  # TODO: Parse response for confirmation.
 
-            # Assuming response is what we hope for.
-            self.treasure_map.add_arrangement(arrangement)
+                # Assuming response is what we hope for.
+                self.treasure_map.add_arrangement(arrangement)
 
-        else:  # ...After *all* the policies are enacted
-            # Create Alice's revocation kit
-            self.revocation_kit = RevocationKit(self, self.alice.stamp)
-            self.alice.add_active_policy(self)
+        # ...After *all* the policies are enacted
+        # Create Alice's revocation kit
+        self.revocation_kit = RevocationKit(self, self.alice.stamp)
+        self.alice.add_active_policy(self)
 
-            if publish is True:
-                return self.publish(network_middleware=network_middleware)
+        if publish is True:
+            return self.publish(network_middleware=network_middleware)
 
     def consider_arrangement(self, network_middleware, ursula, arrangement) -> bool:
+        arrangement_is_accepted = self._negotiate_arrangement(network_middleware, ursula, arrangement)
+
+        bucket = self._accepted_arrangements if arrangement_is_accepted else self._rejected_arrangements
+        bucket.add(arrangement)
+
+        return arrangement_is_accepted
+
+    def _negotiate_arrangement(self, network_middleware, ursula, arrangement) -> bool:
+        """
+        Verifies Ursula and proposes the arrangement to her; returns whether she accepted.
+        Nothing about this Policy is changed, so negotiations with several Ursulas can overlap.
+        """
         try:
             ursula.verify_node(network_middleware,
                                accept_federated_only=arrangement.federated)
@@ -287,12 +335,77 @@ class Policy:
         negotiation_response = network_middleware.consider_arrangement(arrangement=arrangement)
 
         # TODO: check out the response: need to assess the result and see if we're actually good to go.
-        arrangement_is_accepted = negotiation_response.status_code == 200
+        return negotiation_response.status_code == 200
 
-        bucket = self._accepted_arrangements if arrangement_is_accepted else self._rejected_arrangements
-        bucket.add(arrangement)
+    def _propose_and_enact_arrangement(self, network_middleware, arrangement, payload) -> bool:
+        """
+        Verifies Ursula and sends her the arrangement along with its kfrag; returns whether she accepted.
+        An Ursula who doesn't know the combined endpoint gets the arrangement and the kfrag one after the other.
+        """
+        ursula = arrangement.ursula
+        ursula.verify_node(network_middleware, accept_federated_only=arrangement.federated)
+        try:
+            response = network_middleware.enact_arrangement(arrangement, payload)
+        except NotFound:
+            if not network_middleware.consider_arrangement(arrangement=arrangement).status_code == 200:
+                return False
+            network_middleware.enact_policy(ursula, arrangement.id, payload)
+            return True
+        return response.status_code == 200
 
-        return arrangement_is_accepted
+    def _propose_and_enact_arrangements(self,
+                                        network_middleware: RestMiddleware,
+                                        candidate_ursulas: Set[Ursula],
+                                        value: int,
+                                        expiration: maya.MayaDT):
+        """
+        Offers each KFrag to a candidate along with its Arrangement, in a single round trip per Ursula,
+        with every KFrag's offer in flight at once.  A KFrag whose offer is declined - or whose Ursula is down,
+        can't be verified, or answers with an error - is offered to the next candidate.
+        """
+        candidates = iter(candidate_ursulas)
+        workers = max(1, min(self._NEGOTIATION_CONCURRENCY, self.n))
+        executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="arrangement-enactment")
+        offers = dict()
+
+        def offer(kfrag) -> None:
+            for ursula in candidates:
+                arrangement = self._arrangement_class(alice=self.alice, ursula=ursula, value=value, expiration=expiration)
+                arrangement.kfrag = kfrag
+                payload = arrangement.encrypt_payload_for_ursula().to_bytes()
+                offers[executor.submit(self._propose_and_enact_arrangement,
+                                       network_middleware=network_middleware,
+                                       arrangement=arrangement,
+                                       payload=payload)] = arrangement
+                return
+            # We're out of candidates; this KFrag stays unassigned.
+
+        try:
+            for kfrag in self.kfrags:
+                offer(kfrag)
+
+            while offers:
+                answered, _pending = wait(offers, return_when=FIRST_COMPLETED)
+                for answer in answered:
+                    arrangement = offers.pop(answer)
+                    try:
+                        is_accepted = answer.result()
+                    except (NodeSeemsToBeDown, Ursula.InvalidNode, UnexpectedResponse):
+                        # Down, not who she claims to be, or turning the KFrag away: as good as a decline.
+                        offer(arrangement.kfrag)
+                        continue
+
+                    if is_accepted:
+                        self._accepted_arrangements.add(arrangement)
+                        self._enacted_arrangements[arrangement.kfrag] = arrangement
+                        self.treasure_map.add_arrangement(arrangement)
+                    else:
+                        self._rejected_arrangements.add(arrangement)
+                        offer(arrangement.kfrag)
+        finally:
+            executor.shutdown(wait=False)
+
+        return self._accepted_arrangements, self._rejected_arrangements
 
     @abstractmethod
     def make_arrangements(self,
@@ -310,29 +423,47 @@ class Policy:
                                candidate_ursulas: Set[Ursula],
                                value: int,
                                expiration: maya.MayaDT):
+        """
+        Negotiates with the candidates side by side until n arrangements are accepted.
+        Then, negotiations which haven't begun are cancelled, and answers still on their way are disregarded.
+        """
+        arrangements = [self._arrangement_class(alice=self.alice,
+                                                ursula=selected_ursula,
+                                                value=value,
+                                                expiration=expiration)
+                        for selected_ursula in candidate_ursulas]
+        if not arrangements:
+            return self._accepted_arrangements, self._rejected_arrangements
+
+        executor = ThreadPoolExecutor(max_workers=min(self._NEGOTIATION_CONCURRENCY, len(arrangements)),
+                                      thread_name_prefix="arrangement-negotiation")
+        negotiations = {executor.submit(self._negotiate_arrangement,
+                                        network_middleware=network_middleware,
+                                        ursula=arrangement.ursula,
+                                        arrangement=arrangement): arrangement
+                        for arrangement in arrangements}
+        try:
+            for negotiation in as_completed(negotiations):
+                arrangement = negotiations[negotiation]
+                try:
+                    is_accepted = negotiation.result()
 
-        for selected_ursula in candidate_ursulas:
-            arrangement = self._arrangement_class(alice=self.alice,
-                                                  ursula=selected_ursula,
-                                                  value=value,
-                                                  expiration=expiration)
-            try:
-                is_accepted = self.consider_arrangement(ursula=selected_ursula,
-                                                        arrangement=arrangement,
-                                                        network_middleware=network_middleware)
-
-            except NodeSeemsToBeDown:  # TODO: Also catch InvalidNode here?  355
-                # This arrangement won't be added to the accepted bucket.
-                # If too many nodes are down, it will fail in make_arrangements.
-                continue
-
-            else:
+                except NodeSeemsToBeDown:  # TODO: Also catch InvalidNode here?  355
+                    # This arrangement won't be added to the accepted bucket.
+                    # If too many nodes are down, it will fail in make_arrangements.
+                    continue
 
                 # Bucket the arrangements
                 if is_accepted:
                     self._accepted_arrangements.add(arrangement)
+                    if len(self._accepted_arrangements) >= self.n:
+                        break  # That's enough Ursulas for this Policy.
                 else:
                     self._rejected_arrangements.add(arrangement)
+        finally:
+            for negotiation in negotiations:
+                negotiation.cancel()
+            executor.shutdown(wait=False)
 
         return self._accepted_arrangements, self._rejected_arrangements
 
@@ -348,7 +479,12 @@ class FederatedPolicy(Policy):
                           network_middleware: RestMiddleware,
                           value: int,
                           expiration: maya.MayaDT,
-                          handpicked_ursulas: Set[Ursula] = None) -> None:
+                          handpicked_ursulas: Set[Ursula] = None,
+                          propose_and_enact: bool = False) -> None:
+        """
+        With propose_and_enact, each Ursula is handed her KFrag along with her Arrangement
+        rather than after accepting it, saving a round trip; enact then only has to publish.
+        """
 
         if handpicked_ursulas is None:
             ursulas = set()  # type: set
@@ -363,12 +499,16 @@ class FederatedPolicy(Policy):
                  know which nodes to use.  Either pass them here or when you make ' \
                  the Policy.".format(self.n))
 
-        # TODO: One of these layers needs to add concurrency.
-
-        self._consider_arrangements(network_middleware,
-                                    candidate_ursulas=ursulas,
-                                    value=value,
-                                    expiration=expiration)
+        if propose_and_enact:
+            self._propose_and_enact_arrangements(network_middleware,
+                                                 candidate_ursulas=ursulas,
+                                                 value=value,
+                                                 expiration=expiration)
+        else:
+            self._consider_arrangements(network_middleware,
+                                        candidate_ursulas=ursulas,
+                                        value=value,
+                                        expiration=expiration)
 
         if len(self._accepted_arrangements) < self.n:
             raise self.MoreKFragsThanArrangements
@@ -385,6 +525,8 @@ class TreasureMap:
         Called when no known nodes have it.
         """
 
+    REPLICATION_FACTOR = 8  # How many Ursulas Alice gives each TreasureMap to.
+
     node_id_splitter = BytestringSplitter((to_checksum_address, int(PUBLIC_ADDRESS_LENGTH)), Arrangement.ID_LENGTH)
 
     from nucypher.crypto.signing import InvalidSignature  # Raised when the public signature (typically intended for Ursula) is not valid.
@@ -480,6 +622,14 @@ class TreasureMap:
             raise TypeError("This TreasureMap is encrypted.  You can't add another node without decrypting it.")
         self.destinations[arrangement.ursula.checksum_public_address] = arrangement.id
 
+    @classmethod
+    def custodians_among(cls, nodes: 'FleetStateTracker', map_id: str, replication_factor: int = None) -> list:
+        """
+        The Ursulas (among nodes) who should keep the TreasureMap with this id: those nearest to it.
+        Alice publishes to them and Bob asks them first; with the same nodes known, they agree on who they are.
+        """
+        return nodes.nearest(bytes.fromhex(map_id), quantity=replication_factor or cls.REPLICATION_FACTOR)
+
     def public_id(self):
         """
         We need an ID that Bob can glean from knowledge he already has *and* which Ursula can verify came from Alice.
@@ -657,7 +807,7 @@ class WorkOrder:
             if not task.signature.verify(specification, bob_pubkey_sig):
                 raise InvalidSignature()
 
-        bob = Bob.from_public_keys({SigningPower: bob_pubkey_sig})
+        bob = Bob.stranger(bob_pubkey_sig)
         return cls(bob=bob,
                    arrangement_id=arrangement_id,
                    tasks=tasks,
@@ -665,20 +815,71 @@ class WorkOrder:
                    blockhash=blockhash,
                    receipt_signature=signature)
 
+    def __bytes__(self):
+        tasks_bytes = [bytes(task) for task in self.tasks]
+        return bytes(VariableLengthBytestring(self.arrangement_id)) + self.alice_address + self.blockhash \
+               + bytes(self.receipt_signature) + msgpack.dumps(tasks_bytes)
+
+    @classmethod
+    def from_bytes(cls, data: bytes, bob: Bob = None, ursula: Ursula = None):
+        splitter = BytestringSplitter((bytes, VariableLengthBytestring),
+                                      (bytes, PUBLIC_ADDRESS_LENGTH),
+                                      (bytes, 32),
+                                      Signature)
+        arrangement_id, alice_address, blockhash, receipt_signature, tasks_bytes = splitter(data,
+                                                                                           msgpack_remainder=True)
+        tasks = [cls.Task.from_bytes(task_bytes) for task_bytes in tasks_bytes]
+        return cls(bob=bob,
+                   arrangement_id=arrangement_id,
+                   alice_address=alice_address,
+                   tasks=tasks,
+                   receipt_signature=receipt_signature,
+                   ursula=ursula,
+                   blockhash=blockhash)
+
     def payload(self):
         tasks_bytes = [bytes(item) for item in self.tasks]
         payload_elements = msgpack.dumps((tasks_bytes, self.blockhash))
         return bytes(self.receipt_signature) + self.bob.stamp + payload_elements
 
-    def complete(self, cfrags_and_signatures):
-        good_cfrags = []
-        if not len(self) == len(cfrags_and_signatures):
-            raise ValueError("Ursula gave back the wrong number of cfrags.  "
-                             "She's up to something.")
+    def copy(self) -> 'WorkOrder':
+        """
+        The same WorkOrder, with Tasks of its own: completing the copy leaves this one untouched.
+        """
+        tasks = [self.Task(capsule=task.capsule, signature=task.signature) for task in self.tasks]
+        return self.__class__(bob=self.bob,
+                              arrangement_id=self.arrangement_id,
+                              alice_address=self.alice_address,
+                              tasks=tasks,
+                              receipt_signature=self.receipt_signature,
+                              ursula=self.ursula,
+                              blockhash=self.blockhash)
+
+    def take_results(self, completed_copy: 'WorkOrder') -> None:
+        """
+        Attaches Ursula's results from a completed copy of this WorkOrder.
+        """
+        for task, completed_task in zip(self.tasks, completed_copy.tasks):
+            task.attach_work_result(completed_task.cfrag, completed_task.reencryption_signature)
+        self.completed = completed_copy.completed
 
+    def complete(self, cfrags_and_signatures, on_cfrag: Callable = None):
+        """
+        Checks and attaches each of Ursula's results as it comes in - cfrags_and_signatures may be
+        a stream of them - and returns the cfrags once all of the Tasks have one.  on_cfrag, if given,
+        is called with each Task as soon as its cfrag has been checked, before the next is read.
+        """
+        good_cfrags = []
         ursula_verifying_key = self.ursula.stamp.as_umbral_pubkey()
 
-        for task, (cfrag, reencryption_signature) in zip(self.tasks, cfrags_and_signatures):
+        results = iter(cfrags_and_signatures)
+        for task in self.tasks:
+            try:
+                cfrag, reencryption_signature = next(results)
+            except StopIteration:
+                raise ValueError("Ursula gave back the wrong number of cfrags.  "
+                                 "She's up to something.")
+
             # Validate re-encryption metadata
             metadata_input = bytes(task.signature)
             metadata_as_signature = Signature.from_bytes(cfrag.proof.metadata)
@@ -693,23 +894,49 @@ class WorkOrder:
                 raise InvalidSignature(f"{cfrag} is not properly signed by Ursula.")
                 # TODO: Instead of raising, we should do something
 
-        for task, (cfrag, reencryption_signature) in zip(self.tasks, cfrags_and_signatures):
             task.attach_work_result(cfrag, reencryption_signature)
+            if on_cfrag is not None:
+                on_cfrag(task)
+
+        if next(results, None) is not None:
+            raise ValueError("Ursula gave back the wrong number of cfrags.  "
+                             "She's up to something.")
 
         self.completed = maya.now()
         return good_cfrags
 
 
 class WorkOrderHistory:
+    """
+    Bob's record of the WorkOrders he has made, indexed both by Ursula and by capsule, so that finding
+    who has already worked on a capsule doesn't mean walking every WorkOrder he has ever saved.
+
+    Capsules are kept in least-recently-used order.  Past max_capsules, or once a capsule has gone
+    unused for ttl seconds, its WorkOrders are evicted - to the shelf at spill_filepath if there is one,
+    from which they are restored the next time the capsule is looked up.  WorkOrders come back from the
+    shelf without their Bob or Ursula attached; they're keyed by Ursula's address all the same.
+    The cfrags of completed Tasks go to the shelf with their WorkOrders, as does everything still in
+    memory when the history is closed, so a history reopened on the same shelf picks up where it left off.
+    """
+
+    def __init__(self, max_capsules: int = None, ttl: float = None, spill_filepath: str = None) -> None:
+        if max_capsules is not None and max_capsules < 1:
+            raise ValueError("A WorkOrderHistory needs room for at least one capsule.")
+        self.max_capsules = max_capsules
+        self.ttl = ttl
+        self.spill_filepath = spill_filepath
 
-    def __init__(self) -> None:
         self.by_ursula = {}  # type: dict
+        self._by_capsule = OrderedDict()  # capsule -> {Ursula's address: WorkOrder}, least recently used first
+        self._last_used = {}  # type: dict
+        self._spilled = shelve.open(spill_filepath) if spill_filepath else None
+        self._lock = RLock()
 
-    def __contains__(self, item):
-        assert False
+    def __contains__(self, capsule: Capsule):
+        return bool(self.by_capsule(capsule))
 
-    def __getitem__(self, item):
-        return self.by_ursula.setdefault(item, {})
+    def __getitem__(self, ursula_address):
+        return self.by_ursula.get(ursula_address, {})
 
     def __setitem__(self, key, value):
         assert False
@@ -721,13 +948,112 @@ class WorkOrderHistory:
     def ursulas(self):
         return self.by_ursula.keys()
 
-    def by_capsule(self, capsule: Capsule):
-        ursulas_by_capsules = {}  # type: dict
-        for ursula, capsules in self.by_ursula.items():
-            for saved_capsule, work_order in capsules.items():
-                if saved_capsule == capsule:
-                    ursulas_by_capsules[ursula] = work_order
-        return ursulas_by_capsules
+    def save(self, work_order: WorkOrder) -> None:
+        ursula_address = work_order.ursula.checksum_public_address
+        with self._lock:
+            for task in work_order.tasks:
+                self.by_ursula.setdefault(ursula_address, {})[task.capsule] = work_order
+                self._restore(task.capsule)[ursula_address] = work_order
+                self._touch(task.capsule)
+            self._evict()
+
+    def by_capsule(self, capsule: Capsule) -> dict:
+        with self._lock:
+            work_orders = self._restore(capsule)
+            if not work_orders:
+                del self._by_capsule[capsule]
+                return {}
+            self._touch(capsule)
+            self._evict()
+            return dict(work_orders)
+
+    def forget_arrangements(self, arrangement_ids) -> int:
+        """
+        Drops the WorkOrders made under these arrangements, shelved ones included - once their policy
+        is revoked or expired, say.  Returns how many were dropped.
+        """
+        arrangement_ids = set(arrangement_ids)
+        forgotten = 0
+        with self._lock:
+            for capsule, work_orders in list(self._by_capsule.items()):
+                for ursula_address, work_order in list(work_orders.items()):
+                    if work_order.arrangement_id not in arrangement_ids:
+                        continue
+                    del work_orders[ursula_address]
+                    work_orders_by_capsule = self.by_ursula[ursula_address]
+                    del work_orders_by_capsule[capsule]
+                    if not work_orders_by_capsule:
+                        del self.by_ursula[ursula_address]
+                    forgotten += 1
+                if not work_orders:
+                    del self._by_capsule[capsule]
+                    self._last_used.pop(capsule, None)
+
+            if self._spilled is not None:
+                for capsule_hex in list(self._spilled.keys()):
+                    spilled_work_orders = self._spilled[capsule_hex]
+                    kept = {ursula_address: work_order_bytes
+                            for ursula_address, work_order_bytes in spilled_work_orders.items()
+                            if WorkOrder.from_bytes(work_order_bytes).arrangement_id not in arrangement_ids}
+                    forgotten += len(spilled_work_orders) - len(kept)
+                    if not kept:
+                        del self._spilled[capsule_hex]
+                    elif len(kept) < len(spilled_work_orders):
+                        self._spilled[capsule_hex] = kept
+        return forgotten
+
+    def _touch(self, capsule: Capsule) -> None:
+        self._by_capsule.move_to_end(capsule)
+        self._last_used[capsule] = time.monotonic()
+
+    def _restore(self, capsule: Capsule) -> dict:
+        """
+        The {Ursula's address: WorkOrder} entry for this capsule, brought back from the shelf if it was spilled there.
+        """
+        try:
+            return self._by_capsule[capsule]
+        except KeyError:
+            work_orders = self._by_capsule[capsule] = dict()
+
+        if self._spilled is not None:
+            spilled_work_orders = self._spilled.pop(bytes(capsule).hex(), {})
+            for ursula_address, work_order_bytes in spilled_work_orders.items():
+                work_order = WorkOrder.from_bytes(work_order_bytes)
+                work_orders[ursula_address] = work_order
+                self.by_ursula.setdefault(ursula_address, {})[capsule] = work_order
+        return work_orders
+
+    def _evict(self) -> None:
+        now = time.monotonic()
+        while self._by_capsule:
+            capsule = next(iter(self._by_capsule))
+            over_capacity = self.max_capsules is not None and len(self._by_capsule) > self.max_capsules
+            expired = self.ttl is not None and now - self._last_used[capsule] > self.ttl
+            if not (over_capacity or expired):
+                break
+
+            work_orders = self._by_capsule.pop(capsule)
+            del self._last_used[capsule]
+            for ursula_address in work_orders:
+                work_orders_by_capsule = self.by_ursula[ursula_address]
+                del work_orders_by_capsule[capsule]
+                if not work_orders_by_capsule:
+                    del self.by_ursula[ursula_address]
+
+            if self._spilled is not None:
+                self._spill(capsule, work_orders)
+
+    def _spill(self, capsule: Capsule, work_orders: dict) -> None:
+        self._spilled[bytes(capsule).hex()] = {ursula_address: bytes(work_order)
+                                               for ursula_address, work_order in work_orders.items()}
+
+    def close(self) -> None:
+        if self._spilled is not None:
+            with self._lock:
+                for capsule, work_orders in self._by_capsule.items():
+                    if work_orders:
+                        self._spill(capsule, work_orders)
+            self._spilled.close()
 
 
 class Revocation:
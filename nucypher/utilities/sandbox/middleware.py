@@ -14,12 +14,15 @@ GNU Affero General Public License for more details.
 You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
+import itertools
 import requests
 import socket
+import time
+from threading import Event, Lock
 
 from bytestring_splitter import VariableLengthBytestring
 from nucypher.characters.lawful import Ursula
-from nucypher.network.middleware import RestMiddleware, NucypherMiddlewareClient
+from nucypher.network.middleware import RestMiddleware, NucypherMiddlewareClient, UnexpectedResponse
 from nucypher.utilities.sandbox.constants import MOCK_KNOWN_URSULAS_CACHE
 from constant_sorrow.constants import CERTIFICATE_NOT_SAVED
 
@@ -31,6 +34,7 @@ class _TestMiddlewareClient(NucypherMiddlewareClient):
     @staticmethod
     def response_cleaner(response):
         response.content = response.data
+        response.iter_content = lambda chunk_size=1: response.iter_encoded()
         return response
 
     def _get_mock_client_by_ursula(self, ursula):
@@ -69,9 +73,13 @@ class _TestMiddlewareClient(NucypherMiddlewareClient):
         # We don't use certs in mock-style tests anyway.
         return node.rest_url(), CERTIFICATE_NOT_SAVED, mock_client
 
+    def connection_for(self, node, host, certificate_filepath, http_client):
+        return http_client  # The mock client is all the connection there is.
+
     def invoke_method(self, method, url, *args, **kwargs):
         _cert_location = kwargs.pop("verify")  # TODO: Is this something that can be meaningfully tested?
         kwargs.pop("timeout", None)  # Just get rid of timeout; not needed for the test client.
+        kwargs.pop("stream", None)  # Nor stream; the test client reads the whole response anyway.
         response = super().invoke_method(method, url, *args, **kwargs)
         return response
 
@@ -134,6 +142,95 @@ class NodeIsDownMiddleware(MockRestMiddleware):
         self.client.ports_that_are_down.remove(node.rest_information()[0].port)
 
 
+class SlowMiddleware(MockRestMiddleware):
+    """
+    Modified middleware to emulate nodes taking their time over one kind of request - learning,
+    enacting or considering arrangements, looking up TreasureMaps, re-encrypting and so on -
+    named by the middleware method that makes it.
+
+    Only the nodes in slow_nodes hang, unless everyone is slow.  Each request is counted, along with
+    the node it went to and how many were in flight at once.
+    """
+    def __init__(self, slow_method: str, hang_for: float, everyone: bool = False, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.hang_for = hang_for
+        self.everyone = everyone
+        self.slow_nodes = set()
+
+        self.was_asked = Event()
+        self.times_asked = 0
+        self.nodes_asked = list()
+        self.in_flight = 0
+        self.most_in_flight = 0
+        self._lock = Lock()
+
+        setattr(self, slow_method, self._slowed(getattr(self, slow_method)))
+
+    @staticmethod
+    def _node_of(*args, **kwargs):
+        """
+        The node a request goes to, whether it's passed outright or on the WorkOrder or Arrangement for it.
+        """
+        for candidate in itertools.chain(args, kwargs.values()):
+            node = getattr(candidate, 'ursula', candidate)
+            if hasattr(node, 'checksum_public_address'):
+                return node
+        return None
+
+    def _slowed(self, method):
+        def slowed_method(*args, **kwargs):
+            node = self._node_of(*args, **kwargs)
+            with self._lock:
+                self.times_asked += 1
+                self.nodes_asked.append(node)
+                self.in_flight += 1
+                self.most_in_flight = max(self.most_in_flight, self.in_flight)
+            self.was_asked.set()
+            try:
+                if self.everyone or (node is not None and node.checksum_public_address in self.slow_nodes):
+                    time.sleep(self.hang_for)
+                return method(*args, **kwargs)
+            finally:
+                with self._lock:
+                    self.in_flight -= 1
+        return slowed_method
+
+
+class UnreliableReencryptionMiddleware(MockRestMiddleware):
+    """
+    Modified middleware to emulate some Ursulas turning down Bob's work orders, and others whose
+    responses are cut off partway - either quietly, or with the connection dropping mid-chunk.
+    """
+    def __init__(self, *args, cut_by: int = 5, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.refusing_nodes = set()
+        self.truncating_nodes = set()
+        self.breaking_nodes = set()
+        self.cut_by = cut_by
+
+    def reencrypt(self, work_order, on_cfrag=None):
+        if work_order.ursula.checksum_public_address in self.refusing_nodes:
+            raise UnexpectedResponse("Not today.")
+        return super().reencrypt(work_order, on_cfrag=on_cfrag)
+
+    def send_work_order_payload_to_ursula(self, work_order):
+        response = super().send_work_order_payload_to_ursula(work_order)
+        ursula_address = work_order.ursula.checksum_public_address
+        if ursula_address not in self.truncating_nodes | self.breaking_nodes:
+            return response
+
+        body = b"".join(response.iter_content(chunk_size=None))[:-self.cut_by]
+        breaks = ursula_address in self.breaking_nodes
+
+        def cut_off_content(chunk_size=None):
+            yield body
+            if breaks:
+                raise requests.exceptions.ChunkedEncodingError("Connection broken: IncompleteRead")
+
+        response.iter_content = cut_off_content
+        return response
+
+
 class EvilMiddleWare(MockRestMiddleware):
     """
     Middleware for assholes.
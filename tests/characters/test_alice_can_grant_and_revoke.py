@@ -17,6 +17,8 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 
 
 import os
+import time
+from threading import Lock
 
 import datetime
 import maya
@@ -28,9 +30,10 @@ from nucypher.characters.lawful import Bob
 from nucypher.config.characters import AliceConfiguration
 from nucypher.crypto.api import keccak_digest
 from nucypher.crypto.powers import SigningPower, DecryptingPower
+from nucypher.network.middleware import NotFound, UnexpectedResponse
 from nucypher.policy.models import Revocation
 from nucypher.utilities.sandbox.constants import INSECURE_DEVELOPMENT_PASSWORD
-from nucypher.utilities.sandbox.middleware import MockRestMiddleware
+from nucypher.utilities.sandbox.middleware import MockRestMiddleware, SlowMiddleware
 from nucypher.utilities.sandbox.policy import MockPolicyCreation
 
 
@@ -108,6 +111,93 @@ def test_federated_grant(federated_alice, federated_bob):
         assert kfrag == retrieved_kfrag
 
 
+@pytest.mark.usefixtures('federated_ursulas')
+def test_federated_grant_falls_back_to_two_round_trips(federated_alice, federated_bob):
+
+    class MiddlewareForOlderUrsulas(MockRestMiddleware):
+        def enact_arrangement(self, arrangement, payload):
+            raise NotFound("No such endpoint on this Ursula.")
+
+    m, n = 2, 3
+    policy_end_datetime = maya.now() + datetime.timedelta(days=5)
+    middleware = MiddlewareForOlderUrsulas()
+
+    policy = federated_alice.create_policy(federated_bob, label=b"two round trips", m=m, n=n, federated=True)
+    policy.make_arrangements(middleware, value=None, expiration=policy_end_datetime, propose_and_enact=True)
+    policy.enact(middleware, publish=False)
+
+    assert len(policy._enacted_arrangements) == len(list(policy.treasure_map)) == n
+    for kfrag, arrangement in policy._enacted_arrangements.items():
+        retrieved_policy = arrangement.ursula.datastore.get_policy_arrangement(arrangement.id.hex().encode())
+        assert KFrag.from_bytes(retrieved_policy.kfrag) == kfrag
+
+
+@pytest.mark.usefixtures('federated_ursulas')
+def test_federated_grant_offers_a_turned_away_kfrag_to_the_next_ursula(federated_alice, federated_bob):
+
+    class MiddlewareWithAChoosyUrsula(MockRestMiddleware):
+        choosy_ursula = None
+        _choosing = Lock()
+
+        def enact_arrangement(self, arrangement, payload):
+            with self._choosing:
+                if self.choosy_ursula is None:
+                    self.choosy_ursula = arrangement.ursula
+                turned_away = arrangement.ursula == self.choosy_ursula
+            if turned_away:
+                raise UnexpectedResponse("400 Bad Request")
+            return super().enact_arrangement(arrangement, payload)
+
+    m, n = 2, 3
+    policy_end_datetime = maya.now() + datetime.timedelta(days=5)
+    middleware = MiddlewareWithAChoosyUrsula()
+
+    policy = federated_alice.create_policy(federated_bob, label=b"choosy ursula", m=m, n=n, federated=True)
+    policy.make_arrangements(middleware, value=None, expiration=policy_end_datetime, propose_and_enact=True)
+    policy.enact(middleware, publish=False)
+
+    # Her KFrag went to someone else, and the Policy was enacted all the same.
+    assert len(policy._enacted_arrangements) == n
+    assert middleware.choosy_ursula not in {a.ursula for a in policy._enacted_arrangements.values()}
+
+
+@pytest.mark.usefixtures('federated_ursulas')
+def test_federated_policy_is_enacted_with_all_ursulas_at_once(federated_alice, federated_bob):
+    m, n = 2, 3
+    policy_end_datetime = maya.now() + datetime.timedelta(days=5)
+    middleware = SlowMiddleware('enact_policy', hang_for=0.5, everyone=True)
+
+    policy = federated_alice.create_policy(federated_bob, label=b"concurrent enactment", m=m, n=n, federated=True)
+    policy.make_arrangements(middleware, value=None, expiration=policy_end_datetime)
+    policy.enact(middleware, publish=False)
+
+    # Every Ursula was waited on at the same time, and every one of them made it into the TreasureMap.
+    assert middleware.most_in_flight == n
+    assert len(list(policy.treasure_map)) == n
+    for arrangement in policy._enacted_arrangements.values():
+        assert arrangement.ursula.datastore.get_policy_arrangement(arrangement.id.hex().encode()).kfrag
+
+
+def test_negotiation_stops_once_enough_ursulas_accept(federated_alice, federated_bob, federated_ursulas):
+    m, n = 2, 3
+    hang_for = 3
+    policy_end_datetime = maya.now() + datetime.timedelta(days=5)
+
+    middleware = SlowMiddleware('consider_arrangement', hang_for=hang_for)
+    prompt_ursulas = list(federated_ursulas)[:n]
+    for ursula in federated_ursulas:
+        if ursula not in prompt_ursulas:
+            middleware.slow_nodes.add(ursula.checksum_public_address)
+
+    policy = federated_alice.create_policy(federated_bob, label=b"impatient negotiation", m=m, n=n, federated=True)
+    started = time.perf_counter()
+    policy.make_arrangements(middleware, value=None, expiration=policy_end_datetime)
+
+    # Alice didn't wait for the slow negotiators; she had her n Ursulas without them.
+    assert time.perf_counter() - started < hang_for
+    assert {arrangement.ursula for arrangement in policy._accepted_arrangements} == set(prompt_ursulas)
+
+
 @pytest.mark.usefixtures('federated_ursulas')
 def test_revocation(federated_alice, federated_bob):
     m, n = 2, 3
@@ -16,15 +16,24 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+import datetime
+import os
+import time
+
+import maya
+import msgpack
 import pytest
 import pytest_twisted
 from twisted.internet import threads
 
+from bytestring_splitter import BytestringSplittingError
 from umbral import pre
 from umbral.kfrags import KFrag
 from umbral.cfrags import CapsuleFrag
 
+from nucypher.characters.lawful import Enrico
 from nucypher.crypto.powers import DecryptingPower 
+from nucypher.policy.models import WorkOrder, WorkOrderHistory
 from nucypher.utilities.sandbox.middleware import MockRestMiddleware
 
 
@@ -207,6 +216,12 @@ def test_bob_can_issue_a_work_order_to_a_specific_ursula(enacted_federated_polic
     assert len(work_orders_from_bob) == 1
     assert work_orders_from_bob[0] == work_order
 
+    # And that it's in her ledger for good, without the capsules.
+    work_order_records = ursula.work_order_records(bob=federated_bob)
+    assert len(work_order_records) == 1
+    assert work_order_records[0].bob_signature == bytes(work_order.receipt_signature)
+    assert work_order_records[0].arrangement_id == work_order.arrangement_id
+
 
 def test_bob_remembers_that_he_has_cfrags_for_a_particular_capsule(enacted_federated_policy, federated_bob,
                                                                    federated_ursulas, capsule_side_channel):
@@ -303,3 +318,142 @@ def test_federated_bob_retrieves(federated_bob,
 
     # We show that indeed this is the passage originally encrypted by the Enrico.
     assert b"Welcome to the flippering." == delivered_cleartexts[0]
+
+
+def capsules_for(enrico, policy, alice, bob, plaintexts):
+    """
+    Capsules for each plaintext from Enrico, ready for Bob to check the cfrags he gets for them.
+    """
+    capsules = list()
+    for plaintext in plaintexts:
+        message_kit, _signature = enrico.encrypt_message(plaintext)
+        message_kit.capsule.set_correctness_keys(delegating=policy.public_key,
+                                                 receiving=bob.public_keys(DecryptingPower),
+                                                 verifying=alice.stamp.as_umbral_pubkey())
+        capsules.append(message_kit.capsule)
+    return capsules
+
+
+def test_work_order_history_spills_evicted_capsules_to_disk(enacted_federated_policy, federated_bob,
+                                                            federated_alice, federated_ursulas, tmpdir):
+    enrico = Enrico(policy_encrypting_key=enacted_federated_policy.public_key)
+    ursula = list(federated_ursulas)[0]
+
+    capsules = capsules_for(enrico, enacted_federated_policy, federated_alice, federated_bob,
+                            plaintexts=[b"heartbeat %d" % beat for beat in range(3)])
+    work_orders = [WorkOrder.construct_by_bob(os.urandom(32), [capsule], ursula, federated_bob)
+                   for capsule in capsules]
+
+    history = WorkOrderHistory(max_capsules=2, spill_filepath=str(tmpdir.join("work_orders")))
+    for work_order in work_orders:
+        history.save(work_order)
+
+    # The least recently used capsule made way...
+    assert len(history) == 2
+    assert capsules[0] not in history[ursula.checksum_public_address]
+
+    # ...but it's still just one lookup away.
+    restored_work_orders = history.by_capsule(capsules[0])
+    assert list(restored_work_orders) == [ursula.checksum_public_address]
+    assert bytes(restored_work_orders[ursula.checksum_public_address]) == bytes(work_orders[0])
+
+    # Bringing it back pushed out the next one in line.
+    assert len(history) == 2
+    assert capsules[1] not in history[ursula.checksum_public_address]
+    assert capsules[1] in history
+    history.close()
+
+    # What was still in memory went to the shelf on closing, so a history reopened on it carries on.
+    history = WorkOrderHistory(max_capsules=2, spill_filepath=str(tmpdir.join("work_orders")))
+    reopened_work_orders = history.by_capsule(capsules[1])
+    assert bytes(reopened_work_orders[ursula.checksum_public_address]) == bytes(work_orders[1])
+
+    # Forgetting an arrangement reaches into the shelf too.
+    assert history.forget_arrangements([work_orders[0].arrangement_id, work_orders[1].arrangement_id]) == 2
+    assert capsules[0] not in history
+    assert capsules[1] not in history
+    history.close()
+
+    # Without a place to spill to, capsules left unused past their time are just forgotten.
+    history = WorkOrderHistory(ttl=0.01)
+    history.save(work_orders[0])
+    time.sleep(0.02)
+    history.save(work_orders[1])
+    assert capsules[0] not in history
+    assert capsules[1] in history
+
+
+def test_bob_checks_each_cfrag_as_ursula_streams_it(federated_alice, federated_bob, federated_ursulas):
+    label = b"streamed cfrags test"
+    policy_end_datetime = maya.now() + datetime.timedelta(days=5)
+    policy = federated_alice.grant(federated_bob, label, m=1, n=1, expiration=policy_end_datetime)
+
+    map_id = policy.treasure_map.public_id()
+    federated_bob.treasure_maps[map_id] = policy.treasure_map
+    for ursula in federated_ursulas:
+        federated_bob.remember_node(ursula)
+
+    (ursula_address, arrangement_id), = list(policy.treasure_map)
+    ursula = next(u for u in federated_ursulas if u.checksum_public_address == ursula_address)
+
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+    capsules = capsules_for(enrico, policy, federated_alice, federated_bob,
+                            plaintexts=[b"One at a time, please."] * 3)
+    work_order = federated_bob.generate_work_orders(map_id, *capsules, num_ursulas=1)[ursula_address]
+
+    # Ursula answers with a stream, not one body made once every capsule is done.
+    response = ursula.rest_app.test_client().post(f"/kFrag/{arrangement_id.hex()}/reencrypt",
+                                                  data=work_order.payload())
+    assert response.status_code == 200
+    assert response.is_streamed
+    ursula_response_body = response.get_data()
+
+    # A WorkOrder without any capsules is turned away before anything is streamed.
+    empty_receipt = federated_bob.stamp(b"wo:" + bytes(ursula.stamp) + msgpack.dumps([]))
+    empty_work_order = WorkOrder(bob=federated_bob, arrangement_id=arrangement_id, tasks=[],
+                                 alice_address=work_order.alice_address, receipt_signature=empty_receipt,
+                                 ursula=ursula, blockhash=work_order.blockhash)
+    response = ursula.rest_app.test_client().post(f"/kFrag/{arrangement_id.hex()}/reencrypt",
+                                                  data=empty_work_order.payload())
+    assert response.status_code == 400
+
+    # Bob checks and attaches each cfrag as it arrives, before the next one is read.
+    def results_as_they_arrive():
+        ursula_rest_response = federated_bob.network_middleware.send_work_order_payload_to_ursula(work_order)
+        results = federated_bob.network_middleware.split_cfrags_and_signatures(ursula_rest_response)
+        for index, result in enumerate(results):
+            assert all(task.cfrag for task in work_order.tasks[:index])
+            assert not any(task.cfrag for task in work_order.tasks[index:])
+            yield result
+
+    # ...and hands each checked cfrag on right away, so it can go to its capsule while the rest are on their way.
+    handed_on = list()
+
+    def on_cfrag(task):
+        assert task.cfrag is not None
+        assert not any(later_task.cfrag for later_task in work_order.tasks[len(handed_on) + 1:])
+        handed_on.append(task)
+
+    cfrags = work_order.complete(results_as_they_arrive(), on_cfrag=on_cfrag)
+    assert len(cfrags) == len(capsules)
+    assert [task.cfrag for task in work_order.tasks] == cfrags
+    assert handed_on == work_order.tasks
+
+    # However the response happens to be chunked on its way to Bob - even a byte at a time - the same records come out.
+    class TricklingResponse:
+        def __init__(self, body):
+            self.body = body
+
+        def iter_content(self, chunk_size=None):
+            return (self.body[i:i + 1] for i in range(len(self.body)))
+
+        def close(self):
+            pass
+
+    splitter = federated_bob.network_middleware.split_cfrags_and_signatures
+    trickled_cfrags = [cfrag for cfrag, _signature in splitter(TricklingResponse(ursula_response_body))]
+    assert [bytes(cfrag) for cfrag in trickled_cfrags] == [bytes(cfrag) for cfrag in cfrags]
+
+    # A response cut off partway through a record doesn't pass for a shorter one.
+    with pytest.raises(BytestringSplittingError):
+        list(splitter(TricklingResponse(ursula_response_body[:-1])))
@@ -8,9 +8,11 @@ import pytest
 from constant_sorrow.constants import NO_DECRYPTION_PERFORMED
 from nucypher.characters.lawful import Bob, Ursula
 from nucypher.characters.lawful import Enrico
+from nucypher.crypto.kits import UmbralMessageKit
 from nucypher.policy.models import TreasureMap
 from nucypher.utilities.sandbox.constants import NUMBER_OF_URSULAS_IN_DEVELOPMENT_NETWORK, MOCK_POLICY_DEFAULT_M
-from nucypher.utilities.sandbox.middleware import MockRestMiddleware
+from nucypher.utilities.sandbox.middleware import MockRestMiddleware, SlowMiddleware, \
+    UnreliableReencryptionMiddleware
 
 
 def test_federated_bob_full_retrieve_flow(federated_ursulas,
@@ -101,25 +103,219 @@ def test_bob_joins_policy_and_retrieves(federated_alice,
 
     assert plaintext == delivered_cleartexts[0]
 
-    # FIXME: Bob tries to retrieve again
-    # delivered_cleartexts = bob.retrieve(message_kit=message_kit,
-    #                                     data_source=enrico,
-    #                                     alice_verifying_key=alices_verifying_key,
-    #                                     label=policy.label)
-    #
-    # assert plaintext == delivered_cleartexts[0]
+    # Bob tries to retrieve again; the cfrags he already has are enough.
+    delivered_cleartexts = bob.retrieve(message_kit=message_kit,
+                                        data_source=enrico,
+                                        alice_verifying_key=alices_verifying_key,
+                                        label=policy.label)
+
+    assert plaintext == delivered_cleartexts[0]
 
-    # # Let's try retrieve again, but Alice revoked the policy.
+    # Let's try retrieve again, but Alice revoked the policy.
     failed_revocations = federated_alice.revoke(policy)
     assert len(failed_revocations) == 0
 
+    # Anything new needs cfrags from the Ursulas, who no longer hold KFrags for Bob.
+    new_message_kit, _signature = enrico.encrypt_message(b"After the revocation.")
     with pytest.raises(Ursula.NotEnoughUrsulas):
-        _cleartexts = bob.retrieve(message_kit=message_kit,
+        _cleartexts = bob.retrieve(message_kit=new_message_kit,
                                    data_source=enrico,
                                    alice_verifying_key=alices_verifying_key,
                                    label=policy.label)
 
 
+def join_new_policy(alice, ursulas, m, n, middleware=None):
+    """
+    A new Bob, who knows every Ursula, joined to a fresh m-of-n policy from Alice; returns him and the policy.
+    """
+    bob = Bob(federated_only=True,
+              start_learning_now=False,
+              network_middleware=middleware or MockRestMiddleware(),
+              abort_on_learning_error=True,
+              known_nodes=ursulas,
+              )
+    policy = alice.grant(bob=bob,
+                         label=b'label://' + os.urandom(32),
+                         m=m,
+                         n=n,
+                         expiration=maya.now() + datetime.timedelta(days=5))
+    bob.join_policy(label=policy.label, alice_pubkey_sig=alice.stamp, block=True)
+    return bob, policy
+
+
+def read(bob, alice, enrico, policy, message_kit, **kwargs):
+    # A fresh copy of the kit each time, as if read off the wire again.
+    return bob.retrieve(message_kit=UmbralMessageKit.from_bytes(bytes(message_kit)),
+                        data_source=enrico,
+                        alice_verifying_key=alice.stamp.as_umbral_pubkey(),
+                        label=policy.label,
+                        **kwargs)
+
+
+def test_bob_does_not_wait_on_a_slow_ursula_for_cfrags(federated_alice, federated_ursulas):
+    hang_for = 5
+    middleware = SlowMiddleware('reencrypt', hang_for=hang_for)
+    m, n = 3, 4
+    bob, policy = join_new_policy(federated_alice, federated_ursulas, m=m, n=n, middleware=middleware)
+
+    # One of the Ursulas holding a KFrag is in no hurry.
+    slow_ursula = list(policy.treasure_map.destinations)[0]
+    middleware.slow_nodes.add(slow_ursula)
+
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+    plaintext = b"Not waiting around."
+    message_kit, _signature = enrico.encrypt_message(plaintext)
+
+    # All n work orders go out at once; the first m cfrags back are enough.
+    start = time.perf_counter()
+    delivered_cleartexts = read(bob, federated_alice, enrico, policy, message_kit, overprovisioning=n / m)
+    assert time.perf_counter() - start < hang_for
+    assert plaintext == delivered_cleartexts[0]
+
+    # Bob learned how quick the others were, for next time.
+    assert len(bob.reencryption_latencies) == m
+    assert slow_ursula not in bob.reencryption_latencies
+
+
+def test_bob_retrieves_past_an_ursula_who_turns_him_away(federated_alice, federated_ursulas):
+    middleware = UnreliableReencryptionMiddleware()
+    bob, policy = join_new_policy(federated_alice, federated_ursulas, m=2, n=3, middleware=middleware)
+
+    # One of the Ursulas holding a KFrag won't have it; she's just a miss, and the next Ursula is asked instead.
+    refusing_ursula = list(policy.treasure_map.destinations)[0]
+    middleware.refusing_nodes.add(refusing_ursula)
+
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+    plaintext = b"Someone else, then."
+    message_kit, _signature = enrico.encrypt_message(plaintext)
+
+    delivered_cleartexts = read(bob, federated_alice, enrico, policy, message_kit, overprovisioning=1)
+    assert plaintext == delivered_cleartexts[0]
+    assert refusing_ursula not in bob.reencryption_latencies
+
+
+def test_bob_retrieves_past_ursulas_whose_responses_are_cut_off(federated_alice, federated_ursulas):
+    middleware = UnreliableReencryptionMiddleware()
+    bob, policy = join_new_policy(federated_alice, federated_ursulas, m=2, n=4, middleware=middleware)
+
+    # One Ursula's response just stops short; another's connection drops partway through a chunk.
+    truncating_ursula, breaking_ursula, *_others = list(policy.treasure_map.destinations)
+    middleware.truncating_nodes.add(truncating_ursula)
+    middleware.breaking_nodes.add(breaking_ursula)
+
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+    plaintext = b"All of it, please."
+    message_kit, _signature = enrico.encrypt_message(plaintext)
+
+    # Both are misses, and Bob reads the message with the cfrags of the other two.
+    delivered_cleartexts = read(bob, federated_alice, enrico, policy, message_kit, overprovisioning=1)
+    assert plaintext == delivered_cleartexts[0]
+    assert truncating_ursula not in bob.reencryption_latencies
+    assert breaking_ursula not in bob.reencryption_latencies
+
+
+def test_bob_retrieves_many_message_kits_in_one_work_order_per_ursula(federated_alice, federated_ursulas):
+    bob, policy = join_new_policy(federated_alice, federated_ursulas, m=2, n=3)
+
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+    plaintexts = [b"heartbeat %d" % beat for beat in range(10)]
+    message_kits = [enrico.encrypt_message(plaintext)[0] for plaintext in plaintexts]
+
+    delivered_cleartexts = bob.retrieve_many(message_kits=message_kits,
+                                             data_source=enrico,
+                                             alice_verifying_key=federated_alice.stamp.as_umbral_pubkey(),
+                                             label=policy.label)
+    assert delivered_cleartexts == plaintexts
+
+    # Every Ursula got a single WorkOrder carrying all of the capsules.
+    for work_orders_by_capsule in bob._saved_work_orders.by_ursula.values():
+        assert len(work_orders_by_capsule) == len(message_kits)
+        for work_order in work_orders_by_capsule.values():
+            assert len(work_order) == len(message_kits)
+
+
+def test_bob_retrieves_a_stream_of_message_kits(federated_alice, federated_ursulas):
+    bob, policy = join_new_policy(federated_alice, federated_ursulas, m=2, n=3)
+
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+    plaintexts = [b"heartbeat %d" % beat for beat in range(12)]
+    kits_read = list()
+
+    def heartbeats():
+        for plaintext in plaintexts:
+            kits_read.append(plaintext)
+            yield enrico.encrypt_message(plaintext)[0]
+
+    batches = list()
+    retrieve_many = bob.retrieve_many
+
+    def counting_retrieve_many(message_kits, **kwargs):
+        batches.append(len(message_kits))
+        return retrieve_many(message_kits=message_kits, **kwargs)
+
+    bob.retrieve_many = counting_retrieve_many
+
+    window = 4
+    stream = bob.retrieve_stream(message_kits=heartbeats(),
+                                 data_source=enrico,
+                                 alice_verifying_key=federated_alice.stamp.as_umbral_pubkey(),
+                                 label=policy.label,
+                                 window=window)
+
+    # Nothing is read until the consumer asks, and then no more than a window ahead of it.
+    assert not kits_read
+    assert next(stream) == plaintexts[0]
+    assert len(kits_read) == 2 * window
+
+    assert list(stream) == plaintexts[1:]
+    assert kits_read == plaintexts
+
+    # One retrieve_many call - one WorkOrder per Ursula - per window.
+    assert batches == [window] * 3
+
+
+def test_bob_rereads_with_the_cfrags_he_already_has(federated_alice, federated_ursulas):
+    middleware = UnreliableReencryptionMiddleware()
+    bob, policy = join_new_policy(federated_alice, federated_ursulas, m=2, n=3, middleware=middleware)
+    map_id = policy.treasure_map.public_id()
+
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+    plaintext = b"Hot data."
+    message_kit, _signature = enrico.encrypt_message(plaintext)
+
+    assert read(bob, federated_alice, enrico, policy, message_kit) == [plaintext]
+
+    # Even with every Ursula turning him away, Bob can read it again: the cfrags are in his WorkOrderHistory.
+    middleware.refusing_nodes.update(policy.treasure_map.destinations)
+    assert read(bob, federated_alice, enrico, policy, message_kit) == [plaintext]
+
+    # Bob heard when the policy expires along with its TreasureMap; after that, what he has is no good.
+    assert bob.policy_expirations[map_id] > maya.now()
+    bob.policy_expirations[map_id] = maya.now() - datetime.timedelta(seconds=1)
+    with pytest.raises(Ursula.NotEnoughUrsulas):
+        read(bob, federated_alice, enrico, policy, message_kit)
+
+
+def test_bob_forgets_his_cfrags_once_he_learns_of_a_revocation(federated_alice, federated_ursulas):
+    bob, policy = join_new_policy(federated_alice, federated_ursulas, m=2, n=3)
+
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+    message_kit, _signature = enrico.encrypt_message(b"Read before the revocation.")
+    assert read(bob, federated_alice, enrico, policy, message_kit) == [b"Read before the revocation."]
+
+    failed_revocations = federated_alice.revoke(policy)
+    assert len(failed_revocations) == 0
+
+    # The Ursulas tell Bob they've nothing for him the next time he asks them for anything...
+    new_message_kit, _signature = enrico.encrypt_message(b"Written after it.")
+    with pytest.raises(Ursula.NotEnoughUrsulas):
+        read(bob, federated_alice, enrico, policy, new_message_kit)
+
+    # ...and with that, the cfrags from before are gone too.
+    with pytest.raises(Ursula.NotEnoughUrsulas):
+        read(bob, federated_alice, enrico, policy, message_kit)
+
+
 def test_treasure_map_serialization(enacted_federated_policy, federated_bob):
     treasure_map = enacted_federated_policy.treasure_map
     assert treasure_map.m is not None
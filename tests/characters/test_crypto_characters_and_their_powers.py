@@ -22,7 +22,7 @@ from nucypher.characters.lawful import Alice, Character, Bob
 from nucypher.characters.lawful import Enrico
 from nucypher.crypto import api
 from nucypher.crypto.powers import CryptoPower, SigningPower, NoSigningPower, \
-    BlockchainPower, PowerUpError
+    BlockchainPower, DecryptingPower, PowerUpError
 
 """
 Chapter 1: SIGNING
@@ -92,6 +92,27 @@ def test_anybody_can_verify():
     assert cleartext is constants.NO_DECRYPTION_PERFORMED
 
 
+def test_a_stranger_is_enough_to_verify(federated_alice, federated_bob):
+    alices_verifying_key = federated_alice.stamp.as_umbral_pubkey()
+
+    # Seen once, remembered after that - from the key or its bytes.
+    stranger = Alice.stranger(alices_verifying_key)
+    assert Alice.stranger(bytes(alices_verifying_key)) is stranger
+    assert stranger == federated_alice
+    assert Bob.stranger(alices_verifying_key) is not stranger
+
+    message = b"Only my verifying key to go on."
+    message_kit, _signature = federated_alice.encrypt_for(federated_bob, message)
+    cleartext = federated_bob.verify_from(stranger, message_kit, decrypt=True)
+    assert cleartext == message
+
+    # A Stranger can't sign, or be anything more than a verifying key.
+    with pytest.raises(NoSigningPower):
+        stranger.stamp(message)
+    with pytest.raises(PowerUpError):
+        stranger.public_keys(DecryptingPower)
+
+
 def test_character_blockchain_power(testerchain):
     # TODO: Handle multiple providers
     eth_address = testerchain.interface.w3.eth.accounts[0]
@@ -313,6 +313,8 @@ def federated_ursulas(ursula_federated_test_config):
     _ursulas = make_federated_ursulas(ursula_config=ursula_federated_test_config,
                                       quantity=NUMBER_OF_URSULAS_IN_DEVELOPMENT_NETWORK)
     yield _ursulas
+    for ursula in _ursulas:
+        ursula.shutdown()
 
 #
 # Blokchain
@@ -418,4 +420,6 @@ def blockchain_ursulas(three_agents, ursula_decentralized_test_config):
     _ursulas.extend(_non_staking_ursula)
     token_agent.blockchain.time_travel(periods=1)
     yield _ursulas
+    for ursula in _ursulas:
+        ursula.shutdown()
 
@@ -15,9 +15,20 @@ You should have received a copy of the GNU Affero General Public License
 along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 import pytest
-from datetime import datetime
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 
+import maya
+from sqlalchemy.engine import create_engine
+from sqlalchemy.pool import StaticPool
+
+from nucypher.crypto.signing import SignatureStamp
 from nucypher.keystore import keystore, keypairs
+from nucypher.keystore.db import Base
+from nucypher.keystore.ledger import WorkOrderLedger
+from nucypher.keystore.threading import ThreadedSession
+from nucypher.keystore.treasure_maps import TreasureMapStore
 
 
 @pytest.mark.usefixtures('testerchain')
@@ -75,3 +86,104 @@ def test_workorder_sqlite_keystore(test_keystore):
     deleted = test_keystore.del_workorders(arrangement_id)
     assert deleted > 0
     assert test_keystore.get_workorders(arrangement_id).count() == 0
+
+
+def test_work_order_ledger_writes_behind_in_batches():
+    # Batches are flushed on another thread, so this datastore - like Ursula's - shares its in-memory connection.
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    datastore = keystore.KeyStore(engine)
+
+    Participant = namedtuple("Participant", ("stamp",))
+    SeenWorkOrder = namedtuple("SeenWorkOrder", ("bob", "receipt_signature", "arrangement_id"))
+
+    bob = Participant(stamp=SignatureStamp(keypairs.SigningKeypair(generate_keys_if_needed=True).pubkey))
+    another_bob = Participant(stamp=SignatureStamp(keypairs.SigningKeypair(generate_keys_if_needed=True).pubkey))
+
+    ledger = WorkOrderLedger(datastore=datastore, batch_size=3, retention=timedelta(days=1))
+
+    assert ledger.record(SeenWorkOrder(bob, b'signature 0', b'arrangement 0')) is None
+    assert ledger.record(SeenWorkOrder(bob, b'signature 1', b'arrangement 1')) is None
+    assert datastore.get_workorders().count() == 0  # Not yet...
+
+    # ...but a full batch goes in at once, off the recording thread - Bob's key only the one time,
+    # and a retried WorkOrder not at all.
+    flushing = ledger.record(SeenWorkOrder(bob, b'signature 1', b'arrangement 1'))
+    assert flushing.result(timeout=5) == 2
+    assert datastore.get_workorders().count() == 2
+
+    # Queries always see what's been recorded, written or not.
+    ledger.record(SeenWorkOrder(another_bob, b'signature 2', b'arrangement 0'))
+    assert len(ledger.work_orders(bob=bob)) == 2
+    assert [w.bob_signature for w in ledger.work_orders(arrangement_id=b'arrangement 0')] == [b'signature 0',
+                                                                                           b'signature 2']
+    first_page, second_page = ledger.work_orders(limit=2), ledger.work_orders(limit=2, offset=2)
+    assert [w.bob_signature for w in first_page + second_page] == [b'signature 0', b'signature 1', b'signature 2']
+    assert len(ledger) == 3
+
+    # Nothing is old enough to be pruned yet.
+    assert ledger.prune() == 0
+    assert datastore.del_workorders_before(datetime.utcnow() + timedelta(seconds=1)) == 3
+
+    # Stopping the ledger writes out what's still buffered; after that, a full batch is written inline.
+    ledger.record(SeenWorkOrder(bob, b'signature 3', b'arrangement 3'))
+    ledger.stop()
+    assert datastore.get_workorders().count() == 1
+    for signature in (b'signature 4', b'signature 5', b'signature 6'):
+        assert ledger.record(SeenWorkOrder(bob, signature, b'arrangement 4')) is None
+    assert datastore.get_workorders().count() == 4
+
+    # A timed flush that fails doesn't take the flushing loop down with it, nor lose the batch.
+    tableless_datastore = keystore.KeyStore(create_engine('sqlite://'))
+    broken_ledger = WorkOrderLedger(datastore=tableless_datastore, batch_size=3)
+    broken_ledger.record(SeenWorkOrder(bob, b'signature 7', b'arrangement 7'))
+    broken_ledger._flush_and_prune()
+    assert len(broken_ledger._pending) == 1
+
+
+def test_treasure_map_store_keeps_maps_until_their_policies_expire(test_keystore, enacted_federated_policy):
+    treasure_map = enacted_federated_policy.treasure_map
+    treasure_maps = TreasureMapStore(datastore=test_keystore, cache_size=1, prune_interval=60)
+
+    assert treasure_maps.store(b'map', treasure_map, expiration=maya.now() + timedelta(days=1)) is True
+    assert treasure_maps.store(b'map', treasure_map) is False  # We already have this one.
+
+    # Pushed out of memory, the TreasureMap is still to be found in the datastore.
+    treasure_maps[b'another map'] = treasure_map
+    assert b'map' not in treasure_maps.cache
+    assert bytes(treasure_maps[b'map']) == bytes(treasure_map)
+    assert len(treasure_maps) == 2
+
+    # An expired TreasureMap is as good as gone...
+    treasure_maps.store(b'expired map', treasure_map, expiration=maya.now() - timedelta(seconds=1))
+    assert b'expired map' not in treasure_maps
+    with pytest.raises(KeyError):
+        _treasure_map = treasure_maps[b'expired map']
+
+    # ...and the next prune takes it, and it alone, out of the datastore.
+    treasure_maps.store(b'expiring map', treasure_map, expiration=maya.now() - timedelta(seconds=1))
+    assert treasure_maps.prune() == 1
+    assert len(treasure_maps) == 2
+
+    assert treasure_maps.pop(b'map') is not None
+    assert treasure_maps.pop(b'map', None) is None
+
+
+def test_sessions_on_a_shared_in_memory_connection_take_turns():
+    # As Ursula's in-memory datastore is set up: one connection, shared by every thread.
+    engine = create_engine('sqlite://', connect_args={'check_same_thread': False}, poolclass=StaticPool)
+    Base.metadata.create_all(engine)
+    datastore = keystore.KeyStore(engine)
+
+    def add_and_count(i):
+        with ThreadedSession(engine) as session:
+            datastore.add_treasure_map(b'map %d' % i, b'treasure', session=session)
+            return datastore.count_treasure_maps(session=session)
+
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        counts = list(executor.map(add_and_count, range(50)))
+
+    # Had the sessions interleaved, some would have seen (or lost) another's uncommitted work.
+    assert sorted(counts) == list(range(1, 51))
+    with ThreadedSession(engine) as session:
+        assert datastore.count_treasure_maps(session=session) == 50
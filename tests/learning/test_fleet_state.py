@@ -1,8 +1,19 @@
-from constant_sorrow.constants import FLEET_STATES_MATCH, NO_KNOWN_NODES
+import os
+import random
+from functools import partial
+
+import pytest
+from constant_sorrow.constants import FLEET_STATES_MATCH, NO_KNOWN_NODES, FLEET_STATE_DELTA
+from bytestring_splitter import VariableLengthBytestring
 from hendrix.experience import crosstown_traffic
 from hendrix.utils.test_utils import crosstownTaskListDecoratorFactory
+
+from nucypher.characters.lawful import Ursula
+from nucypher.crypto.api import keccak_digest
+from nucypher.crypto.signing import signature_splitter
+from nucypher.network.fleet_digest import FleetDigest
+from nucypher.network.nodes import FleetStateTracker
 from nucypher.utilities.sandbox.ursula import make_federated_ursulas
-from functools import partial
 
 
 def test_learning_from_node_with_no_known_nodes(ursula_federated_test_config):
@@ -53,6 +64,32 @@ def test_nodes_with_equal_fleet_state_do_not_send_anew(federated_ursulas):
     assert result is FLEET_STATES_MATCH
 
 
+def test_fleet_digest_does_not_depend_on_learning_order():
+    fleet = {"0x" + os.urandom(20).hex(): keccak_digest(os.urandom(64)) for _ in range(200)}
+
+    def digest_of(addresses):
+        digest = FleetDigest()
+        for address in addresses:
+            digest.put(address, fleet[address])
+        return digest
+
+    in_order = digest_of(sorted(fleet))
+    shuffled = list(fleet)
+    random.shuffle(shuffled)
+    out_of_order = digest_of(shuffled)
+
+    assert in_order.root == out_of_order.root
+    assert list(out_of_order.keys()) == sorted(fleet)
+
+    # Updating a node lands on the same digest as learning the result from scratch.
+    updated_address = shuffled[0]
+    fleet[updated_address] = keccak_digest(b"a newer version of this node")
+    out_of_order.put(updated_address, fleet[updated_address])
+
+    assert out_of_order.root == digest_of(sorted(fleet)).root
+    assert len(out_of_order) == len(fleet)
+
+
 def test_old_state_is_preserved(federated_ursulas, ursula_federated_test_config):
     lonely_ursula_maker = partial(make_federated_ursulas,
                                   ursula_config=ursula_federated_test_config,
@@ -74,11 +111,11 @@ def test_old_state_is_preserved(federated_ursulas, ursula_federated_test_config)
     assert checksum_after_learning_one != checksum_after_learning_two
 
     proper_first_state = sorted([some_ursula_in_the_fleet, lonely_learner], key=lambda n: n.checksum_public_address)
-    assert lonely_learner.known_nodes.states[checksum_after_learning_one].nodes == proper_first_state
+    assert lonely_learner.known_nodes.materialize_state(checksum_after_learning_one).nodes == proper_first_state
 
     proper_second_state = sorted([some_ursula_in_the_fleet, another_ursula_in_the_fleet, lonely_learner],
                                  key=lambda n: n.checksum_public_address)
-    assert lonely_learner.known_nodes.states[checksum_after_learning_two].nodes == proper_second_state
+    assert lonely_learner.known_nodes.materialize_state(checksum_after_learning_two).nodes == proper_second_state
 
 
 def test_state_is_recorded_after_learning(federated_ursulas, ursula_federated_test_config):
@@ -101,8 +138,133 @@ def test_state_is_recorded_after_learning(federated_ursulas, ursula_federated_te
     # The rest of the fucking owl.
     lonely_learner.learn_from_teacher_node()
 
-    states = list(lonely_learner.known_nodes.states.values())
+    fleet = lonely_learner.known_nodes
+    states = [fleet.materialize_state(state.checksum) for state in reversed(fleet.previous_states())]
     assert len(states) == 2
 
     assert len(states[0].nodes) == 2  # This and one other.
     assert len(states[1].nodes) == len(federated_ursulas) + 1  # Again, accounting for this Learner.
+
+
+def test_teacher_payload_is_signed_once_per_fleet_state(federated_ursulas, ursula_federated_test_config):
+    lonely_ursula_maker = partial(make_federated_ursulas,
+                                  ursula_config=ursula_federated_test_config,
+                                  quantity=1,
+                                  know_each_other=False)
+    lonely_teacher = lonely_ursula_maker().pop()
+    fleet = lonely_teacher.known_nodes
+
+    def signed_payload():
+        return fleet.signed_payload(stamp=lonely_teacher.stamp, this_node_bytes=lonely_teacher.__bytes__)
+
+    lonely_teacher.remember_node(list(federated_ursulas)[0])
+    first_payload = signed_payload()
+
+    # Asking again for the same fleet state is served the very same bytes; nothing is signed anew.
+    assert signed_payload() is first_payload
+
+    # ...unless the teacher's own metadata has changed since.
+    repainted_payload = fleet.signed_payload(stamp=lonely_teacher.stamp, this_node_bytes=lambda: b"new metadata")
+    assert repainted_payload is not first_payload
+    assert repainted_payload.endswith(bytes(VariableLengthBytestring(b"new metadata")))
+
+    signature, remainder = signature_splitter(first_payload, return_remainder=True)
+    assert signature.verify(remainder, lonely_teacher.stamp.as_umbral_pubkey())
+    assert remainder.startswith(fleet.snapshot())
+
+    # Only a new fleet state causes the payload to be built again.
+    lonely_teacher.remember_node(list(federated_ursulas)[1])
+    second_payload = signed_payload()
+    assert second_payload is not first_payload
+
+    _signature, remainder = signature_splitter(second_payload, return_remainder=True)
+    assert remainder.startswith(fleet.snapshot())
+
+
+def test_learner_is_sent_only_what_changed_since_the_state_it_learned(federated_ursulas,
+                                                                       ursula_federated_test_config,
+                                                                       monkeypatch):
+    lonely_ursula_maker = partial(make_federated_ursulas,
+                                  ursula_config=ursula_federated_test_config,
+                                  quantity=1,
+                                  know_each_other=False)
+    lonely_teacher = lonely_ursula_maker().pop()
+    lonely_learner = lonely_ursula_maker(known_nodes=[lonely_teacher]).pop()
+    first_ursula, second_ursula, *_ = list(federated_ursulas)
+
+    learning_callers = []
+    crosstown_traffic.decorator = crosstownTaskListDecoratorFactory(learning_callers)
+
+    # The first time around, the learner has to be taught everything.
+    lonely_teacher.remember_node(first_ursula)
+    state_learned_from = lonely_teacher.known_nodes.checksum
+    lonely_learner._current_teacher_node = lonely_teacher
+    lonely_learner.learn_from_teacher_node()
+    assert first_ursula.checksum_public_address in lonely_learner.known_nodes.addresses()
+    assert lonely_learner._fleet_states_learned_from_teachers[lonely_teacher.checksum_public_address] == state_learned_from
+
+    # Now the teacher learns about one more node...
+    lonely_teacher.remember_node(second_ursula)
+    delta = lonely_teacher.known_nodes.signed_delta(since=state_learned_from,
+                                                    stamp=lonely_teacher.stamp,
+                                                    this_node_bytes=lonely_teacher.__bytes__)
+    _signature, remainder = signature_splitter(delta, return_remainder=True)
+    _checksum, _updated, remainder = FleetStateTracker.snapshot_splitter(remainder, return_remainder=True)
+    assert remainder.startswith(bytes(FLEET_STATE_DELTA))
+
+    since, number_of_nodes, node_payload = FleetStateTracker.split_delta(remainder[len(bytes(FLEET_STATE_DELTA)):])
+    assert since == state_learned_from
+    assert number_of_nodes == 3  # The teacher and the two Ursulas it knows about.
+
+    # ...and that one node (along with the teacher itself) is all that is sent.
+    sent_nodes = Ursula.batch_from_bytes(node_payload, federated_only=True)
+    assert [n.checksum_public_address for n in sent_nodes] == [second_ursula.checksum_public_address,
+                                                                lonely_teacher.checksum_public_address]
+
+    # The learner asks for, is sent, and applies the delta like any other teaching.
+    payloads_received = list()
+    get_nodes_via_rest = lonely_learner.network_middleware.get_nodes_via_rest
+
+    def get_nodes_via_rest_and_keep_the_payload(*args, **kwargs):
+        response = get_nodes_via_rest(*args, **kwargs)
+        payloads_received.append(response.content)
+        return response
+
+    monkeypatch.setattr(lonely_learner.network_middleware, "get_nodes_via_rest", get_nodes_via_rest_and_keep_the_payload)
+    lonely_learner._current_teacher_node = lonely_teacher
+    new_nodes = lonely_learner.learn_from_teacher_node()
+    assert [n.checksum_public_address for n in new_nodes] == [second_ursula.checksum_public_address]
+    assert first_ursula.checksum_public_address in lonely_learner.known_nodes.addresses()
+
+    payload_received, = payloads_received
+    _signature, remainder = signature_splitter(payload_received, return_remainder=True)
+    _checksum, _updated, remainder = FleetStateTracker.snapshot_splitter(remainder, return_remainder=True)
+    assert remainder.startswith(bytes(FLEET_STATE_DELTA))
+
+    # Only a learner who asks for a delta gets one; a state the teacher never had gets the full snapshot.
+    assert lonely_teacher.known_nodes.base_state_for_delta(None) is None
+    assert lonely_teacher.known_nodes.base_state_for_delta("not a checksum we know") is None
+
+
+def test_fleet_state_history_is_bounded_and_materialized_from_diffs(federated_ursulas):
+    fleet = FleetStateTracker(max_retained_states=2)
+    ursulas = sorted(federated_ursulas, key=lambda u: u.checksum_public_address)[:4]
+
+    checksums = list()
+    for ursula in ursulas:
+        fleet[ursula.checksum_public_address] = ursula
+        checksum, _state = fleet.record_fleet_state()
+        checksums.append(checksum)
+
+    # Only the two most recent states are retained, each holding just what changed.
+    assert [state.checksum for state in fleet.previous_states()] == [checksums[3], checksums[2]]
+    assert all(len(state.diff) == 1 for state in fleet.previous_states())
+
+    with pytest.raises(KeyError):
+        fleet.materialize_state(checksums[1])
+
+    # The older of them can still be rebuilt in full, from the states which were folded away.
+    assert fleet.materialize_state(checksums[2]).nodes == ursulas[:3]
+    assert fleet.materialize_state(checksums[3]).nodes == ursulas
+
+    assert fleet.changes_since(checksums[2]) == {ursulas[3].checksum_public_address: ursulas[3]}
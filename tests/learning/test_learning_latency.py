@@ -0,0 +1,102 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import datetime
+import math
+import time
+
+import maya
+import pytest_twisted as pt
+from hendrix.experience import crosstown_traffic
+from hendrix.utils.test_utils import crosstownTaskListDecoratorFactory
+from twisted.internet import defer, reactor, task
+
+from nucypher.characters.lawful import Enrico
+from nucypher.crypto.powers import DecryptingPower
+from nucypher.utilities.sandbox.middleware import SlowMiddleware
+from nucypher.utilities.sandbox.ursula import make_federated_ursulas
+
+
+def p99(latencies):
+    return sorted(latencies)[math.ceil(0.99 * len(latencies)) - 1]
+
+
+@pt.inlineCallbacks
+def test_reencryption_latency_stays_flat_while_a_teacher_hangs(federated_alice,
+                                                               federated_bob,
+                                                               federated_ursulas,
+                                                               ursula_federated_test_config):
+    hang_for = 1.5
+    interval = 0.05
+
+    # Keep the teacher from learning about our learner in turn.
+    learning_callers = []
+    crosstown_traffic.decorator = crosstownTaskListDecoratorFactory(learning_callers)
+
+    policy_end_datetime = maya.now() + datetime.timedelta(days=5)
+    policy = federated_alice.grant(federated_bob, b"learning latency test", m=1, n=1, expiration=policy_end_datetime)
+    map_id = policy.treasure_map.public_id()
+    federated_bob.treasure_maps[map_id] = policy.treasure_map
+    for ursula in federated_ursulas:
+        federated_bob.remember_node(ursula)
+    (ursula_address, _arrangement_id), = list(policy.treasure_map)
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+
+    def reencrypt_a_new_capsule():
+        message_kit, _signature = enrico.encrypt_message(b"Are you still there?")
+        capsule = message_kit.capsule
+        capsule.set_correctness_keys(delegating=policy.public_key,
+                                     receiving=federated_bob.public_keys(DecryptingPower),
+                                     verifying=federated_alice.stamp.as_umbral_pubkey())
+        work_orders = federated_bob.generate_work_orders(map_id, capsule, num_ursulas=1)
+        return federated_bob.get_reencrypted_cfrags(work_orders[ursula_address])
+
+    @defer.inlineCallbacks
+    def measure_for(seconds):
+        latencies = list()
+        deadline = time.perf_counter() + seconds
+        while time.perf_counter() < deadline:
+            scheduled = time.perf_counter()
+            yield task.deferLater(reactor, interval, reencrypt_a_new_capsule)
+            latencies.append(time.perf_counter() - scheduled - interval)
+        return latencies
+
+    baseline = yield measure_for(hang_for / 2)
+
+    slow_middleware = SlowMiddleware('get_nodes_via_rest', hang_for=hang_for, everyone=True)
+    learner = make_federated_ursulas(ursula_config=ursula_federated_test_config,
+                                     quantity=1,
+                                     know_each_other=False,
+                                     known_nodes=[list(federated_ursulas)[0]],
+                                     network_middleware=slow_middleware).pop()
+
+    # Just after we start measuring, the learner begins a round with its slow teacher.
+    reactor.callLater(interval, learner.learn_about_nodes_now, force=True)
+    # Being hurried along while that round is still underway doesn't start another alongside it.
+    reactor.callLater(interval * 3, learner.learn_about_nodes_now)
+    while_hanging = yield measure_for(hang_for + interval * 4)
+    learner.stop_learning_loop()
+
+    # The learning threads went with the loop, and aren't left for the reactor to stop at shutdown.
+    assert not learner._learning_thread_pool.started
+    assert learner._learning_thread_pool_trigger is None
+
+    assert slow_middleware.was_asked.is_set()
+    assert slow_middleware.times_asked == 1
+
+    # Had the round run on the reactor, at least one re-encryption would have waited out the whole hang.
+    assert p99(while_hanging) < p99(baseline) + hang_for / 4
@@ -0,0 +1,61 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from hendrix.experience import crosstown_traffic
+from hendrix.utils.test_utils import crosstownTaskListDecoratorFactory
+
+from nucypher.utilities.sandbox.ursula import make_federated_ursulas
+
+
+def test_one_round_with_several_teachers(federated_ursulas, ursula_federated_test_config):
+    learning_callers = []
+    crosstown_traffic.decorator = crosstownTaskListDecoratorFactory(learning_callers)
+
+    teachers = list(federated_ursulas)[:3]
+    lonely_learner = make_federated_ursulas(ursula_config=ursula_federated_test_config,
+                                            quantity=1,
+                                            know_each_other=False,
+                                            known_nodes=teachers).pop()
+
+    new_nodes = lonely_learner.learn_from_teacher_node(number_of_teachers=3)
+
+    # Every teacher was asked, yet each node they all knew about was verified and remembered just once.
+    assert all(teacher.fleet_state_checksum for teacher in teachers)
+    assert len(new_nodes) == len(federated_ursulas) - len(teachers)
+    assert len({node.checksum_public_address for node in new_nodes}) == len(new_nodes)
+    assert len(lonely_learner.known_nodes) == len(federated_ursulas)
+
+
+def test_unresponsive_teachers_are_asked_less_often(federated_ursulas, ursula_federated_test_config):
+    lonely_learner = make_federated_ursulas(ursula_config=ursula_federated_test_config,
+                                            quantity=1,
+                                            know_each_other=False,
+                                            known_nodes=list(federated_ursulas)[:3]).pop()
+    sluggish_teacher, *prompt_teachers = list(lonely_learner.known_nodes)
+
+    lonely_learner._teacher_responsiveness[sluggish_teacher.checksum_public_address] = 0.0
+    for teacher in prompt_teachers:
+        lonely_learner._teacher_responsiveness[teacher.checksum_public_address] = 0.9
+
+    first_picks = list()
+    for _ in range(200):
+        lonely_learner.teacher_nodes.clear()
+        lonely_learner.select_teacher_nodes()
+        first_picks.append(lonely_learner.teacher_nodes[-1])  # Teachers are popped from the right.
+
+    # Left to chance, the sluggish teacher would be picked first about a third of the time.
+    assert first_picks.count(sluggish_teacher) < len(first_picks) / 10
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+
+
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import os
+import random
+import time
+
+from nucypher.crypto.api import keccak_digest
+from nucypher.network.fleet_digest import FleetDigest
+
+
+def make_fleet(size: int, metadata_size: int) -> dict:
+    """
+    Stand-ins for known nodes: random checksum addresses mapped to node-sized metadata.
+    """
+    return {"0x" + os.urandom(20).hex(): os.urandom(metadata_size) for _ in range(size)}
+
+
+def full_rehash(fleet: dict) -> bytes:
+    """
+    The checksum as it used to be computed after every change: sort, serialize, hash.
+    """
+    return keccak_digest(b"".join(fleet[address] for address in sorted(fleet)))
+
+
+def measure_full_rehash(fleet: dict, changes: int) -> float:
+    addresses = list(fleet)
+    start = time.perf_counter()
+    for _ in range(changes):
+        fleet[random.choice(addresses)] = os.urandom(len(fleet[addresses[0]]))
+        full_rehash(fleet)
+    return (time.perf_counter() - start) / changes
+
+
+def measure_incremental(fleet: dict, changes: int) -> float:
+    digest = FleetDigest()
+    for address, metadata in fleet.items():
+        digest.put(address, keccak_digest(metadata))
+
+    addresses = list(fleet)
+    start = time.perf_counter()
+    for _ in range(changes):
+        digest.put(random.choice(addresses), keccak_digest(os.urandom(len(fleet[addresses[0]]))))
+        digest.root.hex()
+    return (time.perf_counter() - start) / changes
+
+
+def measure_build(fleet: dict) -> float:
+    digest = FleetDigest()
+    start = time.perf_counter()
+    for address, metadata in fleet.items():
+        digest.put(address, keccak_digest(metadata))
+        digest.root.hex()
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare full and incremental fleet checksums.")
+    parser.add_argument('--nodes', type=int, default=10000, help="Number of nodes in the fleet")
+    parser.add_argument('--changes', type=int, default=100, help="Node updates to checksum after")
+    parser.add_argument('--metadata-size', type=int, default=1024, help="Bytes of metadata per node")
+    args = parser.parse_args()
+
+    print("Starting Up...")
+    fleet = make_fleet(size=args.nodes, metadata_size=args.metadata_size)
+
+    # Learning the whole fleet one node at a time, checksumming after each.
+    build = measure_build(dict(fleet))
+    print(f"Learn {args.nodes} nodes (incremental) : {build:.3f} sec")
+
+    full = measure_full_rehash(dict(fleet), changes=args.changes)
+    print(f"Per change (full re-sort and re-hash) : {full * 1000:.3f} ms")
+
+    incremental = measure_incremental(dict(fleet), changes=args.changes)
+    print(f"Per change (incremental digest)       : {incremental * 1000:.3f} ms ({full / incremental:.0f}x)")
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+
+
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import random
+import time
+
+from hendrix.experience import crosstown_traffic
+from hendrix.utils.test_utils import crosstownTaskListDecoratorFactory
+
+from nucypher.config.characters import UrsulaConfiguration
+from nucypher.utilities.sandbox.constants import MOCK_URSULA_STARTING_PORT
+from nucypher.utilities.sandbox.middleware import MockRestMiddleware
+from nucypher.utilities.sandbox.ursula import make_federated_ursulas
+
+
+def make_sparse_fleet(ursula_config, size: int, peers: int) -> list:
+    """
+    A fleet in which each Ursula starts out knowing only a handful of the others.
+    """
+    fleet = list(make_federated_ursulas(ursula_config=ursula_config, quantity=size, know_each_other=False))
+    for ursula in fleet:
+        for peer in random.sample(fleet, peers):
+            ursula.remember_node(peer)
+    return fleet
+
+
+def converge(ursula_config, fleet: list, teachers_per_round: int, max_rounds: int):
+    """
+    Brings a newcomer who knows a single seed up to the whole fleet; returns (rounds, seconds).
+    """
+    newcomer = make_federated_ursulas(ursula_config=ursula_config,
+                                      quantity=1,
+                                      know_each_other=False,
+                                      known_nodes=[random.choice(fleet)]).pop()
+    start = time.perf_counter()
+    for learning_round in range(1, max_rounds + 1):
+        newcomer.learn_from_teacher_node(eager=False, number_of_teachers=teachers_per_round)
+        if len(newcomer.known_nodes) >= len(fleet):
+            return learning_round, time.perf_counter() - start
+    return None, time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time for a newcomer to learn a whole (mock) fleet.")
+    parser.add_argument('--nodes', type=int, default=50, help="Ursulas in the fleet")
+    parser.add_argument('--peers', type=int, default=3, help="Ursulas each fleet member knows to begin with")
+    parser.add_argument('--teachers', type=int, nargs='+', default=[1, 3, 5], help="Teachers per round to compare")
+    parser.add_argument('--max-rounds', type=int, default=200)
+    args = parser.parse_args()
+
+    # Teachers don't need to learn about the newcomers in turn.
+    crosstown_traffic.decorator = crosstownTaskListDecoratorFactory(list())
+
+    ursula_config = UrsulaConfiguration(dev_mode=True,
+                                        rest_port=MOCK_URSULA_STARTING_PORT,
+                                        is_me=True,
+                                        start_learning_now=False,
+                                        abort_on_learning_error=True,
+                                        federated_only=True,
+                                        network_middleware=MockRestMiddleware(),
+                                        save_metadata=False,
+                                        reload_metadata=False)
+
+    print("Starting Up...")
+    fleet = make_sparse_fleet(ursula_config, size=args.nodes, peers=args.peers)
+
+    for teachers_per_round in args.teachers:
+        rounds, seconds = converge(ursula_config, fleet, teachers_per_round, max_rounds=args.max_rounds)
+        rounds = rounds or f"> {args.max_rounds}"
+        print(f"{teachers_per_round} teacher(s) per round: learned {args.nodes} nodes in {rounds} rounds ({seconds:.2f} sec)")
+
+    ursula_config.cleanup()
@@ -0,0 +1,91 @@
+#!/usr/bin/env python3
+
+
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import datetime
+import os
+import time
+
+import maya
+from hendrix.experience import crosstown_traffic
+from hendrix.utils.test_utils import crosstownTaskListDecoratorFactory
+
+from nucypher.config.characters import AliceConfiguration, BobConfiguration, UrsulaConfiguration
+from nucypher.utilities.sandbox.constants import MOCK_URSULA_STARTING_PORT
+from nucypher.utilities.sandbox.middleware import MockRestMiddleware, SlowMiddleware
+from nucypher.utilities.sandbox.ursula import make_federated_ursulas
+
+
+def time_enactment(alice, bob, n: int, concurrency: int, middleware) -> float:
+    policy = alice.create_policy(bob, label=os.urandom(16), m=1, n=n, federated=True)
+    policy.make_arrangements(middleware, value=None, expiration=maya.now() + datetime.timedelta(days=5))
+    start = time.perf_counter()
+    policy.enact(middleware, publish=False, concurrency=concurrency)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare sequential and concurrent policy enactment latency by n.")
+    parser.add_argument('--n', type=int, nargs='+', default=[1, 5, 10, 20], help="Policy sizes to compare")
+    parser.add_argument('--rtt', type=float, default=0.05, help="Simulated round trip time for each enactment")
+    parser.add_argument('--concurrency', type=int, default=16, help="Enactments in flight for the concurrent run")
+    args = parser.parse_args()
+
+    # Ursulas don't need to learn about anyone along the way.
+    crosstown_traffic.decorator = crosstownTaskListDecoratorFactory(list())
+
+    ursula_config = UrsulaConfiguration(dev_mode=True,
+                                        rest_port=MOCK_URSULA_STARTING_PORT,
+                                        is_me=True,
+                                        start_learning_now=False,
+                                        abort_on_learning_error=True,
+                                        federated_only=True,
+                                        network_middleware=MockRestMiddleware(),
+                                        save_metadata=False,
+                                        reload_metadata=False)
+
+    print("Starting Up...")
+    ursulas = list(make_federated_ursulas(ursula_config=ursula_config, quantity=max(args.n)))
+    middleware = SlowMiddleware('enact_policy', hang_for=args.rtt, everyone=True)
+
+    alice_config = AliceConfiguration(dev_mode=True,
+                                      is_me=True,
+                                      network_middleware=middleware,
+                                      known_nodes=ursulas,
+                                      federated_only=True,
+                                      abort_on_learning_error=True,
+                                      save_metadata=False,
+                                      reload_metadata=False)
+    bob_config = BobConfiguration(dev_mode=True,
+                                  network_middleware=middleware,
+                                  start_learning_now=False,
+                                  abort_on_learning_error=True,
+                                  federated_only=True,
+                                  save_metadata=False,
+                                  reload_metadata=False)
+    alice, bob = alice_config.produce(), bob_config.produce()
+
+    for n in args.n:
+        sequential = time_enactment(alice, bob, n, concurrency=1, middleware=middleware)
+        concurrent = time_enactment(alice, bob, n, concurrency=args.concurrency, middleware=middleware)
+        print(f"n={n:<3} sequential: {sequential:.3f} sec   concurrent: {concurrent:.3f} sec ({sequential / concurrent:.1f}x)")
+
+    for config in (alice_config, bob_config, ursula_config):
+        config.cleanup()
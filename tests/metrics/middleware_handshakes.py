@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import os
+import tempfile
+import time
+
+from cryptography.hazmat.primitives.serialization import Encoding
+from twisted.internet import reactor, threads
+from urllib3.connectionpool import HTTPSConnectionPool
+
+from nucypher.config.characters import UrsulaConfiguration
+from nucypher.network.middleware import NucypherMiddlewareClient, RestMiddleware
+from nucypher.utilities.sandbox.constants import MOCK_URSULA_STARTING_PORT
+from nucypher.utilities.sandbox.ursula import make_federated_ursulas
+
+
+class HandshakeCounter:
+    """
+    Counts the connections (and so the TCP and TLS handshakes) urllib3 opens.
+    """
+
+    def __init__(self):
+        self.handshakes = 0
+        self._new_conn = HTTPSConnectionPool._new_conn
+        counter = self
+
+        def _new_conn(pool):
+            counter.handshakes += 1
+            return counter._new_conn(pool)
+
+        HTTPSConnectionPool._new_conn = _new_conn
+
+
+def serve(ursulas, certificate_dir: str):
+    """
+    Runs each Ursula's REST server over TLS, pinning its certificate on disk for the client.
+    """
+    for ursula in ursulas:
+        deployer = ursula.get_deployer()
+        deployer.addServices()
+        deployer.catalogServers(deployer.hendrix)
+        deployer.start()
+
+        certificate_filepath = os.path.join(certificate_dir, f"{ursula.checksum_public_address}.pem")
+        with open(certificate_filepath, "wb") as f:
+            f.write(ursula.certificate.public_bytes(Encoding.PEM))
+        ursula.certificate_filepath = certificate_filepath
+
+
+def measure(client, ursulas, rounds: int, counter: HandshakeCounter):
+    handshakes_before = counter.handshakes
+    start = time.perf_counter()
+    for _ in range(rounds):
+        for ursula in ursulas:
+            client.get(node=ursula, path="public_information")
+    elapsed = time.perf_counter() - start
+    return elapsed, counter.handshakes - handshakes_before
+
+
+def compare(ursulas, rounds: int):
+    counter = HandshakeCounter()
+    requests_made = rounds * len(ursulas)
+
+    for label, client in (("new connection per request", NucypherMiddlewareClient(pool_connections=False)),
+                          ("pooled, pinned sessions  ", NucypherMiddlewareClient(pool_connections=True))):
+        elapsed, handshakes = measure(client, ursulas, rounds, counter)
+        print(f"{label}: {requests_made} requests, {handshakes} handshakes, "
+              f"{elapsed:.2f} sec ({1000 * elapsed / requests_made:.1f} ms/request)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Count TLS handshakes made by the middleware client, with and without connection pooling.")
+    parser.add_argument('--ursulas', type=int, default=5, help="Local Ursulas to serve over TLS")
+    parser.add_argument('--rounds', type=int, default=20, help="Requests to each Ursula per measurement")
+    args = parser.parse_args()
+
+    ursula_config = UrsulaConfiguration(dev_mode=True,
+                                        rest_port=MOCK_URSULA_STARTING_PORT,
+                                        is_me=True,
+                                        start_learning_now=False,
+                                        abort_on_learning_error=True,
+                                        federated_only=True,
+                                        network_middleware=RestMiddleware(),
+                                        save_metadata=False,
+                                        reload_metadata=False)
+
+    print("Starting Up...")
+    ursulas = list(make_federated_ursulas(ursula_config=ursula_config, quantity=args.ursulas, know_each_other=False))
+    certificate_dir = tempfile.mkdtemp()
+    serve(ursulas, certificate_dir)
+
+    def stop(result):
+        ursula_config.cleanup()
+        reactor.stop()
+        return result
+
+    # The servers run on the reactor; the client blocks, so it gets a thread of its own.
+    reactor.callWhenRunning(lambda: threads.deferToThread(compare, ursulas, args.rounds).addBoth(stop))
+    reactor.run()
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+
+
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import os
+import time
+from collections import namedtuple
+
+from umbral import pre
+from umbral.keys import UmbralPrivateKey
+from umbral.signing import Signer
+
+from nucypher.crypto.signing import SignatureStamp
+from nucypher.network.reencryption import make_reencryption_engine
+from nucypher.policy.models import WorkOrder
+
+Participant = namedtuple('Participant', ('stamp',))
+
+
+def make_stamp():
+    private_key = UmbralPrivateKey.gen_key()
+    return SignatureStamp(verifying_key=private_key.get_pubkey(), signer=Signer(private_key))
+
+
+def make_work_order(capsules_per_work_order: int):
+    """
+    Builds the same material Ursula sees behind /kFrag/<id>/reencrypt: one KFrag and a WorkOrder of many capsules.
+    """
+    delegating_key = UmbralPrivateKey.gen_key()
+    receiving_key = UmbralPrivateKey.gen_key()
+    alice_signing_key = UmbralPrivateKey.gen_key()
+    alices_verifying_key = alice_signing_key.get_pubkey()
+
+    kfrag, *_ = pre.generate_kfrags(delegating_privkey=delegating_key,
+                                    receiving_pubkey=receiving_key.get_pubkey(),
+                                    signer=Signer(alice_signing_key),
+                                    threshold=1,
+                                    N=1)
+
+    capsules = list()
+    for _ in range(capsules_per_work_order):
+        _ciphertext, capsule = pre.encrypt(delegating_key.get_pubkey(), os.urandom(32))
+        capsule.set_correctness_keys(delegating=delegating_key.get_pubkey(),
+                                     receiving=receiving_key.get_pubkey(),
+                                     verifying=alices_verifying_key)
+        capsules.append(capsule)
+
+    ursula_stamp = make_stamp()
+    work_order = WorkOrder.construct_by_bob(arrangement_id=os.urandom(32),
+                                            capsules=capsules,
+                                            ursula=Participant(stamp=ursula_stamp),
+                                            bob=Participant(stamp=make_stamp()))
+    return ursula_stamp, kfrag, alices_verifying_key, work_order
+
+
+def measure(workers: int, rounds: int, material) -> float:
+    ursula_stamp, kfrag, alices_verifying_key, work_order = material
+    engine = make_reencryption_engine(stamp=ursula_stamp, workers=workers)
+
+    # Warm up the pool so process startup isn't part of the measurement.
+    list(engine.reencrypt(kfrag=kfrag, alices_verifying_key=alices_verifying_key, work_order=work_order))
+
+    start = time.perf_counter()
+    for _ in range(rounds):
+        list(engine.reencrypt(kfrag=kfrag, alices_verifying_key=alices_verifying_key, work_order=work_order))
+    elapsed = time.perf_counter() - start
+
+    engine.shutdown()
+    return (rounds * len(work_order.tasks)) / elapsed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare inline and pooled re-encryption throughput.")
+    parser.add_argument('--capsules', type=int, default=32, help="Capsules per WorkOrder")
+    parser.add_argument('--rounds', type=int, default=5, help="WorkOrders to re-encrypt per measurement")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="Worker processes for the pooled run")
+    args = parser.parse_args()
+
+    print("Starting Up...")
+    material = make_work_order(capsules_per_work_order=args.capsules)
+
+    inline = measure(workers=None, rounds=args.rounds, material=material)
+    print(f"1 worker (inline)  : {inline:.1f} capsules/sec")
+
+    pooled = measure(workers=args.workers, rounds=args.rounds, material=material)
+    print(f"{args.workers} workers (pool) : {pooled:.1f} capsules/sec ({pooled / inline:.2f}x)")
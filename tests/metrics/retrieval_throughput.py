@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+
+
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import datetime
+import os
+import time
+
+import maya
+from hendrix.experience import crosstown_traffic
+from hendrix.utils.test_utils import crosstownTaskListDecoratorFactory
+
+from nucypher.characters.lawful import Enrico
+from nucypher.config.characters import AliceConfiguration, BobConfiguration, UrsulaConfiguration
+from nucypher.utilities.sandbox.constants import MOCK_URSULA_STARTING_PORT
+from nucypher.utilities.sandbox.middleware import MockRestMiddleware, SlowMiddleware
+from nucypher.utilities.sandbox.ursula import make_federated_ursulas
+
+
+def encrypt_kits(enrico, quantity: int):
+    return [enrico.encrypt_message(b"heartbeat %d" % beat)[0] for beat in range(quantity)]
+
+
+def time_one_by_one(bob, alice, enrico, policy, message_kits) -> float:
+    start = time.perf_counter()
+    for message_kit in message_kits:
+        bob.retrieve(message_kit=message_kit,
+                     data_source=enrico,
+                     alice_verifying_key=alice.stamp.as_umbral_pubkey(),
+                     label=policy.label)
+    return time.perf_counter() - start
+
+
+def time_batch(bob, alice, enrico, policy, message_kits) -> float:
+    start = time.perf_counter()
+    bob.retrieve_many(message_kits=message_kits,
+                      data_source=enrico,
+                      alice_verifying_key=alice.stamp.as_umbral_pubkey(),
+                      label=policy.label)
+    return time.perf_counter() - start
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare retrieving message kits one by one against retrieve_many.")
+    parser.add_argument('--kits', type=int, nargs='+', default=[1, 10, 100], help="Message kits to retrieve")
+    parser.add_argument('--m', type=int, default=2, help="Threshold of the policy")
+    parser.add_argument('--n', type=int, default=3, help="Ursulas in the policy")
+    parser.add_argument('--rtt', type=float, default=0.05, help="Simulated round trip time for each work order")
+    args = parser.parse_args()
+
+    # Ursulas don't need to learn about anyone along the way.
+    crosstown_traffic.decorator = crosstownTaskListDecoratorFactory(list())
+
+    ursula_config = UrsulaConfiguration(dev_mode=True,
+                                        rest_port=MOCK_URSULA_STARTING_PORT,
+                                        is_me=True,
+                                        start_learning_now=False,
+                                        abort_on_learning_error=True,
+                                        federated_only=True,
+                                        network_middleware=MockRestMiddleware(),
+                                        save_metadata=False,
+                                        reload_metadata=False)
+
+    print("Starting Up...")
+    ursulas = list(make_federated_ursulas(ursula_config=ursula_config, quantity=args.n))
+
+    # Every Ursula takes a round trip to answer a work order, however many capsules it carries.
+    middleware = SlowMiddleware('reencrypt', hang_for=args.rtt)
+    middleware.slow_nodes.update(ursula.checksum_public_address for ursula in ursulas)
+
+    alice_config = AliceConfiguration(dev_mode=True,
+                                      is_me=True,
+                                      network_middleware=MockRestMiddleware(),
+                                      known_nodes=ursulas,
+                                      federated_only=True,
+                                      abort_on_learning_error=True,
+                                      save_metadata=False,
+                                      reload_metadata=False)
+    bob_config = BobConfiguration(dev_mode=True,
+                                  network_middleware=middleware,
+                                  known_nodes=ursulas,
+                                  start_learning_now=False,
+                                  abort_on_learning_error=True,
+                                  federated_only=True,
+                                  save_metadata=False,
+                                  reload_metadata=False)
+    alice, bob = alice_config.produce(), bob_config.produce()
+
+    policy = alice.grant(bob, label=os.urandom(16), m=args.m, n=args.n,
+                         expiration=maya.now() + datetime.timedelta(days=5))
+    bob.join_policy(label=policy.label, alice_pubkey_sig=alice.stamp, block=True)
+    enrico = Enrico(policy_encrypting_key=policy.public_key)
+
+    for kits in args.kits:
+        one_by_one = time_one_by_one(bob, alice, enrico, policy, encrypt_kits(enrico, kits))
+        batch = time_batch(bob, alice, enrico, policy, encrypt_kits(enrico, kits))
+        print(f"{kits:<5} kits   one by one: {one_by_one:.3f} sec   retrieve_many: {batch:.3f} sec "
+              f"({one_by_one / batch:.1f}x)")
+
+    for config in (alice_config, bob_config, ursula_config):
+        config.cleanup()
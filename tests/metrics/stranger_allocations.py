@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+
+
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import argparse
+import random
+import time
+import tracemalloc
+
+from umbral.keys import UmbralPrivateKey
+
+from nucypher.characters.lawful import Bob
+from nucypher.crypto.powers import SigningPower
+
+
+def as_character(verifying_key):
+    return Bob.from_public_keys({SigningPower: verifying_key})
+
+
+def as_stranger(verifying_key):
+    return Bob.stranger(verifying_key)
+
+
+def measure(make_identity, verifying_keys, requests: int):
+    """
+    Builds the identity of a random Bob for each of `requests` requests; returns the seconds and
+    bytes allocated per request.
+    """
+    tracemalloc.start()
+    start = time.perf_counter()
+    snapshot_before = tracemalloc.take_snapshot()
+    identities = [make_identity(random.choice(verifying_keys)) for _ in range(requests)]
+    snapshot_after = tracemalloc.take_snapshot()
+    elapsed = time.perf_counter() - start
+    tracemalloc.stop()
+
+    allocated = sum(stat.size_diff for stat in snapshot_after.compare_to(snapshot_before, 'filename'))
+    del identities
+    return elapsed / requests, allocated / requests
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compare per-request cost of a full stranger Character and a cached Stranger.")
+    parser.add_argument('--bobs', type=int, default=1000, help="Distinct Bobs making requests")
+    parser.add_argument('--requests', type=int, default=5000, help="Requests to serve")
+    args = parser.parse_args()
+
+    verifying_keys = [UmbralPrivateKey.gen_key().get_pubkey() for _ in range(args.bobs)]
+
+    for label, make_identity in (("Bob.from_public_keys", as_character), ("Bob.stranger       ", as_stranger)):
+        seconds, allocated = measure(make_identity, verifying_keys, args.requests)
+        print(f"{label}: {1e6 * seconds:.1f} us/request, {allocated / 1024:.1f} KiB retained/request")
@@ -11,8 +11,9 @@ from functools import partial
 def test_bob_does_not_let_a_connection_error_stop_him(enacted_federated_policy, federated_ursulas, federated_bob,
                                                       federated_alice):
     assert len(federated_bob.known_nodes) == 0
-    ursula1 = list(federated_ursulas)[0]
-    ursula2 = list(federated_ursulas)[1]
+    # Two of the Ursulas Alice gave the TreasureMap to.
+    map_id = enacted_federated_policy.treasure_map.public_id()
+    ursula1, ursula2, *_ = TreasureMap.custodians_among(federated_alice.known_nodes, map_id)
 
     federated_bob.remember_node(ursula1)
 
@@ -0,0 +1,85 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import os
+
+import pytest
+from cryptography.hazmat.primitives.asymmetric import ec
+from cryptography.hazmat.primitives.serialization import Encoding
+
+from nucypher.crypto.api import generate_self_signed_certificate
+from nucypher.network.middleware import NodeConnectionPool, NucypherMiddlewareClient
+
+
+@pytest.fixture(scope="module")
+def certificate_filepaths(tmpdir_factory):
+    certificate_dir = tmpdir_factory.mktemp("certificates")
+    filepaths = list()
+    for i in range(2):
+        certificate, _private_key = generate_self_signed_certificate(host="127.0.0.1",
+                                                                     checksum_address=f"0x{i:040}",
+                                                                     curve=ec.SECP384R1)
+        filepath = os.path.join(str(certificate_dir), f"{i}.pem")
+        with open(filepath, "wb") as f:
+            f.write(certificate.public_bytes(Encoding.PEM))
+        filepaths.append(filepath)
+    return filepaths
+
+
+def test_each_node_keeps_its_session(certificate_filepaths):
+    pool = NodeConnectionPool(max_sockets=8, sockets_per_node=2, idle_timeout=60)
+    first_cert, second_cert = certificate_filepaths
+
+    session = pool.session("0xA", first_cert)
+    assert pool.session("0xA", first_cert) is session
+    assert pool.session("0xB", first_cert) is not session
+
+    # A node showing up with a new certificate gets a new session, pinned to it.
+    repinned = pool.session("0xA", second_cert)
+    assert repinned is not session
+    assert repinned.get_adapter("https://127.0.0.1:9151").certificate_filepath == second_cert
+    assert len(pool) == 2
+
+
+def test_sessions_are_evicted_when_idle_or_over_the_socket_cap(certificate_filepaths):
+    certificate = certificate_filepaths[0]
+
+    pool = NodeConnectionPool(max_sockets=4, sockets_per_node=2, idle_timeout=60)
+    for address in ("0xA", "0xB", "0xC"):
+        pool.session(address, certificate)
+    assert "0xA" not in pool  # The least recently used node made way.
+    assert len(pool) == 2
+
+    pool = NodeConnectionPool(max_sockets=4, sockets_per_node=2, idle_timeout=0)
+    pool.session("0xA", certificate)
+    pool.session("0xB", certificate)
+    assert "0xA" not in pool
+    assert len(pool) == 1
+
+
+def test_nodes_known_only_by_host_and_port_are_pooled_too(certificate_filepaths):
+    first_cert, second_cert = certificate_filepaths
+    client = NucypherMiddlewareClient()
+
+    # As when verifying a node, before we know it by more than where it is and the certificate it showed us.
+    session = client.connection_for(None, "127.0.0.1:9151", first_cert, http_client=client.library)
+    assert client.connection_for(None, "127.0.0.1:9151", first_cert, http_client=client.library) is session
+    assert client.connection_for(None, "127.0.0.1:9152", first_cert, http_client=client.library) is not session
+    assert client.connection_for(None, "127.0.0.1:9151", second_cert, http_client=client.library) is not session
+
+    # Nothing is pooled without a certificate to pin.
+    assert client.connection_for(None, "127.0.0.1:9151", None, http_client=client.library) is client.library
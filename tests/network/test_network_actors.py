@@ -16,6 +16,8 @@ along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
 """
 
 
+import time
+
 import pytest
 from binascii import unhexlify
 from hendrix.experience import crosstown_traffic
@@ -26,8 +28,9 @@ from nucypher.characters.unlawful import Vladimir
 from nucypher.crypto.api import keccak_digest
 from nucypher.crypto.powers import SigningPower
 from nucypher.network.nicknames import nickname_from_seed
+from nucypher.policy.models import TreasureMap
 from nucypher.utilities.sandbox.constants import INSECURE_DEVELOPMENT_PASSWORD
-from nucypher.utilities.sandbox.middleware import MockRestMiddleware
+from nucypher.utilities.sandbox.middleware import MockRestMiddleware, SlowMiddleware
 
 
 @pytest.mark.slow()
@@ -77,18 +80,36 @@ def test_alice_sets_treasure_map(enacted_federated_policy, federated_ursulas):
 
     enacted_federated_policy.publish_treasure_map(network_middleware=MockRestMiddleware())
 
-    treasure_map_as_set_on_network = list(federated_ursulas)[0].treasure_maps[
-        keccak_digest(unhexlify(enacted_federated_policy.treasure_map.public_id()))]
+    map_id = enacted_federated_policy.treasure_map.public_id()
+    custodian = TreasureMap.custodians_among(enacted_federated_policy.alice.known_nodes, map_id)[0]
+    treasure_map_as_set_on_network = custodian.treasure_maps[keccak_digest(unhexlify(map_id))]
     assert treasure_map_as_set_on_network == enacted_federated_policy.treasure_map
 
 
+def test_treasure_map_is_given_only_to_its_custodians(enacted_federated_policy, federated_ursulas):
+    map_id = enacted_federated_policy.treasure_map.public_id()
+    treasure_map_key = keccak_digest(unhexlify(map_id))
+    for ursula in federated_ursulas:
+        ursula.treasure_maps.pop(treasure_map_key, None)
+
+    responses = enacted_federated_policy.publish_treasure_map(network_middleware=MockRestMiddleware(),
+                                                              replication_factor=3)
+
+    custodians = TreasureMap.custodians_among(enacted_federated_policy.alice.known_nodes, map_id, 3)
+    assert len(custodians) == 3
+    assert set(responses) == set(custodians)
+    for ursula in federated_ursulas:
+        assert (treasure_map_key in ursula.treasure_maps) == (ursula in custodians)
+
+
 def test_treasure_map_stored_by_ursula_is_the_correct_one_for_bob(federated_alice, federated_bob, federated_ursulas,
                                                                   enacted_federated_policy):
     """
     The TreasureMap given by Alice to Ursula is the correct one for Bob; he can decrypt and read it.
     """
-    treasure_map_as_set_on_network = list(federated_ursulas)[0].treasure_maps[
-        keccak_digest(unhexlify(enacted_federated_policy.treasure_map.public_id()))]
+    map_id = enacted_federated_policy.treasure_map.public_id()
+    custodian = TreasureMap.custodians_among(federated_alice.known_nodes, map_id)[0]
+    treasure_map_as_set_on_network = custodian.treasure_maps[keccak_digest(unhexlify(map_id))]
 
     hrac_by_bob = federated_bob.construct_policy_hrac(federated_alice.stamp, enacted_federated_policy.label)
     assert enacted_federated_policy.hrac() == hrac_by_bob
@@ -125,6 +146,43 @@ def test_bob_can_retreive_the_treasure_map_and_decrypt_it(enacted_federated_poli
     assert enacted_federated_policy.treasure_map == treasure_map_from_wire
 
 
+def test_bob_does_not_wait_on_a_slow_custodian(enacted_federated_policy):
+    bob = enacted_federated_policy.bob  # He knows the whole network by now.
+    map_id = enacted_federated_policy.treasure_map.public_id()
+
+    hang_for = 3
+    middleware = SlowMiddleware('get_treasure_map_from_node', hang_for=hang_for)
+    nearest_custodian = TreasureMap.custodians_among(bob.known_nodes, map_id)[0]
+    middleware.slow_nodes.add(nearest_custodian.checksum_public_address)
+
+    started = time.perf_counter()
+    treasure_map = bob.get_treasure_map_from_known_ursulas(middleware, map_id)
+    assert time.perf_counter() - started < hang_for
+    assert treasure_map == enacted_federated_policy.treasure_map
+
+
+def test_bob_widens_his_search_for_the_treasure_map(enacted_federated_policy, federated_ursulas):
+    bob = enacted_federated_policy.bob
+    map_id = enacted_federated_policy.treasure_map.public_id()
+    treasure_map_key = keccak_digest(unhexlify(map_id))
+
+    # Only the Ursula furthest from the map has it.
+    furthest_ursula = bob.known_nodes.nearest(bytes.fromhex(map_id))[-1]
+    for ursula in federated_ursulas:
+        ursula.treasure_maps.pop(treasure_map_key, None)
+    furthest_ursula.treasure_maps[treasure_map_key] = enacted_federated_policy.treasure_map
+
+    middleware = SlowMiddleware('get_treasure_map_from_node', hang_for=0)
+    try:
+        treasure_map = bob.get_treasure_map_from_known_ursulas(middleware, map_id)
+    finally:
+        enacted_federated_policy.publish_treasure_map(network_middleware=MockRestMiddleware())
+
+    assert treasure_map == enacted_federated_policy.treasure_map
+    # Each wave came back empty, until one was wide enough to reach the furthest Ursula.
+    assert len(middleware.nodes_asked) == len(bob.known_nodes)
+
+
 def test_treasure_map_is_legit(enacted_federated_policy):
     """
     Sure, the TreasureMap can get to Bob, but we also need to know that each Ursula in the TreasureMap is on the network.
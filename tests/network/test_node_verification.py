@@ -0,0 +1,117 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+from collections import Counter, namedtuple
+from concurrent.futures import wait
+from threading import Event, Lock
+
+import maya
+import pytest
+
+from nucypher.network.verification import NodeVerificationQueue
+
+Interface = namedtuple("Interface", ("host", "port"))
+
+
+class StallingNode:
+    """
+    Just enough of a node to be verified, keeping track of how many verifications run against each host at once.
+    """
+
+    class InvalidNode(Exception):
+        pass
+
+    lock = Lock()
+    running = Counter()
+    most_running = Counter()
+
+    def __init__(self, address, host, release: Event, valid=True):
+        self.checksum_public_address = address
+        self.timestamp = maya.now()
+        self.host = host
+        self.release = release
+        self.valid = valid
+        self.times_verified = 0
+
+    def rest_information(self):
+        return Interface(host=self.host, port=9151), None, None
+
+    def verify_node(self, network_middleware, accept_federated_only=False, certificate_filepath=None):
+        with self.lock:
+            self.running[self.host] += 1
+            self.most_running[self.host] = max(self.most_running[self.host], self.running[self.host])
+        self.release.wait(timeout=5)
+        with self.lock:
+            self.running[self.host] -= 1
+            self.times_verified += 1
+        if not self.valid:
+            raise self.InvalidNode
+
+
+def test_verifications_are_limited_per_host():
+    queue = NodeVerificationQueue(workers=8, per_host=2)
+    release = Event()
+    nodes = [StallingNode(address=f"0x{i:040}", host="crowded.host", release=release) for i in range(6)]
+    nodes.append(StallingNode(address=f"0x{6:040}", host="quiet.host", release=release))
+
+    verifications = [queue.verify(node, network_middleware=None) for node in nodes]
+    release.set()
+    wait(verifications, timeout=5)
+
+    assert [verification.result() for verification in verifications] == nodes
+    assert StallingNode.most_running["crowded.host"] == 2
+    assert StallingNode.most_running["quiet.host"] == 1
+
+    # With nothing in flight, the hosts are forgotten.
+    queue.shutdown()
+    assert not queue._running_per_host
+    assert not queue._waiting_per_host
+
+
+def test_a_slow_host_does_not_tie_up_every_worker():
+    queue = NodeVerificationQueue(workers=2, per_host=1)
+    slow_release, quick_release = Event(), Event()
+    quick_release.set()
+    slow_nodes = [StallingNode(address=f"0x{i + 10:040}", host="slow.host", release=slow_release) for i in range(3)]
+    quick_node = StallingNode(address=f"0x{13:040}", host="quick.host", release=quick_release)
+
+    slow_verifications = [queue.verify(node, network_middleware=None) for node in slow_nodes]
+    # Only one of the slow host's verifications holds a worker; the rest wait off the pool.
+    assert queue.verify(quick_node, network_middleware=None).result(timeout=2) is quick_node
+
+    slow_release.set()
+    wait(slow_verifications, timeout=5)
+    assert [verification.result() for verification in slow_verifications] == slow_nodes
+    assert StallingNode.most_running["slow.host"] == 1
+    queue.shutdown()
+
+
+def test_a_node_in_flight_is_not_verified_again():
+    queue = NodeVerificationQueue(workers=4, per_host=4)
+    release = Event()
+    node = StallingNode(address=f"0x{7:040}", host="some.host", release=release, valid=False)
+
+    first = queue.verify(node, network_middleware=None)
+    second = queue.verify(node, network_middleware=None)
+    assert first is second
+    assert len(queue) == 1
+
+    release.set()
+    with pytest.raises(StallingNode.InvalidNode):
+        first.result(timeout=5)
+    assert node.times_verified == 1
+    queue.shutdown()
@@ -0,0 +1,122 @@
+"""
+This file is part of nucypher.
+
+nucypher is free software: you can redistribute it and/or modify
+it under the terms of the GNU Affero General Public License as published by
+the Free Software Foundation, either version 3 of the License, or
+(at your option) any later version.
+
+nucypher is distributed in the hope that it will be useful,
+but WITHOUT ANY WARRANTY; without even the implied warranty of
+MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+GNU Affero General Public License for more details.
+
+You should have received a copy of the GNU Affero General Public License
+along with nucypher.  If not, see <https://www.gnu.org/licenses/>.
+"""
+
+import datetime
+
+import maya
+import pytest
+
+from nucypher.characters.lawful import Enrico
+from nucypher.crypto.powers import DecryptingPower
+from nucypher.utilities.caching import LRUCache
+
+
+def test_lru_cache_evicts_least_recently_used_and_counts():
+    cache = LRUCache(max_size=2)
+    cache.put('a', 1)
+    cache.put('b', 2)
+
+    assert cache.get('a') == 1     # 'a' is now the most recently used...
+    cache.put('c', 3)              # ...so 'b' is the one to go.
+
+    assert 'b' not in cache
+    assert cache.get('b') is None
+    assert cache.get('c') == 3
+
+    stats = cache.stats()
+    assert stats['size'] == 2
+    assert stats['hits'] == 2
+    assert stats['misses'] == 1
+    assert stats['evictions'] == 1
+
+    assert cache.invalidate_where(lambda key, value: value > 2) == 1
+    assert 'c' not in cache
+
+    with pytest.raises(ValueError):
+        LRUCache(max_size=0)
+
+
+def grant_to_one_ursula(alice, bob, ursulas, label):
+    """
+    Grants Bob a 1-of-1 policy and hands him its TreasureMap; returns the policy, its map ID and its Ursula.
+    """
+    policy = alice.grant(bob, label, m=1, n=1, expiration=maya.now() + datetime.timedelta(days=5))
+    map_id = policy.treasure_map.public_id()
+    bob.treasure_maps[map_id] = policy.treasure_map
+    for ursula in ursulas:
+        bob.remember_node(ursula)
+
+    (ursula_address, _arrangement_id), = list(policy.treasure_map)
+    ursula = next(u for u in ursulas if u.checksum_public_address == ursula_address)
+    return policy, map_id, ursula
+
+
+def work_order_for(alice, bob, policy, map_id, ursula, plaintext):
+    message_kit, _signature = Enrico(policy_encrypting_key=policy.public_key).encrypt_message(plaintext)
+    capsule = message_kit.capsule
+    capsule.set_correctness_keys(delegating=policy.public_key,
+                                 receiving=bob.public_keys(DecryptingPower),
+                                 verifying=alice.stamp.as_umbral_pubkey())
+    return bob.generate_work_orders(map_id, capsule, num_ursulas=1)[ursula.checksum_public_address]
+
+
+def test_ursula_caches_decoded_kfrags_until_revocation(federated_alice, federated_bob, federated_ursulas):
+    policy, map_id, ursula = grant_to_one_ursula(federated_alice, federated_bob, federated_ursulas,
+                                                 label=b"kfrag cache test")
+    (_ursula_address, arrangement_id), = list(policy.treasure_map)
+    id_as_hex = arrangement_id.hex()
+
+    def reencrypt_a_new_capsule():
+        work_order = work_order_for(federated_alice, federated_bob, policy, map_id, ursula,
+                                    plaintext=b"Who hasn't been decoded yet?")
+        return federated_bob.get_reencrypted_cfrags(work_order)
+
+    # The first WorkOrder for this arrangement has to go to the datastore...
+    misses, hits = ursula.kfrag_cache.misses, ursula.kfrag_cache.hits
+    assert len(reencrypt_a_new_capsule()) == 1
+    assert ursula.kfrag_cache.misses == misses + 1
+    assert id_as_hex in ursula.kfrag_cache
+
+    # ...but the next one is served the already-decoded KFrag.
+    assert len(reencrypt_a_new_capsule()) == 1
+    assert ursula.kfrag_cache.hits == hits + 1
+
+    # Once the arrangement is revoked, its KFrag is gone from the cache as well.
+    failed_revocations = federated_alice.revoke(policy)
+    assert len(failed_revocations) == 0
+    assert id_as_hex not in ursula.kfrag_cache
+
+
+def test_ursula_answers_a_retried_work_order_from_her_cache(federated_alice, federated_bob, federated_ursulas):
+    policy, map_id, ursula = grant_to_one_ursula(federated_alice, federated_bob, federated_ursulas,
+                                                 label=b"reencryption cache test")
+    work_order = work_order_for(federated_alice, federated_bob, policy, map_id, ursula, plaintext=b"Did you get that?")
+
+    misses, hits = ursula.reencryption_cache.misses, ursula.reencryption_cache.hits
+    first_cfrag, = federated_bob.get_reencrypted_cfrags(work_order)
+    assert ursula.reencryption_cache.misses == misses + 1
+
+    # Bob didn't hear back in time, say, and sends the very same WorkOrder again.
+    retried_cfrag, = federated_bob.get_reencrypted_cfrags(work_order)
+    assert ursula.reencryption_cache.hits == hits + 1
+    assert bytes(retried_cfrag) == bytes(first_cfrag)
+
+    # Revoking the arrangement takes its results out of the cache.
+    cached_results = len(ursula.reencryption_cache)
+    failed_revocations = federated_alice.revoke(policy)
+    assert len(failed_revocations) == 0
+    assert len(ursula.reencryption_cache) == cached_results - 1